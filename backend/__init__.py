@@ -2,6 +2,12 @@
 __init__ para backend
 """
 
-from .main import app
-
 __all__ = ['app']
+
+
+def __getattr__(name):
+    # Importado sob demanda: subpacotes (e processos de workers) não sobem o app
+    if name == 'app':
+        from .main import app
+        return app
+    raise AttributeError(f"module 'backend' has no attribute '{name}'")
@@ -0,0 +1,75 @@
+"""
+Regras padrão da análise proativa
+"""
+
+import ast
+import re
+
+from backend.agents.rule_engine import FileContext, Rule, register_rule
+
+
+@register_rule
+class LargeFileRule(Rule):
+    """Arquivos muito grandes"""
+
+    name = "large-file"
+    type = "refactor"
+    priority = "medium"
+    max_lines = 500
+
+    def check_file(self, ctx: FileContext):
+        if len(ctx.lines) > self.max_lines:
+            ctx.suggest(
+                f"O arquivo `{ctx.relative_path}` está ficando muito grande (>{self.max_lines} linhas). Considere modularizar."
+            )
+
+
+@register_rule
+class TodoRule(Rule):
+    """TODOs pendentes"""
+
+    name = "todo"
+    type = "todo"
+    pattern = r'(?:#|//)\s*TODO:?\s*(.*)'
+    flags = re.IGNORECASE
+
+    def check_line(self, ctx: FileContext, number: int, match: "re.Match"):
+        ctx.suggest(f"TODO encontrado em `{ctx.relative_path}`: {match.group(1).strip()}", line=number)
+
+
+@register_rule
+class MissingDocstringRule(Rule):
+    """Funções públicas sem docstring (Python)"""
+
+    name = "missing-docstring"
+    type = "documentation"
+    extensions = ('.py',)
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+    def check_node(self, ctx: FileContext, node: ast.AST):
+        if node.name.startswith('_') or ast.get_docstring(node) is not None:
+            return
+        ctx.suggest(f"A função `{node.name}` em `{ctx.relative_path}` não possui docstring.", line=node.lineno)
+
+
+@register_rule
+class BareExceptRule(Rule):
+    """
+    `except:` sem tipo, que captura até KeyboardInterrupt/SystemExit (Python)
+
+    Desativada na configuração padrão (proactive.disabled_rules).
+    """
+
+    name = "bare-except"
+    type = "quality"
+    priority = "medium"
+    extensions = ('.py',)
+    node_types = (ast.ExceptHandler,)
+
+    def check_node(self, ctx: FileContext, node: ast.AST):
+        if node.type is None:
+            ctx.suggest(
+                f"`{ctx.relative_path}` usa `except:` sem tipo, que captura até KeyboardInterrupt; "
+                f"prefira `except Exception:`.",
+                line=node.lineno
+            )
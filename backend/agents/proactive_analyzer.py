@@ -1,82 +1,399 @@
 import os
-import re
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterable, Set, Tuple
 import asyncio
 
+from backend.memory.rag.project_walker import ProjectWalker
+from backend.process_context import process_context
+from backend.agents import builtin_rules  # noqa: F401 (registra as regras padrão)
+from backend.agents.rule_engine import RuleEngine
+
+ANALYZED_EXTENSIONS = ('.py', '.js', '.ts')
+
+# Ordem das sugestões (a primeira é a mais importante)
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+# Arquivos a partir deste tamanho são analisados num processo (regras pesadas em CPU);
+# abaixo disso o custo de enviar a tarefa supera o ganho e uma thread basta
+PROCESS_MIN_BYTES = 64 * 1024
+
+# Pausa antes de continuar uma varredura que estourou o orçamento de tempo
+CONTINUE_DELAY = 1.0
+
+
+def _suggestion_id(suggestion: Dict[str, str]) -> str:
+    """Identificador estável de uma sugestão, usado nos diffs enviados aos clientes"""
+    key = "\0".join((suggestion["type"], suggestion["file"], suggestion["message"]))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _analyze_file(engine: RuleEngine, file_path: str, relative_path: str,
+                  previous_hash: Optional[str]) -> Tuple[int, int, str, Optional[List[Dict]], Optional[Dict]]:
+    """
+    Lê um arquivo e aplica as regras (função pura, roda em threads ou processos do pool)
+
+    Returns:
+        (tamanho, mtime, hash, sugestões, estatísticas por regra); sugestões e
+        estatísticas são None se o conteúdo não mudou
+    """
+    with open(file_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if digest == previous_hash:
+        return stat.st_size, stat.st_mtime_ns, digest, None, None
+
+    content = data.decode('utf-8', errors='replace')
+    suggestions, stats = engine.run(relative_path, Path(file_path).suffix, content)
+    unique = {}
+    for suggestion in suggestions:
+        suggestion["id"] = _suggestion_id(suggestion)
+        unique.setdefault(suggestion["id"], suggestion)
+    return stat.st_size, stat.st_mtime_ns, digest, list(unique.values()), stats
+
+
 class ProactiveAnalyzer:
     """Monitora o projeto em background e gera sugestões proativas"""
 
-    def __init__(self, project_root: str):
+    def __init__(
+        self,
+        project_root: str,
+        walker: Optional[ProjectWalker] = None,
+        max_concurrency: int = 4,
+        scan_budget: float = 5.0,
+        workers: int = 0,
+        engine: Optional[RuleEngine] = None
+    ):
+        """
+        Args:
+            project_root: Raiz do projeto
+            walker: Varredura de arquivos (padrão: respeita .gitignore)
+            max_concurrency: Arquivos analisados ao mesmo tempo
+            scan_budget: Segundos por varredura; o restante fica para a próxima (0 = sem limite)
+            workers: Processos para arquivos grandes (0 = número de CPUs, 1 = só threads)
+            engine: Motor de regras (padrão: todas as regras registradas)
+        """
         self.project_root = Path(project_root)
-        self.suggestions = []
-
-    async def analyze_project(self) -> List[Dict[str, str]]:
-        """Realiza uma varredura em busca de melhorias óbvias"""
-        self.suggestions = []
-        
-        for root, dirs, files in os.walk(self.project_root):
-            if any(p in root for p in [".git", "__pycache__", "node_modules", ".brain", "venv"]):
+        self.walker = walker or ProjectWalker(project_root)
+        self.max_concurrency = max(1, max_concurrency)
+        self.scan_budget = scan_budget
+        self.workers = workers
+        self.engine = engine or RuleEngine.from_registry()
+        # regra -> {"files", "seconds", "findings", "errors"} acumulados
+        self.rule_stats: Dict[str, Dict[str, float]] = {}
+        # arquivo -> {"size", "mtime", "hash", "suggestions"} da última análise
+        self._files: Dict[str, Dict[str, Any]] = {}
+        # id -> (sugestão, arquivos que a geram); mantido a cada arquivo alterado
+        self._active: Dict[str, Tuple[Dict[str, str], int]] = {}
+        # Mudanças desde o último diff
+        self._added: Dict[str, Dict[str, str]] = {}
+        self._resolved: Dict[str, Dict[str, str]] = {}
+        self._sorted: Optional[List[Dict[str, str]]] = []
+        # Arquivos que ficaram de fora por causa do orçamento de tempo
+        self.deferred: Set[str] = set()
+        self.last_scan: Optional[Dict[str, Any]] = None
+
+        # Leitura e regras nunca rodam no event loop
+        self._threads = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="proactive")
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    async def analyze_project(self) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Varre o projeto reaproveitando o resultado de arquivos que não mudaram
+
+        Arquivos com mesmo tamanho e mtime não são relidos; os demais só são
+        reanalisados se o hash do conteúdo mudou.
+
+        Returns:
+            Diff {"added", "resolved"} em relação à varredura anterior
+        """
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        listed = await loop.run_in_executor(
+            self._threads, lambda: list(self.walker.files(ANALYZED_EXTENSIONS))
+        )
+
+        seen = set()
+        pending = []
+        for file_path, relative_path, stat in listed:
+            seen.add(relative_path)
+            entry = self._files.get(relative_path)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
                 continue
+            pending.append((file_path, relative_path, stat.st_size))
 
-            for file in files:
-                if file.endswith(('.py', '.js', '.ts')):
-                    await self._check_file(Path(root) / file)
-        
-        return self.suggestions
+        for relative_path in set(self._files) - seen:
+            self._set_file(relative_path, None)
+        self.deferred &= seen
 
-    async def _check_file(self, file_path: Path):
-        """Aplica regras de análise em um arquivo individual"""
-        try:
-            content = file_path.read_text(encoding='utf-8', errors='replace')
-            relative_path = os.path.relpath(file_path, self.project_root)
-
-            # Regra 1: Arquivos muito grandes
-            if len(content.splitlines()) > 500:
-                self.suggestions.append({
-                    "type": "refactor",
-                    "file": relative_path,
-                    "message": f"O arquivo `{relative_path}` está ficando muito grande (>500 linhas). Considere modularizar.",
-                    "priority": "medium"
-                })
-
-            # Regra 2: TODOs pendentes
-            todos = re.findall(r'#\s*TODO:?\s*(.*)', content, re.IGNORECASE)
-            todos += re.findall(r'//\s*TODO:?\s*(.*)', content, re.IGNORECASE)
-            for todo in todos:
-                self.suggestions.append({
-                    "type": "todo",
-                    "file": relative_path,
-                    "message": f"TODO encontrado em `{relative_path}`: {todo.strip()}",
-                    "priority": "low"
-                })
-
-            # Regra 3: Funções sem documentação (Python)
-            if file_path.suffix == '.py':
-                undocumented = re.findall(r'def\s+([a-zA-Z_][a-zA-Z0-9_]*)\(.*\):\s*(?!\s*"""|\s*\'\'\')', content)
-                for func in undocumented:
-                    if not func.startswith('_'): # Ignorar privadas
-                        self.suggestions.append({
-                            "type": "documentation",
-                            "file": relative_path,
-                            "message": f"A função `{func}` em `{relative_path}` não possui docstring.",
-                            "priority": "low"
-                        })
+        await self._check_files(pending, started)
+        return self._update_suggestions()
+
+    async def update_files(self, paths: Iterable[str]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Reanalisa só os arquivos informados (ex: eventos do watcher)
+
+        Args:
+            paths: Caminhos relativos à raiz do projeto
+
+        Returns:
+            Diff {"added", "resolved"}
+        """
+        started = time.monotonic()
+        pending = []
+        for relative_path in paths:
+            if not relative_path.endswith(ANALYZED_EXTENSIONS) or self.walker.is_ignored(relative_path):
+                continue
+            file_path = self.project_root / relative_path
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                self._set_file(relative_path, None)
+                self.deferred.discard(relative_path)
+                continue
+            pending.append((str(file_path), relative_path, stat.st_size))
+
+        await self._check_files(pending, started)
+        return self._update_suggestions()
+
+    async def _check_files(self, pending: List[Tuple[str, str, int]], started: float):
+        """Analisa os arquivos com concorrência limitada, dentro do orçamento de tempo"""
+        deadline = started + self.scan_budget if self.scan_budget > 0 else None
+        tasks = iter(pending)
+        analyzed = 0
+
+        async def worker():
+            nonlocal analyzed
+            # Os workers consomem o mesmo iterador: no máximo max_concurrency arquivos por vez
+            for file_path, relative_path, size in tasks:
+                if deadline is not None and time.monotonic() > deadline:
+                    self.deferred.add(relative_path)
+                    continue
+                self.deferred.discard(relative_path)
+                await self._check_file(file_path, relative_path, size)
+                analyzed += 1
+
+        await asyncio.gather(*(worker() for _ in range(min(self.max_concurrency, len(pending)))))
+        self.last_scan = {
+            "files_checked": analyzed,
+            "deferred": len(self.deferred),
+            "duration": round(time.monotonic() - started, 3)
+        }
 
+    async def _check_file(self, file_path: str, relative_path: str, size: int):
+        """Analisa um arquivo num worker se o conteúdo mudou desde a última análise"""
+        entry = self._files.get(relative_path)
+        executor = self._threads
+        if size >= PROCESS_MIN_BYTES and self.workers != 1:
+            executor = self._process_pool()
+
+        loop = asyncio.get_running_loop()
+        try:
+            size, mtime, digest, suggestions, stats = await loop.run_in_executor(
+                executor, _analyze_file, self.engine, file_path, relative_path, entry["hash"] if entry else None
+            )
+        except OSError:
+            self._set_file(relative_path, None)
+            return
         except Exception as e:
-            pass
+            print(f"Erro ao analisar {relative_path}: {e}")
+            return
+
+        if suggestions is not None:
+            entry = {"hash": digest, "suggestions": suggestions}
+            self._set_file(relative_path, entry)
+            self._add_rule_stats(stats)
+        entry.update(size=size, mtime=mtime)
+
+    def _add_rule_stats(self, stats: Dict[str, Dict[str, float]]):
+        """Acumula o custo de cada regra (vindo de threads ou processos)"""
+        for name, rule_stats in stats.items():
+            total = self.rule_stats.setdefault(name, {"files": 0, "seconds": 0.0, "findings": 0, "errors": 0})
+            total["files"] += 1
+            for key in ("seconds", "findings", "errors"):
+                total[key] += rule_stats[key]
+
+    def _set_file(self, relative_path: str, entry: Optional[Dict[str, Any]]):
+        """Troca o resultado de um arquivo, atualizando as sugestões ativas"""
+        old = self._files.pop(relative_path, None)
+        if entry is not None:
+            self._files[relative_path] = entry
+
+        for suggestion in old["suggestions"] if old else ():
+            suggestion_id = suggestion["id"]
+            active, count = self._active[suggestion_id]
+            if count > 1:
+                self._active[suggestion_id] = (active, count - 1)
+                continue
+            del self._active[suggestion_id]
+            if self._added.pop(suggestion_id, None) is None:
+                self._resolved[suggestion_id] = active
+            self._sorted = None
+
+        for suggestion in entry["suggestions"] if entry else ():
+            suggestion_id = suggestion["id"]
+            if suggestion_id in self._active:
+                active, count = self._active[suggestion_id]
+                self._active[suggestion_id] = (active, count + 1)
+                continue
+            self._active[suggestion_id] = (suggestion, 1)
+            if self._resolved.pop(suggestion_id, None) is None:
+                self._added[suggestion_id] = suggestion
+            self._sorted = None
+
+    @property
+    def suggestions(self) -> List[Dict[str, str]]:
+        """Sugestões ativas, da mais para a menos importante"""
+        if self._sorted is None:
+            self._sorted = sorted(
+                (suggestion for suggestion, _ in self._active.values()),
+                key=lambda s: (PRIORITY_ORDER.get(s["priority"], len(PRIORITY_ORDER)), s["file"], s["message"])
+            )
+        return self._sorted
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            # Criado com o servidor já rodando: fork herdaria os locks das outras threads
+            context = process_context(__name__)
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.workers or os.cpu_count() or 1, mp_context=context
+            )
+        return self._processes
+
+    def close(self):
+        """Encerra os pools de threads e processos"""
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+    def _update_suggestions(self) -> Dict[str, List[Dict[str, str]]]:
+        """Sugestões que entraram e saíram desde o último diff"""
+        order = lambda s: (PRIORITY_ORDER.get(s["priority"], len(PRIORITY_ORDER)), s["file"], s["message"])
+        diff = {
+            "added": sorted(self._added.values(), key=order),
+            "resolved": list(self._resolved.values())
+        }
+        self._added, self._resolved = {}, {}
+        return diff
+
 
-    async def run_periodic_check(self, websocket_manager_callback):
-        """Loop que roda a análise periodicamente e envia para a UI"""
+class AnalysisScheduler:
+    """
+    Agenda única da análise proativa, compartilhada por todas as conexões
+
+    Cada varredura roda uma vez e só o que mudou (sugestões novas e
+    resolvidas) é entregue aos assinantes; sem assinantes, nenhuma
+    varredura acontece. Entre varreduras completas, arquivos alterados
+    avisados por `notify_changed` são reanalisados isoladamente.
+    """
+
+    def __init__(self, analyzer: ProactiveAnalyzer, interval: float = 300):
+        """
+        Args:
+            analyzer: Analisador do projeto
+            interval: Segundos entre varreduras completas
+        """
+        self.analyzer = analyzer
+        self.interval = interval
+        self._subscribers: List[asyncio.Queue] = []
+        self._wake = asyncio.Event()
+        self._idle = True
+        # Arquivos alterados desde a última análise (relativos à raiz)
+        self._changed: Set[str] = set()
+        self._last_full_scan: Optional[float] = None
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Estado completo, para quem acaba de assinar (ou perdeu diffs)"""
+        return {
+            "type": "proactive_suggestions",
+            "snapshot": True,
+            "added": list(self.analyzer.suggestions),
+            "resolved": []
+        }
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Fila de {"type": "proactive_suggestions", "added", "resolved", "snapshot"}
+
+        O primeiro evento é o estado atual (snapshot); os seguintes são diffs.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        if self.analyzer.suggestions:
+            queue.put_nowait(self._snapshot())
+        self._subscribers.append(queue)
+        # Só acorda o loop parado por falta de assinantes; quem chega no meio
+        # do intervalo recebe o último resultado e espera a próxima varredura
+        if self._idle:
+            self._wake.set()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def trigger(self):
+        """Antecipa a próxima varredura completa"""
+        self._last_full_scan = None
+        self._wake.set()
+
+    def notify_changed(self, paths: Iterable[str]):
+        """Agenda a reanálise de arquivos alterados"""
+        self._changed.update(paths)
+        self._wake.set()
+
+    async def run(self):
+        """Loop de varreduras até ser cancelado"""
+        loop = asyncio.get_running_loop()
         while True:
-            suggestions = await self.analyze_project()
-            if suggestions:
-                # Enviar apenas a sugestão de maior prioridade para não floodar
-                top_suggestion = suggestions[0]
-                await websocket_manager_callback({
-                    "type": "proactive_suggestion",
-                    "content": top_suggestion
-                })
-            
-            # Intervalo longo (ex: a cada 5 minutos ou após grandes mudanças)
-            await asyncio.sleep(300) 
+            while not self._subscribers:
+                self._idle = True
+                self._wake.clear()
+                await self._wake.wait()
+            self._idle = False
+
+            try:
+                now = loop.time()
+                if self._last_full_scan is None or now - self._last_full_scan >= self.interval:
+                    self._changed.clear()
+                    self._last_full_scan = now
+                    diff = await self.analyzer.analyze_project()
+                else:
+                    paths, self._changed = self._changed, set()
+                    diff = await self.analyzer.update_files(paths)
+
+                if diff["added"] or diff["resolved"]:
+                    self.publish({"type": "proactive_suggestions", "snapshot": False, **diff})
+            except Exception as e:
+                print(f"Erro na análise proativa: {e}")
+
+            self._wake.clear()
+            if self.analyzer.deferred:
+                # A varredura estourou o orçamento de tempo: continua após uma pausa
+                self._changed.update(self.analyzer.deferred)
+                timeout = CONTINUE_DELAY
+            elif self._changed:
+                continue
+            elif self._last_full_scan is not None:
+                timeout = max(0.0, self._last_full_scan + self.interval - loop.time())
+            else:
+                timeout = 0.0
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def publish(self, event: Dict[str, Any]):
+        """Entrega um evento a todos os assinantes"""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Cliente atrasado: descarta os diffs pendentes e reenvia o estado completo
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot())
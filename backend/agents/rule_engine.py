@@ -0,0 +1,215 @@
+"""
+Motor de regras da análise proativa
+
+Regras declaram o que querem examinar (padrões por linha, tipos de nó da
+AST do Python ou o arquivo inteiro); o motor lê o arquivo, separa as linhas
+e monta a AST uma única vez e avalia todas as regras numa só passada.
+"""
+
+import ast
+import importlib
+import logging
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Regras registradas com @register_rule, na ordem de registro
+_RULES: List[Type["Rule"]] = []
+
+_SCOPED_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+# Referências a grupos mudam de sentido dentro do padrão combinado
+_BACKREFERENCE_RE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+def register_rule(rule_cls: Type["Rule"]) -> Type["Rule"]:
+    """Registra uma regra para os motores criados com `RuleEngine.from_registry` (decorator)"""
+    if rule_cls not in _RULES:
+        _RULES.append(rule_cls)
+    return rule_cls
+
+
+def load_rule_modules(modules: Iterable[str]):
+    """Importa módulos de regras da casa (que se registram com @register_rule)"""
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar regras de {module}: {e}")
+
+
+class FileContext:
+    """Arquivo em análise, compartilhado por todas as regras"""
+
+    def __init__(self, relative_path: str, suffix: str, content: str):
+        self.relative_path = relative_path
+        self.suffix = suffix
+        self.content = content
+        self.lines = content.splitlines()
+        # AST do Python; só é montada se alguma regra pedir nós
+        self.tree: Optional[ast.AST] = None
+        self.suggestions: List[Dict[str, Any]] = []
+        self._rule: Optional["Rule"] = None
+
+    def suggest(self, message: str, line: Optional[int] = None,
+                type: Optional[str] = None, priority: Optional[str] = None):
+        """Registra uma sugestão da regra em execução"""
+        rule = self._rule
+        suggestion = {
+            "type": type or rule.type,
+            "file": self.relative_path,
+            "message": message,
+            "priority": priority or rule.priority,
+            "rule": rule.name
+        }
+        if line is not None:
+            suggestion["line"] = line
+        self.suggestions.append(suggestion)
+
+
+class Rule:
+    """
+    Base das regras de análise
+
+    Subclasses definem `name` e um ou mais interesses:
+      - `pattern` (+ `flags`): testado em cada linha -> check_line(ctx, número, match)
+      - `node_types`: tipos de nó da AST (só .py) -> check_node(ctx, nó)
+      - check_file(ctx): chamado uma vez por arquivo, se sobrescrito
+    """
+
+    name = ""
+    type = "quality"
+    priority = "low"
+    # Extensões analisadas (vazio = todas)
+    extensions: Tuple[str, ...] = ()
+    pattern: Optional[str] = None
+    flags = 0
+    node_types: Tuple[type, ...] = ()
+
+    def applies_to(self, suffix: str) -> bool:
+        return not self.extensions or suffix in self.extensions
+
+    def check_file(self, ctx: FileContext):
+        pass
+
+    def check_line(self, ctx: FileContext, number: int, match: "re.Match"):
+        pass
+
+    def check_node(self, ctx: FileContext, node: ast.AST):
+        pass
+
+
+class _Plan:
+    """Regras de uma extensão, com padrões já compilados"""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self.file_rules = [r for r in rules if type(r).check_file is not Rule.check_file]
+        self.line_rules = [(r, re.compile(r.pattern, r.flags)) for r in rules if r.pattern]
+        self.node_rules = [r for r in rules if r.node_types]
+        # tipo concreto de nó -> regras interessadas (preenchido sob demanda)
+        self._dispatch: Dict[type, List[Rule]] = {}
+
+        # Um único padrão combinado descarta de uma vez as linhas que não
+        # interessam a nenhuma regra; só as demais passam pelos padrões individuais
+        gated = [r for r in rules if r.pattern and not _BACKREFERENCE_RE.search(r.pattern)]
+        self.ungated = [(r, p) for r, p in self.line_rules if r not in gated]
+        self.gate = None
+        if gated:
+            try:
+                self.gate = re.compile("|".join(_scoped(r.pattern, r.flags) for r in gated))
+            except re.error:
+                self.ungated = self.line_rules
+
+    def rules_for_node(self, node_type: type) -> List[Rule]:
+        rules = self._dispatch.get(node_type)
+        if rules is None:
+            rules = [r for r in self.node_rules if issubclass(node_type, r.node_types)]
+            self._dispatch[node_type] = rules
+        return rules
+
+
+def _scoped(pattern: str, flags: int) -> str:
+    letters = "".join(letter for flag, letter in _SCOPED_FLAGS if flags & flag)
+    return f"(?{letters}:{pattern})" if letters else f"(?:{pattern})"
+
+
+class RuleEngine:
+    """Avalia um conjunto de regras sobre arquivos, numa passada por arquivo"""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        # extensão -> plano compilado
+        self._plans: Dict[str, _Plan] = {}
+        # Regras que já falharam (só a primeira exceção de cada uma vai para o log)
+        self._failed: Set[str] = set()
+
+    @classmethod
+    def from_registry(cls, disabled: Iterable[str] = ()) -> "RuleEngine":
+        """Motor com todas as regras registradas, exceto as desativadas por nome"""
+        disabled = set(disabled)
+        return cls(rule_cls() for rule_cls in _RULES if rule_cls.name not in disabled)
+
+    def _plan(self, suffix: str) -> _Plan:
+        plan = self._plans.get(suffix)
+        if plan is None:
+            plan = _Plan([r for r in self.rules if r.applies_to(suffix)])
+            self._plans[suffix] = plan
+        return plan
+
+    def run(self, relative_path: str, suffix: str,
+            content: str) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, float]]]:
+        """
+        Aplica as regras a um arquivo
+
+        Returns:
+            (sugestões, {regra: {"seconds", "findings", "errors"}})
+        """
+        plan = self._plan(suffix)
+        ctx = FileContext(relative_path, suffix, content)
+        stats = {r.name: {"seconds": 0.0, "findings": 0, "errors": 0} for r in plan.rules}
+
+        def call(rule: Rule, method, *args):
+            ctx._rule = rule
+            found = len(ctx.suggestions)
+            started = time.perf_counter()
+            try:
+                method(ctx, *args)
+            except Exception:
+                stats[rule.name]["errors"] += 1
+                if rule.name not in self._failed:
+                    self._failed.add(rule.name)
+                    logger.exception("Regra %s falhou em %s", rule.name, relative_path)
+            rule_stats = stats[rule.name]
+            rule_stats["seconds"] += time.perf_counter() - started
+            rule_stats["findings"] += len(ctx.suggestions) - found
+
+        for rule in plan.file_rules:
+            call(rule, rule.check_file)
+
+        if plan.line_rules:
+            gate = plan.gate
+            for number, line in enumerate(ctx.lines, 1):
+                if gate is not None and gate.search(line):
+                    for rule, pattern in plan.line_rules:
+                        match = pattern.search(line)
+                        if match:
+                            call(rule, rule.check_line, number, match)
+                else:
+                    for rule, pattern in plan.ungated:
+                        match = pattern.search(line)
+                        if match:
+                            call(rule, rule.check_line, number, match)
+
+        if plan.node_rules and suffix == '.py':
+            try:
+                ctx.tree = ast.parse(content)
+            except (SyntaxError, ValueError, RecursionError):
+                ctx.tree = None
+            if ctx.tree is not None:
+                for node in ast.walk(ctx.tree):
+                    for rule in plan.rules_for_node(type(node)):
+                        call(rule, rule.check_node, node)
+
+        return ctx.suggestions, stats
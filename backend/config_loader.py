@@ -42,7 +42,42 @@ def load_config() -> Dict[str, Any]:
         },
         'memory': {
             'max_messages': 50,
-            'context_window': 8000
+            'context_window': 8000,
+            'db_pool_size': 5,
+            'summary_threshold': 6000,
+            'summary_keep_recent': 2000,
+            'cache_mb': 32,
+            'archive_after_days': 30,
+            'archive_interval_hours': 6,
+            'archive_codec': 'zlib',
+            'vacuum_convert': False,
+            'vacuum_convert_max_mb': 256
+        },
+        'indexing': {
+            'workers': 0,
+            'watch': True,
+            'watch_backend': 'auto',
+            'watch_debounce_ms': 500,
+            'poll_interval': 2,
+            'use_gitignore': True,
+            'use_git': False,
+            'exclude': ['.git', '__pycache__', 'node_modules', '.brain', 'venv', '.venv', '.next']
+        },
+        'proactive': {
+            'enabled': True,
+            'interval': 300,
+            'max_concurrency': 4,
+            'scan_budget': 5,
+            'workers': 0,
+            'disabled_rules': ['bare-except'],
+            'rule_modules': []
+        },
+        'rag': {
+            'enabled': True,
+            'max_tokens': 1500,
+            'top_k': 5,
+            'min_bm25_score': 2.0,
+            'min_similarity': 0.25
         }
     }
     
@@ -1,20 +1,29 @@
+from typing import Optional, Dict, Any, List
 from .terminal_executor import TerminalExecutor
 from .browser_automator import BrowserAutomator
 from .autonomous_executor import AutonomousExecutor
 from backend.memory.rag.project_indexer import ProjectIndexer
 from backend.agents.agent_manager import AgentManager
+from backend.llm_providers.base_provider import BaseLLMProvider
+import asyncio
 import os
 import importlib.util
 import sys
 
+# Linhas máximas devolvidas por read_symbol
+MAX_SYMBOL_LINES = 200
+# Arquivos listados por find_usages
+MAX_USAGE_FILES = 30
+
 
 class ExecutionTools:
     """Wrapper para expor capacidades de execução ao ToolRegistry"""
     
-    def __init__(self, conversation_id: str, provider: Optional[BaseLLMProvider] = None, agent_manager: Optional[AgentManager] = None, tool_registry: Any = None):
+    def __init__(self, conversation_id: str, provider: Optional[BaseLLMProvider] = None, agent_manager: Optional[AgentManager] = None, tool_registry: Any = None, indexer: Optional[ProjectIndexer] = None):
         self.terminal = TerminalExecutor()
         self.browser = BrowserAutomator(f".brain/{conversation_id}/media")
-        self.indexer = ProjectIndexer(os.getcwd())
+        # Indexador compartilhado do servidor (atualizado em background)
+        self.indexer = indexer or ProjectIndexer(os.getcwd())
         self.agent_manager = agent_manager
         self.tool_registry = tool_registry
         if provider:
@@ -50,13 +59,149 @@ class ExecutionTools:
         except Exception as e:
             return f"Erro ao ler página: {str(e)}"
 
+    async def _refresh_index(self):
+        """
+        Recarrega o índice se outro processo o gravou, fora do event loop
+
+        Durante uma indexação o carregamento fica com ela; as ferramentas
+        respondem com o índice anterior/parcial que já está em memória.
+        """
+        if self.indexer.status["state"] == "indexing":
+            return
+        await asyncio.to_thread(self.indexer.refresh)
+
     async def project_search(self, keyword: str) -> str:
         """Busca arquivos e símbolos no projeto (Lite RAG)"""
-        self.indexer.load_index() # Garante que está carregado
-        results = self.indexer.search_keyword(keyword)
+        await self._refresh_index()
+        results = self.indexer.search(keyword, limit=10)
+
+        # Durante a indexação a resposta vem do índice anterior/parcial
+        status = self.indexer.status
+        note = ""
+        if status["state"] == "indexing":
+            note = f"\n(Indexação em andamento: {status['files_processed']} arquivos processados; resultados podem estar incompletos)"
+
         if not results:
-            return f"Nenhum arquivo encontrado para '{keyword}'."
-        return "Arquivos encontrados:\n- " + "\n- ".join(results[:10])
+            return f"Nenhum arquivo encontrado para '{keyword}'." + note
+        lines = []
+        for result in results:
+            lines.append(f"- {result['path']}")
+            # Trechos exatos das definições encontradas, em vez do arquivo inteiro
+            for definition in self.indexer.definitions_for(result["path"], result["matches"])[:5]:
+                lines.append(
+                    f"    {definition['kind']} {definition['qualname']} "
+                    f"(linhas {definition['line']}-{definition['end_line']}): {definition['signature']}"
+                )
+        return "Arquivos encontrados:\n" + "\n".join(lines) + note
+
+    async def code_retrieve(self, query: str, k: int = 5) -> str:
+        """Trechos de código mais relevantes para a consulta (BM25)"""
+        await self._refresh_index()
+        results = await asyncio.to_thread(self.indexer.retrieve_chunks, query, int(k or 5))
+        if not results:
+            return f"Nenhum trecho encontrado para '{query}'."
+        return self._format_chunks(results)
+
+    async def semantic_search(self, query: str, k: int = 5) -> str:
+        """Trechos de código semanticamente próximos de uma descrição (embeddings locais)"""
+        await self._refresh_index()
+        results = await asyncio.to_thread(self.indexer.semantic_search, query, int(k or 5))
+        if not results:
+            return f"Nenhum trecho semelhante a '{query}'."
+        return self._format_chunks(results)
+
+    def _format_chunks(self, results) -> str:
+        """Formata trechos com caminho, linhas e código (truncado)"""
+        parts = []
+        for result in results:
+            code = result["code"]
+            lines = code.splitlines(keepends=True)
+            if len(lines) > MAX_SYMBOL_LINES:
+                code = "".join(lines[:MAX_SYMBOL_LINES]) + f"... ({len(lines) - MAX_SYMBOL_LINES} linhas omitidas)\n"
+            label = f" ({result['kind']} {result['name']})" if result["name"] else ""
+            parts.append(f"# {result['path']}:{result['line']}-{result['end_line']}{label}\n{code}")
+        return "\n".join(parts)
+
+    async def read_symbol(self, name: str, path: Optional[str] = None) -> str:
+        """Retorna o código de uma função/classe/método, sem ler o arquivo inteiro"""
+        await self._refresh_index()
+        definitions = self.indexer.find_symbol(name, path or None)
+        if not definitions:
+            return f"Símbolo '{name}' não encontrado no índice."
+
+        parts = []
+        for definition in definitions[:3]:
+            end = min(definition['end_line'], definition['line'] + MAX_SYMBOL_LINES - 1)
+            try:
+                code = self.indexer.read_span(definition['path'], definition['line'], end)
+            except OSError as e:
+                parts.append(f"# {definition['path']}: erro ao ler arquivo: {e}")
+                continue
+            header = f"# {definition['path']}:{definition['line']}-{definition['end_line']} ({definition['kind']} {definition['qualname']})"
+            if end < definition['end_line']:
+                code += f"... ({definition['end_line'] - end} linhas omitidas)\n"
+            parts.append(header + "\n" + code)
+
+        if len(definitions) > 3:
+            parts.append(f"(+{len(definitions) - 3} definições; informe `path` para escolher)")
+        return "\n".join(parts)
+
+    async def find_usages(self, name: str) -> str:
+        """Onde um nome é chamado ou usado no projeto (grafo de referências)"""
+        await self._refresh_index()
+        usages = self.indexer.find_usages(name)
+        if not usages:
+            return f"Nenhum uso de '{name}' encontrado no índice."
+
+        by_file: Dict[str, List[str]] = {}
+        for usage in usages:
+            marker = "" if usage["kind"] == "call" else "*"
+            by_file.setdefault(usage["path"], []).append(f"{usage['line']}{marker}")
+
+        lines = [f"Usos de '{name}' ({len(usages)} em {len(by_file)} arquivos; * = referência sem chamada):"]
+        for path, found in list(by_file.items())[:MAX_USAGE_FILES]:
+            lines.append(f"- {path}: linhas {', '.join(found[:20])}" + (" ..." if len(found) > 20 else ""))
+        if len(by_file) > MAX_USAGE_FILES:
+            lines.append(f"(+{len(by_file) - MAX_USAGE_FILES} arquivos)")
+        return "\n".join(lines)
+
+    async def module_imports(self, path: str) -> str:
+        """O que um arquivo importa e quais arquivos o importam"""
+        await self._refresh_index()
+        relative_path = self.indexer.relative_path(path)
+        result = self.indexer.module_imports(relative_path) if relative_path else None
+        if result is None:
+            return f"Arquivo '{path}' não está no índice."
+
+        lines = [f"Imports de {relative_path}:"]
+        for record in result["imports"]:
+            target = record["path"] or "externo"
+            lines.append(f"- linha {record['line']}: {record['statement']} -> {target}")
+        if not result["imports"]:
+            lines.append("- (nenhum)")
+        lines.append(f"Importado por ({len(result['imported_by'])}):")
+        lines.extend(f"- {importer}" for importer in result["imported_by"])
+        return "\n".join(lines)
+
+    async def change_impact(self, path: str) -> str:
+        """Arquivos que podem ser afetados por uma mudança em um arquivo"""
+        await self._refresh_index()
+        relative_path = self.indexer.relative_path(path)
+        impact = self.indexer.change_impact(relative_path) if relative_path else None
+        if impact is None:
+            return f"Arquivo '{path}' não está no índice."
+
+        if not impact["affected"]:
+            return f"Nenhum arquivo do projeto depende de {relative_path}."
+
+        lines = [f"Impacto de mudanças em {relative_path} ({len(impact['affected'])} arquivos):"]
+        for dependent, depth in sorted(impact["dependents"].items(), key=lambda item: (item[1], item[0])):
+            lines.append(f"- {dependent} ({'importa diretamente' if depth == 1 else f'dependente indireto, nível {depth}'})")
+        if impact["callers"]:
+            lines.append("Chamadas às definições do arquivo:")
+            for symbol, files in impact["callers"].items():
+                lines.append(f"- {symbol}: {', '.join(files[:10])}" + (" ..." if len(files) > 10 else ""))
+        return "\n".join(lines)
 
     async def autonomous_terminal_run(self, command: str) -> str:
         """Executa um comando com tentativa de auto-correção"""
@@ -3,7 +3,7 @@ Base class para providers de LLM
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, AsyncGenerator, Optional
+from typing import List, Dict, AsyncGenerator, Optional, Any
 from backend.skills.skill_manager import SkillManager
 import os
 
@@ -34,7 +34,8 @@ class BaseLLMProvider(ABC):
             messages: Lista de mensagens [{"role": "user", "content": "..."}]
         
         Returns:
-            Dict com 'content' e opcionalmente 'tool_calls'
+            Dict com 'content' e opcionalmente 'tool_calls'; em caso de falha,
+            'error' traz a causa ('content' continua com a mensagem para o usuário)
         """
         pass
     
@@ -51,6 +52,25 @@ class BaseLLMProvider(ABC):
         """
         pass
     
+    async def stream_chat(self, messages: List[Dict[str, str]], tools: list = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Gera resposta do LLM como eventos (streaming com ferramentas)
+
+        Providers com function calling sobrescrevem este método; o padrão
+        só repassa o texto de `stream_generate`.
+
+        Args:
+            messages: Lista de mensagens
+            tools: Especificação das ferramentas (formato OpenAI)
+
+        Yields:
+            {"type": "text", "content": "..."} à medida que o texto chega e
+            {"type": "tool_call", "name": "...", "arguments": {...}} quando
+            uma chamada de ferramenta é detectada
+        """
+        async for chunk in self.stream_generate(messages):
+            yield {"type": "text", "content": chunk}
+    
     def _build_system_prompt(self) -> str:
         """Constrói o prompt do sistema"""
         return """Você é o Antigravity-Style AI Assistant, um assistente de programação de elite.
@@ -6,8 +6,9 @@ import warnings
 with warnings.catch_warnings():
     warnings.filterwarnings("ignore", category=FutureWarning)
     import google.generativeai as genai
-from typing import List, Dict, AsyncGenerator
+from typing import List, Dict, AsyncGenerator, Any
 from backend.llm_providers.base_provider import BaseLLMProvider
+import asyncio
 import os
 
 
@@ -165,7 +166,8 @@ class GeminiProvider(BaseLLMProvider):
         except Exception as e:
             return {
                 'content': f"Erro ao gerar resposta: {str(e)}",
-                'tool_calls': []
+                'tool_calls': [],
+                'error': str(e)
             }
     
     async def stream_generate(self, messages: List[Dict[str, str]], tools: list = None) -> AsyncGenerator[str, None]:
@@ -198,3 +200,42 @@ class GeminiProvider(BaseLLMProvider):
         
         except Exception as e:
             yield f"Erro ao gerar resposta: {str(e)}"
+
+    async def stream_chat(self, messages: List[Dict[str, str]], tools: list = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """Gera resposta como eventos de texto e chamadas de função (streaming)"""
+        try:
+            # Re-configurar modelo se houver tools
+            if tools:
+                self._setup_model(tools)
+
+            # Formatar mensagens
+            formatted_messages = self._format_messages(messages)
+            gemini_messages = self._convert_messages(formatted_messages)
+            
+            # Criar chat
+            chat = self.model_instance.start_chat(history=gemini_messages[:-1])
+            
+            # O SDK é síncrono: a requisição e cada chunk são lidos numa thread
+            # para não travar o event loop enquanto o modelo gera
+            response = await asyncio.to_thread(
+                chat.send_message,
+                gemini_messages[-1]['parts'][0],
+                stream=True
+            )
+            chunks = iter(response)
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                if not chunk.candidates or not chunk.candidates[0].content.parts:
+                    continue
+                for part in chunk.candidates[0].content.parts:
+                    # Chamadas de função chegam inteiras em um chunk
+                    if fn := part.function_call:
+                        yield {
+                            "type": "tool_call",
+                            "name": fn.name,
+                            "arguments": dict(fn.args)
+                        }
+                    elif part.text:
+                        yield {"type": "text", "content": part.text}
+        
+        except Exception as e:
+            yield {"type": "text", "content": f"Erro ao gerar resposta: {str(e)}"}
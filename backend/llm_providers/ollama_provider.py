@@ -45,7 +45,8 @@ class OllamaProvider(BaseLLMProvider):
         except Exception as e:
             return {
                 'content': f"Erro ao conectar com Ollama: {str(e)}. Certifique-se que Ollama está rodando (ollama serve)",
-                'tool_calls': []
+                'tool_calls': [],
+                'error': str(e)
             }
     
     async def stream_generate(self, messages: List[Dict[str, str]]) -> AsyncGenerator[str, None]:
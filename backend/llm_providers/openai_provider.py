@@ -3,8 +3,9 @@ OpenAI Provider (GPT-3.5, GPT-4)
 """
 
 from openai import AsyncOpenAI
-from typing import List, Dict, AsyncGenerator
+from typing import List, Dict, AsyncGenerator, Any
 from backend.llm_providers.base_provider import BaseLLMProvider
+import json
 import os
 
 
@@ -45,7 +46,8 @@ class OpenAIProvider(BaseLLMProvider):
         except Exception as e:
             return {
                 'content': f"Erro ao gerar resposta: {str(e)}",
-                'tool_calls': []
+                'tool_calls': [],
+                'error': str(e)
             }
     
     async def stream_generate(self, messages: List[Dict[str, str]]) -> AsyncGenerator[str, None]:
@@ -67,3 +69,63 @@ class OpenAIProvider(BaseLLMProvider):
         
         except Exception as e:
             yield f"Erro ao gerar resposta: {str(e)}"
+
+    async def stream_chat(self, messages: List[Dict[str, str]], tools: list = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """Gera resposta como eventos de texto e chamadas de função (streaming)"""
+        try:
+            formatted_messages = self._format_messages(messages)
+            
+            options = {}
+            if tools:
+                options['tools'] = tools
+            
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=formatted_messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True,
+                **options
+            )
+            
+            # Chamadas de ferramenta chegam em fragmentos (nome e argumentos
+            # JSON parciais) identificados pelo índice
+            pending_calls: Dict[int, Dict[str, str]] = {}
+            
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta
+                
+                if delta.content:
+                    yield {"type": "text", "content": delta.content}
+                
+                for call in delta.tool_calls or []:
+                    pending = pending_calls.setdefault(call.index, {"name": "", "arguments": ""})
+                    if call.function and call.function.name:
+                        pending["name"] += call.function.name
+                    if call.function and call.function.arguments:
+                        pending["arguments"] += call.function.arguments
+                
+                if choice.finish_reason and pending_calls:
+                    for event in self._tool_call_events(pending_calls):
+                        yield event
+                    pending_calls = {}
+            
+            # Stream encerrado sem finish_reason
+            for event in self._tool_call_events(pending_calls):
+                yield event
+        
+        except Exception as e:
+            yield {"type": "text", "content": f"Erro ao gerar resposta: {str(e)}"}
+    
+    def _tool_call_events(self, pending_calls: Dict[int, Dict[str, str]]):
+        """Converte os fragmentos acumulados em eventos de tool call"""
+        for index in sorted(pending_calls):
+            call = pending_calls[index]
+            try:
+                arguments = json.loads(call["arguments"]) if call["arguments"] else {}
+            except json.JSONDecodeError:
+                arguments = {}
+            yield {"type": "tool_call", "name": call["name"], "arguments": arguments}
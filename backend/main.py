@@ -3,15 +3,16 @@ ASSISTENTE DE IA CUSTOMIZÁVEL - Backend
 Sistema modular de IA para programação com suporte a múltiplos LLMs
 """
 
-from fastapi import FastAPI, WebSocket, HTTPException
+from fastapi import FastAPI, WebSocket, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional, AsyncGenerator
+from typing import List, Dict, Optional, AsyncGenerator, Any
 import uvicorn
 import json
 import asyncio
+import contextlib
 import re
 import os
 from pathlib import Path
@@ -22,13 +23,20 @@ from backend.llm_providers.gemini_provider import GeminiProvider
 from backend.llm_providers.openai_provider import OpenAIProvider
 from backend.llm_providers.ollama_provider import OllamaProvider
 from backend.tools.tool_registry import ToolRegistry
-from backend.memory.conversation_manager import ConversationManager
+from backend.memory.rag.project_walker import ProjectWalker
+from backend.memory.conversation_manager import ConversationManager, estimate_tokens
+from backend.memory.async_conversation_manager import AsyncConversationManager
+from backend.memory.conversation_compactor import ConversationCompactor
+from backend.memory.conversation_archiver import ConversationArchiver
 from backend.config_loader import load_config
 from backend.artifacts import ArtifactManager, ArtifactCreate, ArtifactUpdate, ArtifactResponse
 from backend.task_tracking import task_manager, TaskMode
 from backend.memory.rag.project_indexer import ProjectIndexer
+from backend.memory.rag.file_watcher import FileWatcher
+from backend.memory.rag.context_retriever import ContextRetriever
 from backend.agents.agent_manager import AgentManager
-from backend.agents.proactive_analyzer import ProactiveAnalyzer
+from backend.agents.proactive_analyzer import ProactiveAnalyzer, AnalysisScheduler
+from backend.agents.rule_engine import RuleEngine, load_rule_modules
 
 # Inicializar FastAPI
 app = FastAPI(title="AI Coding Assistant", version="1.0.0")
@@ -45,19 +53,132 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     """Executa tarefas ao iniciar o servidor"""
+    # Indexação em background: o servidor aceita conexões imediatamente e
+    # project_search responde com o índice anterior/parcial enquanto isso
+    background_tasks.append(asyncio.create_task(index_project_in_background()))
+
+    # Mudanças em arquivos atualizam o índice incrementalmente
+    if indexing_config.get('watch', True):
+        background_tasks.append(asyncio.create_task(file_watcher.run()))
+    
+    # Arquivamento de conversas inativas em background
+    background_tasks.append(asyncio.create_task(conversation_archiver.run_periodic()))
+
+    # Análise proativa compartilhada (só varre enquanto houver clientes conectados)
+    if proactive_config.get('enabled', True):
+        background_tasks.append(asyncio.create_task(analysis_scheduler.run()))
+        if indexing_config.get('watch', True):
+            background_tasks.append(asyncio.create_task(analyze_changed_files()))
+
+
+async def index_project_in_background():
+    """Atualiza o índice do projeto fora do event loop"""
     print("🔍 Indexando projeto para Inteligência de Fase 4...")
-    indexer = ProjectIndexer(os.getcwd())
-    indexer.index_project()
-    print("✅ Projeto indexado com sucesso!")
+    try:
+        stats = await asyncio.to_thread(project_indexer.index_project)
+        print(f"✅ Projeto indexado com sucesso! {stats}")
+    except Exception as e:
+        print(f"❌ Erro ao indexar projeto: {e}")
+
+
+async def analyze_changed_files():
+    """Repassa à análise proativa os arquivos que o watcher viu mudar"""
+    queue = file_watcher.subscribe()
+    try:
+        while True:
+            event = await queue.get()
+            analysis_scheduler.notify_changed(event["paths"])
+    finally:
+        file_watcher.unsubscribe(queue)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Libera recursos ao encerrar o servidor"""
+    for task in background_tasks:
+        task.cancel()
+    await conversation_compactor.wait_all()
+    proactive_analyzer.close()
+    # Gravação do índice ainda agendada pelas últimas alterações
+    await asyncio.to_thread(project_indexer.flush)
+    conversation_manager.close()
 
 # Configuração global
 config = load_config()
 
 # Gerenciadores
-conversation_manager = ConversationManager()
+conversation_manager = AsyncConversationManager(
+    ConversationManager(
+        pool_size=config['memory'].get('db_pool_size', 5),
+        cache_bytes=int(config['memory'].get('cache_mb', 32) * 1024 * 1024),
+        archive_codec=config['memory'].get('archive_codec', 'zlib')
+    )
+)
+conversation_archiver = ConversationArchiver(
+    conversation_manager,
+    max_idle_days=config['memory'].get('archive_after_days', 30),
+    interval_hours=config['memory'].get('archive_interval_hours', 6),
+    convert_vacuum=config['memory'].get('vacuum_convert', False),
+    convert_max_mb=config['memory'].get('vacuum_convert_max_mb', 256)
+)
 tool_registry = ToolRegistry()
 agent_manager = AgentManager(config)
-proactive_analyzer = ProactiveAnalyzer(os.getcwd())
+indexing_config = config.get('indexing', {})
+# Varredura compartilhada por indexador, watcher e análise proativa
+project_walker = ProjectWalker(
+    os.getcwd(),
+    excludes=indexing_config.get('exclude'),
+    use_gitignore=indexing_config.get('use_gitignore', True),
+    use_git=indexing_config.get('use_git', False)
+)
+proactive_config = config.get('proactive', {})
+# Regras da casa se registram ao serem importadas
+load_rule_modules(proactive_config.get('rule_modules', []))
+proactive_analyzer = ProactiveAnalyzer(
+    os.getcwd(),
+    walker=project_walker,
+    max_concurrency=proactive_config.get('max_concurrency', 4),
+    scan_budget=proactive_config.get('scan_budget', 5),
+    workers=proactive_config.get('workers', 0),
+    engine=RuleEngine.from_registry(disabled=proactive_config.get('disabled_rules', ['bare-except']))
+)
+# Uma única agenda de análise; cada websocket só assina os resultados
+analysis_scheduler = AnalysisScheduler(
+    proactive_analyzer,
+    interval=proactive_config.get('interval', 300)
+)
+project_indexer = ProjectIndexer(
+    os.getcwd(),
+    workers=indexing_config.get('workers', 0),
+    walker=project_walker
+)
+file_watcher = FileWatcher(
+    project_indexer,
+    debounce=indexing_config.get('watch_debounce_ms', 500) / 1000,
+    backend=indexing_config.get('watch_backend', 'auto'),
+    poll_interval=indexing_config.get('poll_interval', 2)
+)
+
+rag_config = config.get('rag', {})
+context_retriever = ContextRetriever(
+    project_indexer,
+    max_tokens=rag_config.get('max_tokens', 1500),
+    top_k=rag_config.get('top_k', 5),
+    min_bm25_score=rag_config.get('min_bm25_score', 2.0),
+    min_similarity=rag_config.get('min_similarity', 0.25)
+)
+
+
+async def reindex_written_file(params: Dict, result: Any):
+    """Arquivos escritos pelo agente entram no índice na hora (sem esperar o watcher)"""
+    path = params.get('path')
+    if path and not str(result).startswith("Erro"):
+        await asyncio.to_thread(project_indexer.update_files, [os.path.abspath(path)])
+
+tool_registry.add_hook("write_file", reindex_written_file)
+
+# Tarefas de background do servidor (canceladas no shutdown)
+background_tasks: List[asyncio.Task] = []
 
 # Artifact manager por conversação (será criado sob demanda)
 artifact_managers = {}
@@ -89,6 +210,57 @@ def get_llm_provider(provider_name: str = None) -> BaseLLMProvider:
     return current_provider
 
 
+conversation_compactor = ConversationCompactor(
+    conversation_manager,
+    provider_factory=get_llm_provider,
+    threshold_tokens=config['memory'].get('summary_threshold', 6000),
+    keep_recent_tokens=config['memory'].get('summary_keep_recent', 2000)
+)
+
+
+async def build_llm_messages(conversation_id: str, message: str) -> List[Dict]:
+    """
+    Monta resumo + histórico recente + nova mensagem dentro da janela de
+    contexto configurada
+    """
+    memory_config = config['memory']
+    budget = memory_config.get('context_window', 8000) - estimate_tokens(message)
+    
+    prefix = []
+    summary = await conversation_manager.get_summary(conversation_id)
+    if summary:
+        summary_content = f"Resumo da conversa até aqui:\n{summary['summary']}"
+        budget -= estimate_tokens(summary_content)
+        prefix.append({"role": "system", "content": summary_content})
+    
+    history = await conversation_manager.get_context_window(
+        conversation_id,
+        max_tokens=max(budget, 0),
+        max_messages=memory_config.get('max_messages'),
+        after_id=summary['upto_id'] if summary else None
+    )
+    history = [{"role": msg['role'], "content": msg['content']} for msg in history]
+    
+    # Trechos do projeto recuperados antes da geração (evita uma ida e volta
+    # de project_search); o histórico mais antigo cede espaço se preciso
+    suffix = []
+    if rag_config.get('enabled', True):
+        try:
+            retrieved = await asyncio.to_thread(
+                context_retriever.retrieve, message, [msg['content'] for msg in history]
+            )
+        except Exception as e:
+            print(f"Erro na recuperação de contexto: {e}")
+            retrieved = None
+        if retrieved:
+            suffix.append({"role": "system", "content": retrieved})
+            overflow = estimate_tokens(retrieved) - (budget - sum(estimate_tokens(m['content']) for m in history))
+            while history and overflow > 0:
+                overflow -= estimate_tokens(history.pop(0)['content'])
+    
+    return prefix + history + suffix + [{"role": "user", "content": message}]
+
+
 # Models
 class ChatMessage(BaseModel):
     role: str
@@ -161,14 +333,11 @@ async def chat(request: ChatRequest):
         provider = get_llm_provider()
         
         # Obter histórico
-        conversation_id = request.conversation_id or conversation_manager.create_conversation()
-        history = conversation_manager.get_messages(conversation_id)
+        conversation_id = request.conversation_id or await conversation_manager.create_conversation()
+        messages = await build_llm_messages(conversation_id, request.message)
         
         # Adicionar mensagem do usuário
-        conversation_manager.add_message(conversation_id, "user", request.message)
-        
-        # Construir mensagens para LLM
-        messages = history + [{"role": "user", "content": request.message}]
+        await conversation_manager.add_message(conversation_id, "user", request.message)
         
         # Chamar LLM
         response = await provider.generate(messages)
@@ -188,7 +357,8 @@ async def chat(request: ChatRequest):
         
         # Adicionar resposta ao histórico
         assistant_message = response.get('content', '')
-        conversation_manager.add_message(conversation_id, "assistant", assistant_message)
+        await conversation_manager.add_message(conversation_id, "assistant", assistant_message)
+        conversation_compactor.schedule(conversation_id)
         
         return ChatResponse(
             response=assistant_message,
@@ -200,17 +370,23 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def send_proactive_suggestion(websocket: WebSocket, data: Dict):
-    """Envia sugestões proativas para o cliente conectado"""
-    try:
-        await websocket.send_json(data)
-    except:
-        pass
+async def forward_proactive_suggestions(websocket: WebSocket, queue: asyncio.Queue):
+    """Envia ao cliente conectado as sugestões publicadas pela agenda de análise"""
+    while True:
+        data = await queue.get()
+        try:
+            await websocket.send_json(data)
+        except Exception:
+            return
 
 @app.websocket("/ws/chat")
 async def websocket_chat(websocket: WebSocket):
     """WebSocket para streaming"""
     await websocket.accept()
+
+    # Sugestões proativas desta conexão vêm da agenda compartilhada
+    suggestions_queue = analysis_scheduler.subscribe()
+    suggestions_task = asyncio.create_task(forward_proactive_suggestions(websocket, suggestions_queue))
     
     try:
         while True:
@@ -219,79 +395,68 @@ async def websocket_chat(websocket: WebSocket):
             request_data = json.loads(data)
             
             message = request_data.get('message')
-            conversation_id = request_data.get('conversation_id') or conversation_manager.create_conversation()
+            conversation_id = request_data.get('conversation_id') or await conversation_manager.create_conversation()
             
             # Obter provider
             provider = get_llm_provider()
             
-            # Iniciar análise proativa em background para esta conexão
-            analyzer_task = asyncio.create_task(
-                proactive_analyzer.run_periodic_check(lambda d: send_proactive_suggestion(websocket, d))
-            )
-            
             # Registrar ferramentas de execução para esta conversa
-            tool_registry.register_execution_tools(conversation_id, provider=provider, agent_manager=agent_manager)
+            tool_registry.register_execution_tools(conversation_id, provider=provider, agent_manager=agent_manager, indexer=project_indexer)
             
-            # Obter histórico
-            history = conversation_manager.get_messages(conversation_id)
+            # Obter histórico dentro da janela de contexto
+            messages = await build_llm_messages(conversation_id, message)
             
             # Adicionar mensagem do usuário
-            conversation_manager.add_message(conversation_id, "user", message)
-            
-            # Construir mensagens
-            messages = history + [{"role": "user", "content": message}]
+            await conversation_manager.add_message(conversation_id, "user", message)
             
             # Obter especificações de ferramentas para o LLM
             tools_spec = tool_registry.get_tools_for_llm()
             
-            # Primeira chamada ao LLM (pode gerar tool calls)
-            # Nota: Usamos generate (non-stream) para lidar com tool calls de forma mais simples no MVP
-            response = await provider.generate(messages, tools=tools_spec)
-            
-            # Loop de ferramentas (enquanto houver tool calls)
-            while response.get('tool_calls'):
-                for tool_call in response['tool_calls']:
+            # Resposta em streaming: texto vai para a UI assim que chega e
+            # tool calls são executadas no meio do turno
+            full_response = ""
+            async with contextlib.aclosing(provider.stream_chat(messages, tools=tools_spec)) as events:
+                async for event in events:
+                    if event["type"] == "text":
+                        full_response += event["content"]
+                        await websocket.send_json({
+                            "type": "chunk",
+                            "content": event["content"],
+                            "conversation_id": conversation_id
+                        })
+                        continue
+                    
                     # Notificar UI que ferramenta está sendo executada
                     await websocket.send_json({
                         "type": "tool_call",
-                        "tool": tool_call['name'],
-                        "args": tool_call['arguments']
+                        "tool": event['name'],
+                        "args": event['arguments']
                     })
                     
                     # Executar ferramenta
                     result = await tool_registry.execute_tool(
-                        tool_call['name'],
-                        tool_call['arguments']
+                        event['name'],
+                        event['arguments']
                     )
                     
                     # Notificar UI com resultado da ferramenta
                     await websocket.send_json({
                         "type": "tool_result",
-                        "tool": tool_call['name'],
+                        "tool": event['name'],
                         "result": str(result)
                     })
                     
                     # TODO: Na Fase 3, enviar o resultado de volta para o LLM continuar
                     # Por enquanto, mostramos no chat
-                
-                # Para evitar loop infinito no MVP, paramos após processar as ferramentas atuais
-                break 
-
-            full_response = response.get('content', '')
-            
-            # Se não houve tool calls ou sobrou conteúdo, envia para a UI
-            if full_response:
-                await websocket.send_json({
-                    "type": "chunk",
-                    "content": full_response,
-                    "conversation_id": conversation_id
-                })
             
             # processar tags especiais no final (Fase 1 MVP)
             await process_llm_tags(full_response, conversation_id)
             
             # Adicionar resposta completa ao histórico
-            conversation_manager.add_message(conversation_id, "assistant", full_response)
+            await conversation_manager.add_message(conversation_id, "assistant", full_response)
+            
+            # Resumir mensagens antigas em background, fora do turno do usuário
+            conversation_compactor.schedule(conversation_id)
             
             # Enviar mensagem de conclusão
             await websocket.send_json({
@@ -302,6 +467,9 @@ async def websocket_chat(websocket: WebSocket):
     except Exception as e:
         print(f"WebSocket error: {e}")
         await websocket.close()
+    finally:
+        suggestions_task.cancel()
+        analysis_scheduler.unsubscribe(suggestions_queue)
 
 
 async def process_llm_tags(text: str, conversation_id: str):
@@ -357,25 +525,70 @@ async def process_llm_tags(text: str, conversation_id: str):
 
 
 @app.get("/api/conversations")
-async def list_conversations():
-    """Lista todas as conversas"""
-    return conversation_manager.list_conversations()
+async def list_conversations(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    """Lista conversas paginadas por cursor (mais recentes primeiro)"""
+    try:
+        conversations = await conversation_manager.list_conversations(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    next_cursor = None
+    if len(conversations) == limit:
+        next_cursor = conversation_manager.make_cursor(conversations[-1])
+    return {"conversations": conversations, "next_cursor": next_cursor}
+
+
+@app.get("/api/conversations/search")
+async def search_conversations(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Busca textual ranqueada nas mensagens de todas as conversas"""
+    results = await conversation_manager.search_messages(q, limit=limit)
+    return {"query": q, "results": results}
 
 
 @app.get("/api/conversations/{conversation_id}")
-async def get_conversation(conversation_id: str):
-    """Obtém uma conversa específica"""
-    messages = conversation_manager.get_messages(conversation_id)
-    return {"conversation_id": conversation_id, "messages": messages}
+async def get_conversation(
+    conversation_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    after: Optional[int] = None
+):
+    """Obtém mensagens de uma conversa, opcionalmente paginadas por cursor"""
+    messages = await conversation_manager.get_messages(conversation_id, limit=limit, after_id=after)
+    
+    next_cursor = None
+    if limit and len(messages) == limit:
+        next_cursor = messages[-1]['id']
+    return {"conversation_id": conversation_id, "messages": messages, "next_cursor": next_cursor}
 
 
 @app.delete("/api/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """Deleta uma conversa"""
-    conversation_manager.delete_conversation(conversation_id)
+    await conversation_manager.delete_conversation(conversation_id)
     return {"status": "deleted"}
 
 
+@app.get("/api/memory/stats")
+async def memory_stats():
+    """Estatísticas do cache de históricos de conversa"""
+    return {"cache": conversation_manager.cache_stats()}
+
+
+@app.get("/api/proactive/stats")
+async def proactive_stats():
+    """Custo por regra e resumo da última varredura da análise proativa"""
+    return {
+        "last_scan": proactive_analyzer.last_scan,
+        "suggestions": len(proactive_analyzer.suggestions),
+        "rules": proactive_analyzer.rule_stats
+    }
+
+
 @app.get("/api/tools")
 async def list_tools():
     """Lista ferramentas disponíveis"""
@@ -553,10 +766,13 @@ async def get_task_history(limit: int = 10):
 @app.get("/health")
 async def health_check():
     """Health check"""
+    index_status = project_indexer.status
     return {
         "status": "healthy",
+        "ready": index_status["state"] == "ready",
         "provider": config['llm']['provider'],
-        "model": config['llm']['model']
+        "model": config['llm']['model'],
+        "index": index_status
     }
 
 
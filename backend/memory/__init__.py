@@ -3,5 +3,13 @@ __init__ para memory
 """
 
 from .conversation_manager import ConversationManager
+from .async_conversation_manager import AsyncConversationManager
+from .conversation_compactor import ConversationCompactor
+from .conversation_archiver import ConversationArchiver
 
-__all__ = ['ConversationManager']
+__all__ = [
+    'ConversationManager',
+    'AsyncConversationManager',
+    'ConversationCompactor',
+    'ConversationArchiver',
+]
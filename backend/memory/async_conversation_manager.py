@@ -0,0 +1,105 @@
+"""
+Variante assíncrona do gerenciador de conversas
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, Dict, Optional
+
+from backend.memory.conversation_manager import ConversationManager
+
+
+class AsyncConversationManager:
+    """
+    Mesma API do ConversationManager, mas com I/O de disco executado em
+    um pool de threads dedicado para não bloquear o event loop
+    """
+
+    def __init__(self, manager: ConversationManager, max_workers: Optional[int] = None):
+        self.manager = manager
+        # Uma thread por conexão do pool: mais threads só esperariam conexão
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or manager.pool_size,
+            thread_name_prefix="conversation-db"
+        )
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """Executa uma chamada síncrona do manager no pool de threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def create_conversation(self, title: str = "Nova Conversa") -> str:
+        """Cria uma nova conversa"""
+        return await self._run(self.manager.create_conversation, title)
+
+    async def add_message(self, conversation_id: str, role: str, content: str):
+        """Adiciona uma mensagem à conversa"""
+        return await self._run(self.manager.add_message, conversation_id, role, content)
+
+    async def get_messages(self, conversation_id: str, limit: Optional[int] = None,
+                           after_id: Optional[int] = None) -> List[Dict]:
+        """Obtém mensagens de uma conversa"""
+        return await self._run(self.manager.get_messages, conversation_id, limit, after_id)
+
+    async def list_conversations(self, limit: Optional[int] = None,
+                                 cursor: Optional[str] = None) -> List[Dict]:
+        """Lista conversas da mais recente para a mais antiga"""
+        return await self._run(self.manager.list_conversations, limit, cursor)
+
+    def make_cursor(self, conversation: Dict) -> str:
+        """Gera o cursor de paginação a partir de uma conversa listada"""
+        return self.manager.make_cursor(conversation)
+
+    async def delete_conversation(self, conversation_id: str):
+        """Deleta uma conversa e todas as suas mensagens"""
+        return await self._run(self.manager.delete_conversation, conversation_id)
+
+    async def update_conversation_title(self, conversation_id: str, title: str):
+        """Atualiza o título de uma conversa"""
+        return await self._run(self.manager.update_conversation_title, conversation_id, title)
+
+    async def get_context_window(self, conversation_id: str, max_tokens: int = 8000,
+                                 max_messages: Optional[int] = None,
+                                 after_id: Optional[int] = None) -> List[Dict]:
+        """Obtém as mensagens mais recentes que cabem na janela de contexto"""
+        return await self._run(
+            self.manager.get_context_window, conversation_id, max_tokens, max_messages, after_id
+        )
+
+    async def count_tokens(self, conversation_id: str, after_id: Optional[int] = None) -> int:
+        """Soma os tokens das mensagens com id maior que after_id"""
+        return await self._run(self.manager.count_tokens, conversation_id, after_id)
+
+    async def get_summary(self, conversation_id: str) -> Optional[Dict]:
+        """Obtém o resumo acumulado da conversa, se existir"""
+        return await self._run(self.manager.get_summary, conversation_id)
+
+    async def save_summary(self, conversation_id: str, summary: str, upto_id: int) -> bool:
+        """Persiste o resumo que cobre as mensagens até upto_id"""
+        return await self._run(self.manager.save_summary, conversation_id, summary, upto_id)
+
+    async def search_messages(self, query: str, limit: int = 20) -> List[Dict]:
+        """Busca textual nas mensagens de todas as conversas"""
+        return await self._run(self.manager.search_messages, query, limit)
+
+    async def archive_idle_conversations(self, max_idle_days: int = 30, batch_size: int = 100) -> int:
+        """Move para armazenamento frio as conversas sem atividade recente"""
+        return await self._run(self.manager.archive_idle_conversations, max_idle_days, batch_size)
+
+    async def enable_incremental_vacuum(self, max_bytes: Optional[int] = None) -> bool:
+        """Converte um banco existente para auto_vacuum incremental (uma vez)"""
+        return await self._run(self.manager.enable_incremental_vacuum, max_bytes)
+
+    async def incremental_vacuum(self, max_pages: Optional[int] = None) -> int:
+        """Devolve ao sistema de arquivos páginas livres do banco"""
+        return await self._run(self.manager.incremental_vacuum, max_pages)
+
+    def cache_stats(self) -> Dict:
+        """Contadores do cache de históricos"""
+        return self.manager.cache_stats()
+
+    def close(self):
+        """Encerra o pool de threads e as conexões"""
+        self._executor.shutdown(wait=True)
+        self.manager.close()
@@ -0,0 +1,118 @@
+"""
+Pool de conexões SQLite (modo WAL)
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class SQLiteConnectionPool:
+    """Pool limitado de conexões SQLite reutilizáveis entre threads"""
+
+    # Pragmas aplicados em toda conexão nova
+    PRAGMAS = (
+        "PRAGMA synchronous = NORMAL",   # Seguro em WAL, evita fsync a cada commit
+        "PRAGMA cache_size = -8000",     # ~8 MB de page cache por conexão
+        "PRAGMA temp_store = MEMORY",
+    )
+
+    def __init__(self, db_path: str, size: int = 5, timeout: float = 30.0,
+                 cached_statements: int = 256):
+        """
+        Args:
+            db_path: Caminho do banco SQLite
+            size: Número máximo de conexões abertas
+            timeout: Segundos de espera por uma conexão livre / lock de escrita
+            cached_statements: Statements preparados mantidos por conexão
+        """
+        if size < 1:
+            raise ValueError("O pool precisa de pelo menos uma conexão")
+
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        self._created = 1
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # journal_mode=WAL é persistente no arquivo: basta definir uma vez
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode = WAL")
+        self._idle.put(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre e configura uma nova conexão"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Obtém uma conexão ociosa ou abre uma nova se houver espaço"""
+        if self._closed:
+            raise RuntimeError("Pool de conexões fechado")
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # A vaga é reservada sob o lock antes de conectar, para que threads
+        # concorrentes não ultrapassem o limite do pool
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Nenhuma conexão livre após {self.timeout}s")
+
+    def _release(self, conn: sqlite3.Connection):
+        """Devolve a conexão ao pool"""
+        if conn.in_transaction:
+            conn.rollback()
+
+        if self._closed:
+            conn.close()
+            return
+
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Empresta uma conexão do pool durante o bloco `with`"""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self):
+        """Fecha todas as conexões ociosas"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,69 @@
+"""
+Arquivamento periódico de conversas inativas
+"""
+
+import asyncio
+
+from backend.memory.async_conversation_manager import AsyncConversationManager
+
+
+class ConversationArchiver:
+    """Move conversas inativas para armazenamento frio e compacta o banco"""
+
+    def __init__(
+        self,
+        manager: AsyncConversationManager,
+        max_idle_days: int = 30,
+        interval_hours: float = 6,
+        vacuum_pages: int = 2000,
+        convert_vacuum: bool = False,
+        convert_max_mb: float = 256
+    ):
+        """
+        Args:
+            manager: Gerenciador de conversas assíncrono
+            max_idle_days: Dias sem atividade até arquivar uma conversa
+            interval_hours: Intervalo entre execuções
+            vacuum_pages: Páginas liberadas por incremental_vacuum a cada execução
+            convert_vacuum: Converte bancos antigos para auto_vacuum incremental
+                (VACUUM completo, bloqueia as escritas enquanto roda)
+            convert_max_mb: Bancos maiores que isso nunca são convertidos aqui
+        """
+        self.manager = manager
+        self.max_idle_days = max_idle_days
+        self.interval_hours = interval_hours
+        self.vacuum_pages = vacuum_pages
+        self.convert_vacuum = convert_vacuum
+        self.convert_max_mb = convert_max_mb
+
+    async def run_once(self) -> dict:
+        """Arquiva conversas inativas (em lotes) e libera páginas livres"""
+        # A conversão reescreve o banco inteiro: só quando pedida na config e
+        # para bancos pequenos; nos demais incremental_vacuum não libera nada
+        if self.convert_vacuum and await self.manager.enable_incremental_vacuum(
+            int(self.convert_max_mb * 1024 * 1024)
+        ):
+            print("🗄️ Banco de conversas convertido para auto_vacuum incremental")
+
+        archived = 0
+        while True:
+            batch = await self.manager.archive_idle_conversations(self.max_idle_days)
+            archived += batch
+            if not batch:
+                break
+
+        freed_pages = await self.manager.incremental_vacuum(self.vacuum_pages)
+        return {"archived": archived, "freed_pages": freed_pages}
+
+    async def run_periodic(self):
+        """Loop de arquivamento em background"""
+        while True:
+            try:
+                result = await self.run_once()
+                if result["archived"] or result["freed_pages"]:
+                    print(f"🗄️ Arquivamento: {result['archived']} conversas, "
+                          f"{result['freed_pages']} páginas liberadas")
+            except Exception as e:
+                print(f"Erro no arquivamento de conversas: {e}")
+
+            await asyncio.sleep(self.interval_hours * 3600)
@@ -0,0 +1,113 @@
+"""
+Compactação de conversas longas em um resumo acumulado (rolling summary)
+"""
+
+import asyncio
+from typing import Callable, Dict, List, Optional
+
+from backend.llm_providers.base_provider import BaseLLMProvider
+from backend.memory.async_conversation_manager import AsyncConversationManager
+
+
+class ConversationCompactor:
+    """
+    Resume em background as mensagens antigas de uma conversa quando o
+    trecho ainda não resumido passa de um limite de tokens
+    """
+
+    SUMMARY_PROMPT = """Atualize o resumo de uma conversa entre um usuário e um assistente de programação.
+
+Preserve decisões técnicas, arquivos e símbolos citados, comandos executados,
+erros encontrados e pendências. Seja conciso e escreva em Português do Brasil.
+Responda apenas com o novo resumo, sem comentários.
+
+### Resumo anterior
+{previous}
+
+### Novas mensagens
+{transcript}"""
+
+    def __init__(
+        self,
+        manager: AsyncConversationManager,
+        provider_factory: Callable[[], BaseLLMProvider],
+        threshold_tokens: int = 6000,
+        keep_recent_tokens: int = 2000
+    ):
+        """
+        Args:
+            manager: Gerenciador de conversas assíncrono
+            provider_factory: Retorna o provider LLM usado para resumir
+            threshold_tokens: Tokens não resumidos que disparam a compactação
+            keep_recent_tokens: Tokens mais recentes mantidos fora do resumo
+        """
+        self.manager = manager
+        self.provider_factory = provider_factory
+        self.threshold_tokens = threshold_tokens
+        self.keep_recent_tokens = keep_recent_tokens
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def schedule(self, conversation_id: str) -> Optional[asyncio.Task]:
+        """Agenda a compactação em background (no máximo uma por conversa)"""
+        if conversation_id in self._tasks:
+            return None
+
+        task = asyncio.create_task(self.compact(conversation_id))
+        self._tasks[conversation_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(conversation_id, None))
+        return task
+
+    async def compact(self, conversation_id: str) -> bool:
+        """Incorpora ao resumo as mensagens antigas, se o limite foi atingido"""
+        try:
+            summary = await self.manager.get_summary(conversation_id)
+            upto_id = summary['upto_id'] if summary else 0
+
+            pending_tokens = await self.manager.count_tokens(conversation_id, after_id=upto_id)
+            if pending_tokens < self.threshold_tokens:
+                return False
+
+            # Mensagens recentes ficam fora do resumo e seguem literais no prompt
+            recent = await self.manager.get_context_window(
+                conversation_id, max_tokens=self.keep_recent_tokens, after_id=upto_id
+            )
+            pending = await self.manager.get_messages(conversation_id, after_id=upto_id)
+            if not pending:
+                return False
+            # A última mensagem segue literal mesmo que sozinha passe de keep_recent
+            first_recent_id = recent[0]['id'] if recent else pending[-1]['id']
+            to_fold = [m for m in pending if m['id'] < first_recent_id]
+            if not to_fold:
+                return False
+
+            new_summary = await self._summarize(summary['summary'] if summary else "", to_fold)
+            if not new_summary:
+                return False
+
+            return await self.manager.save_summary(conversation_id, new_summary, to_fold[-1]['id'])
+
+        except Exception as e:
+            print(f"Erro ao compactar conversa {conversation_id}: {e}")
+            return False
+
+    async def _summarize(self, previous: str, messages: List[Dict]) -> Optional[str]:
+        """Pede ao LLM um resumo atualizado"""
+        transcript = "\n\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = self.SUMMARY_PROMPT.format(
+            previous=previous or "(nenhum)",
+            transcript=transcript
+        )
+
+        provider = self.provider_factory()
+        response = await provider.generate([{"role": "user", "content": prompt}])
+        # Falha do provider não pode virar o novo resumo
+        if response.get('error'):
+            raise RuntimeError(f"provider {provider.name}: {response['error']}")
+
+        content = (response.get('content') or "").strip()
+        return content or None
+
+    async def wait_all(self):
+        """Aguarda as compactações em andamento (útil no shutdown)"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
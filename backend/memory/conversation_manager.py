@@ -6,94 +6,353 @@ import sqlite3
 from pathlib import Path
 from typing import List, Dict, Optional
 import json
+import lzma
 import uuid
-from datetime import datetime
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from backend.memory.connection_pool import SQLiteConnectionPool
+from backend.memory.message_cache import MessageCache, CachedMessage, slice_after
+
+
+# Formato de CURRENT_TIMESTAMP do SQLite (UTC)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Compressores disponíveis para conversas arquivadas
+ARCHIVE_CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens de um texto (~4 caracteres por token)"""
+    return max(1, (len(text or "") + 3) // 4)
 
 
 class ConversationManager:
     """Gerencia histórico de conversas com SQLite"""
     
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, pool_size: int = 5,
+                 cache_bytes: int = 32 * 1024 * 1024, archive_codec: str = "zlib"):
         if db_path is None:
             data_dir = Path(__file__).parent.parent.parent / "data"
             data_dir.mkdir(exist_ok=True)
             db_path = str(data_dir / "conversations.db")
         
         self.db_path = db_path
+        self.pool_size = pool_size
+        self._pool = SQLiteConnectionPool(db_path, size=pool_size)
+        self.cache = MessageCache(cache_bytes) if cache_bytes > 0 else None
+        
+        if archive_codec not in ARCHIVE_CODECS:
+            raise ValueError(f"Codec de arquivamento inválido. Use: {list(ARCHIVE_CODECS)}")
+        self.archive_codec = archive_codec
+        
         self._init_database()
     
     def _init_database(self):
-        """Inicializa o banco de dados"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS conversations (
-                    id TEXT PRIMARY KEY,
-                    title TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+        """Inicializa o banco de dados aplicando migrações pendentes"""
+        migrations = [
+            self._migration_base_tables,
+            self._migration_indexes,
+            self._migration_token_counts,
+            self._migration_summaries,
+            self._migration_full_text_search,
+            self._migration_archive,
+            self._migration_archive_search,
+        ]
+        
+        with self._pool.connection() as conn:
+            # auto_vacuum só muda com VACUUM: instantâneo num banco vazio; bancos
+            # existentes são convertidos em background (enable_incremental_vacuum)
+            if not conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            
+            # BEGIN IMMEDIATE serializa migrações entre processos concorrentes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                for target, migration in enumerate(migrations[version:], start=version + 1):
+                    migration(conn)
+                    conn.execute(f"PRAGMA user_version = {target}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
             
+            self.fts_enabled = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+            ).fetchone() is not None
+    
+    def _migration_base_tables(self, conn: sqlite3.Connection):
+        """v1: tabelas de conversas e mensagens"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                id TEXT PRIMARY KEY,
+                title TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT,
+                role TEXT,
+                content TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (conversation_id) REFERENCES conversations(id)
+            )
+        """)
+    
+    def _migration_indexes(self, conn: sqlite3.Connection):
+        """v2: índices para histórico por conversa e listagem por atividade"""
+        # id é monotônico, então (conversation_id, id) preserva a ordem de
+        # inserção e serve de chave única para paginação por cursor
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_messages_conversation
+            ON messages (conversation_id, id)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conversations_updated
+            ON conversations (updated_at, id)
+        """)
+    
+    def _migration_token_counts(self, conn: sqlite3.Connection):
+        """v3: contagem de tokens em cache por mensagem"""
+        conn.execute("ALTER TABLE messages ADD COLUMN token_count INTEGER NOT NULL DEFAULT 0")
+        # Mesma fórmula de estimate_tokens
+        conn.execute("UPDATE messages SET token_count = MAX(1, (LENGTH(content) + 3) / 4)")
+        
+        # Índice cobrindo token_count: a janela de contexto é calculada
+        # sem ler o conteúdo das mensagens
+        conn.execute("DROP INDEX IF EXISTS idx_messages_conversation")
+        conn.execute("""
+            CREATE INDEX idx_messages_conversation
+            ON messages (conversation_id, id, token_count)
+        """)
+    
+    def _migration_summaries(self, conn: sqlite3.Connection):
+        """v4: resumo acumulado (rolling summary) por conversa"""
+        conn.execute("ALTER TABLE conversations ADD COLUMN summary TEXT")
+        # id da última mensagem incorporada ao resumo
+        conn.execute("ALTER TABLE conversations ADD COLUMN summary_upto INTEGER NOT NULL DEFAULT 0")
+    
+    def _migration_full_text_search(self, conn: sqlite3.Connection):
+        """v5: índice FTS5 sobre o conteúdo das mensagens"""
+        try:
             conn.execute("""
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    conversation_id TEXT,
-                    role TEXT,
-                    content TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (conversation_id) REFERENCES conversations(id)
+                CREATE VIRTUAL TABLE messages_fts USING fts5(
+                    content,
+                    content = 'messages',
+                    content_rowid = 'id',
+                    tokenize = 'unicode61 remove_diacritics 2'
                 )
             """)
-            
-            conn.commit()
+        except sqlite3.OperationalError as e:
+            # SQLite compilado sem FTS5: busca cai para LIKE
+            print(f"FTS5 indisponível, busca sem índice: {e}")
+            return
+        
+        # Triggers mantêm o índice sincronizado com a tabela messages
+        conn.execute("""
+            CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN
+                INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages BEGIN
+                INSERT INTO messages_fts (messages_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+                INSERT INTO messages_fts (messages_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+                INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+            END
+        """)
+        
+        # Backfill das mensagens já existentes
+        conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+    
+    def _migration_archive(self, conn: sqlite3.Connection):
+        """v6: armazenamento frio de conversas inativas (uma linha por conversa)"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS archived_conversations (
+                conversation_id TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                message_count INTEGER NOT NULL,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (conversation_id) REFERENCES conversations(id)
+            )
+        """)
+    
+    def _migration_archive_search(self, conn: sqlite3.Connection):
+        """v7: busca nas conversas arquivadas (índice FTS5 sem conteúdo)"""
+        if not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+        ).fetchone():
+            return
+        
+        # O texto fica só no blob comprimido; o índice guarda os termos e
+        # archived_messages diz de qual conversa é cada mensagem
+        conn.execute("""
+            CREATE VIRTUAL TABLE archived_fts USING fts5(
+                content,
+                content = '',
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE archived_messages (
+                id INTEGER PRIMARY KEY,
+                conversation_id TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX idx_archived_messages_conversation
+            ON archived_messages (conversation_id)
+        """)
+        
+        # Backfill das conversas já arquivadas
+        for row in conn.execute("SELECT conversation_id, codec, payload FROM archived_conversations").fetchall():
+            self._index_archived(conn, row['conversation_id'], self._decode_archive(row))
+    
+    def close(self):
+        """Fecha as conexões do pool"""
+        self._pool.close()
     
     def create_conversation(self, title: str = "Nova Conversa") -> str:
         """Cria uma nova conversa"""
         conversation_id = str(uuid.uuid4())
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._pool.connection() as conn, conn:
             conn.execute(
                 "INSERT INTO conversations (id, title) VALUES (?, ?)",
                 (conversation_id, title)
             )
-            conn.commit()
         
         return conversation_id
     
     def add_message(self, conversation_id: str, role: str, content: str):
         """Adiciona uma mensagem à conversa"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT INTO messages (conversation_id, role, content) VALUES (?, ?, ?)",
-                (conversation_id, role, content)
+        # Mesmo formato de CURRENT_TIMESTAMP, para o cache refletir o banco
+        timestamp = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+        token_count = estimate_tokens(content)
+        
+        with self._pool.connection() as conn, conn:
+            self._rehydrate_if_archived(conn, conversation_id)
+            cursor = conn.execute(
+                """
+                INSERT INTO messages (conversation_id, role, content, timestamp, token_count)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (conversation_id, role, content, timestamp, token_count)
             )
+            message_id = cursor.lastrowid
             
             # Atualizar timestamp da conversa
             conn.execute(
-                "UPDATE conversations SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                (conversation_id,)
+                "UPDATE conversations SET updated_at = ? WHERE id = ?",
+                (timestamp, conversation_id)
+            )
+        
+        if self.cache:
+            self.cache.append(
+                conversation_id,
+                CachedMessage(message_id, role, content, timestamp, token_count)
             )
-            
-            conn.commit()
     
-    def get_messages(self, conversation_id: str, limit: Optional[int] = None) -> List[Dict]:
-        """Obtém mensagens de uma conversa"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            
-            query = """
-                SELECT role, content, timestamp 
-                FROM messages 
-                WHERE conversation_id = ? 
-                ORDER BY timestamp ASC
-            """
-            
+    def _cached_messages(self, conversation_id: str) -> Optional[List[CachedMessage]]:
+        """
+        Histórico completo via cache; em um miss carrega a conversa do disco
+        
+        Returns:
+            None se o cache estiver desativado ou a conversa for grande demais
+            para ele (as consultas SQL paginadas são usadas nesse caso)
+        """
+        if not self.cache:
+            return None
+        
+        messages = self.cache.get(conversation_id)
+        if messages is not None:
+            return messages
+        
+        version = self.cache.begin_load(conversation_id)
+        messages = None
+        try:
+            with self._pool.connection() as conn:
+                self._rehydrate_if_archived(conn, conversation_id)
+                
+                # Tamanho estimado pelo índice, sem ler o conteúdo
+                total_tokens, count = conn.execute(
+                    """
+                    SELECT COALESCE(SUM(token_count), 0), COUNT(*)
+                    FROM messages WHERE conversation_id = ?
+                    """,
+                    (conversation_id,)
+                ).fetchone()
+                if total_tokens * 4 + count * 200 > self.cache.max_bytes // 4:
+                    return None
+                
+                rows = conn.execute(
+                    """
+                    SELECT id, role, content, timestamp, token_count
+                    FROM messages
+                    WHERE conversation_id = ?
+                    ORDER BY id ASC
+                    """,
+                    (conversation_id,)
+                ).fetchall()
+                messages = [CachedMessage(*row) for row in rows]
+                return messages
+        finally:
+            self.cache.finish_load(conversation_id, version, messages)
+    
+    def cache_stats(self) -> Dict:
+        """Contadores do cache de históricos"""
+        return self.cache.stats() if self.cache else {"enabled": False}
+    
+    def get_messages(self, conversation_id: str, limit: Optional[int] = None,
+                     after_id: Optional[int] = None) -> List[Dict]:
+        """
+        Obtém mensagens de uma conversa em ordem cronológica
+        
+        Args:
+            conversation_id: ID da conversa
+            limit: Número máximo de mensagens (None = todas)
+            after_id: Cursor; retorna apenas mensagens com id maior que este
+        """
+        cached = self._cached_messages(conversation_id)
+        if cached is not None:
+            selected = slice_after(cached, after_id)
             if limit:
-                query += f" LIMIT {limit}"
+                selected = selected[:limit]
+            return [m.to_dict() for m in selected]
+        
+        with self._pool.connection() as conn:
+            self._rehydrate_if_archived(conn, conversation_id)
             
-            cursor = conn.execute(query, (conversation_id,))
+            # LIMIT parametrizado mantém um único statement preparado em cache
+            cursor = conn.execute(
+                """
+                SELECT id, role, content, timestamp
+                FROM messages
+                WHERE conversation_id = ? AND id > ?
+                ORDER BY id ASC
+                LIMIT ?
+                """,
+                (conversation_id, after_id or 0, limit if limit else -1)
+            )
             messages = [
                 {
+                    "id": row['id'],
                     "role": row['role'],
                     "content": row['content'],
                     "timestamp": row['timestamp']
@@ -103,16 +362,38 @@ class ConversationManager:
             
             return messages
     
-    def list_conversations(self) -> List[Dict]:
-        """Lista todas as conversas"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            
-            cursor = conn.execute("""
-                SELECT id, title, created_at, updated_at 
-                FROM conversations 
-                ORDER BY updated_at DESC
-            """)
+    def list_conversations(self, limit: Optional[int] = None,
+                           cursor: Optional[str] = None) -> List[Dict]:
+        """
+        Lista conversas da mais recente para a mais antiga
+        
+        Args:
+            limit: Tamanho da página (None = todas)
+            cursor: Valor de `make_cursor` da última conversa da página anterior
+        """
+        with self._pool.connection() as conn:
+            if cursor:
+                updated_at, conversation_id = self._parse_cursor(cursor)
+                rows = conn.execute(
+                    """
+                    SELECT id, title, created_at, updated_at
+                    FROM conversations
+                    WHERE (updated_at, id) < (?, ?)
+                    ORDER BY updated_at DESC, id DESC
+                    LIMIT ?
+                    """,
+                    (updated_at, conversation_id, limit if limit else -1)
+                )
+            else:
+                rows = conn.execute(
+                    """
+                    SELECT id, title, created_at, updated_at
+                    FROM conversations
+                    ORDER BY updated_at DESC, id DESC
+                    LIMIT ?
+                    """,
+                    (limit if limit else -1,)
+                )
             
             conversations = [
                 {
@@ -121,45 +402,469 @@ class ConversationManager:
                     "created_at": row['created_at'],
                     "updated_at": row['updated_at']
                 }
-                for row in cursor.fetchall()
+                for row in rows.fetchall()
             ]
             
             return conversations
     
+    @staticmethod
+    def make_cursor(conversation: Dict) -> str:
+        """Gera o cursor de paginação a partir de uma conversa listada"""
+        return f"{conversation['updated_at']}|{conversation['id']}"
+    
+    @staticmethod
+    def _parse_cursor(cursor: str):
+        """Decodifica um cursor gerado por `make_cursor`"""
+        updated_at, sep, conversation_id = cursor.partition("|")
+        if not sep or not updated_at or not conversation_id:
+            raise ValueError(f"Cursor inválido: '{cursor}'")
+        return updated_at, conversation_id
+    
     def delete_conversation(self, conversation_id: str):
         """Deleta uma conversa e todas as suas mensagens"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._pool.connection() as conn, conn:
             conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            if self.fts_enabled:
+                # O índice das arquivadas só remove termos a partir do texto original
+                row = conn.execute(
+                    "SELECT codec, payload FROM archived_conversations WHERE conversation_id = ?",
+                    (conversation_id,)
+                ).fetchone()
+                if row:
+                    self._unindex_archived(conn, conversation_id, self._decode_archive(row))
+            conn.execute("DELETE FROM archived_conversations WHERE conversation_id = ?", (conversation_id,))
             conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
-            conn.commit()
+        
+        if self.cache:
+            self.cache.invalidate(conversation_id)
     
     def update_conversation_title(self, conversation_id: str, title: str):
         """Atualiza o título de uma conversa"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._pool.connection() as conn, conn:
             conn.execute(
                 "UPDATE conversations SET title = ? WHERE id = ?",
                 (title, conversation_id)
             )
-            conn.commit()
     
-    def get_context_window(self, conversation_id: str, max_tokens: int = 8000) -> List[Dict]:
+    def get_context_window(self, conversation_id: str, max_tokens: int = 8000,
+                           max_messages: Optional[int] = None,
+                           after_id: Optional[int] = None) -> List[Dict]:
         """
-        Obtém mensagens dentro da janela de contexto
-        Aproximação simples: ~4 caracteres por token
+        Obtém as mensagens mais recentes que cabem na janela de contexto
+        
+        A soma acumulada de token_count (do fim para o início) é feita em
+        uma única query sobre o índice, então só o conteúdo das mensagens
+        selecionadas é lido do disco.
+        
+        Args:
+            conversation_id: ID da conversa
+            max_tokens: Orçamento de tokens do histórico
+            max_messages: Limite opcional de mensagens
+            after_id: Ignora mensagens com id até este valor (já resumidas)
+        """
+        cached = self._cached_messages(conversation_id)
+        if cached is not None:
+            window = []
+            total = 0
+            for message in reversed(slice_after(cached, after_id)):
+                if max_messages and len(window) >= max_messages:
+                    break
+                total += message.token_count
+                if total > max_tokens:
+                    break
+                window.append(message.to_dict())
+            window.reverse()
+            return window
+        
+        with self._pool.connection() as conn:
+            self._rehydrate_if_archived(conn, conversation_id)
+            cursor = conn.execute(
+                """
+                SELECT m.id, m.role, m.content, m.timestamp
+                FROM messages AS m
+                JOIN (
+                    SELECT id, SUM(token_count) OVER (ORDER BY id DESC) AS running
+                    FROM messages
+                    WHERE conversation_id = ? AND id > ?
+                    ORDER BY id DESC
+                    LIMIT ?
+                ) AS tail ON tail.id = m.id
+                WHERE tail.running <= ?
+                ORDER BY m.id ASC
+                """,
+                (conversation_id, after_id or 0, max_messages if max_messages else -1, max_tokens)
+            )
+            
+            return [
+                {
+                    "id": row['id'],
+                    "role": row['role'],
+                    "content": row['content'],
+                    "timestamp": row['timestamp']
+                }
+                for row in cursor.fetchall()
+            ]
+    
+    def count_tokens(self, conversation_id: str, after_id: Optional[int] = None) -> int:
+        """Soma os tokens das mensagens com id maior que after_id"""
+        cached = self._cached_messages(conversation_id)
+        if cached is not None:
+            return sum(m.token_count for m in slice_after(cached, after_id))
+        
+        with self._pool.connection() as conn:
+            self._rehydrate_if_archived(conn, conversation_id)
+            row = conn.execute(
+                """
+                SELECT COALESCE(SUM(token_count), 0)
+                FROM messages
+                WHERE conversation_id = ? AND id > ?
+                """,
+                (conversation_id, after_id or 0)
+            ).fetchone()
+            return row[0]
+    
+    def get_summary(self, conversation_id: str) -> Optional[Dict]:
+        """Obtém o resumo acumulado da conversa, se existir"""
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT summary, summary_upto FROM conversations WHERE id = ?",
+                (conversation_id,)
+            ).fetchone()
+            
+            if not row or not row['summary']:
+                return None
+            
+            return {"summary": row['summary'], "upto_id": row['summary_upto']}
+    
+    def save_summary(self, conversation_id: str, summary: str, upto_id: int) -> bool:
+        """
+        Persiste o resumo que cobre as mensagens até upto_id
+        
+        Returns:
+            False se um resumo mais recente já tiver sido salvo
+        """
+        with self._pool.connection() as conn, conn:
+            cursor = conn.execute(
+                """
+                UPDATE conversations SET summary = ?, summary_upto = ?
+                WHERE id = ? AND summary_upto < ?
+                """,
+                (summary, upto_id, conversation_id, upto_id)
+            )
+            return cursor.rowcount > 0
+    
+    def search_messages(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Busca textual nas mensagens de todas as conversas
+        
+        Args:
+            query: Termos de busca (todos precisam aparecer; o último aceita prefixo)
+            limit: Número máximo de resultados
+            
+        Returns:
+            Mensagens ordenadas por relevância (BM25), com trecho destacado;
+            "archived" indica conversas em armazenamento frio (restauradas ao abrir)
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        
+        with self._pool.connection() as conn:
+            if self.fts_enabled:
+                # Cada termo vira uma string FTS literal: usuário não injeta sintaxe MATCH
+                match = " ".join('"' + term.replace('"', '""') + '"' for term in terms) + "*"
+                archived = self._search_archived(conn, match, terms, limit)
+                rows = conn.execute(
+                    """
+                    SELECT m.id, m.conversation_id, c.title, m.role, m.timestamp,
+                           snippet(messages_fts, 0, '**', '**', '…', 16) AS snippet,
+                           bm25(messages_fts) AS rank
+                    FROM messages_fts
+                    JOIN messages AS m ON m.id = messages_fts.rowid
+                    JOIN conversations AS c ON c.id = m.conversation_id
+                    WHERE messages_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                    """,
+                    (match, limit)
+                )
+            else:
+                conditions = " AND ".join("m.content LIKE ?" for _ in terms)
+                rows = conn.execute(
+                    f"""
+                    SELECT m.id, m.conversation_id, c.title, m.role, m.timestamp,
+                           substr(m.content, 1, 200) AS snippet, 0 AS rank
+                    FROM messages AS m
+                    JOIN conversations AS c ON c.id = m.conversation_id
+                    WHERE {conditions}
+                    ORDER BY m.id DESC
+                    LIMIT ?
+                    """,
+                    [f"%{term}%" for term in terms] + [limit]
+                )
+            
+                archived = []
+            
+            results = [
+                {
+                    "message_id": row['id'],
+                    "conversation_id": row['conversation_id'],
+                    "title": row['title'],
+                    "role": row['role'],
+                    "timestamp": row['timestamp'],
+                    "snippet": row['snippet'],
+                    "rank": row['rank'],
+                    "archived": False
+                }
+                for row in rows.fetchall()
+            ]
+        
+        if archived:
+            results = sorted(results + archived, key=lambda r: r['rank'])[:limit]
+        return results
+    
+    def _search_archived(self, conn: sqlite3.Connection, match: str,
+                         terms: List[str], limit: int) -> List[Dict]:
+        """Busca no índice das conversas arquivadas (texto lido do blob)"""
+        hits = conn.execute(
+            """
+            SELECT a.id, a.conversation_id, c.title, bm25(archived_fts) AS rank
+            FROM archived_fts
+            JOIN archived_messages AS a ON a.id = archived_fts.rowid
+            JOIN conversations AS c ON c.id = a.conversation_id
+            WHERE archived_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (match, limit)
+        ).fetchall()
+        
+        # Um blob descomprimido por conversa, não por mensagem
+        archives: Dict[str, Dict[int, list]] = {}
+        results = []
+        for hit in hits:
+            conversation_id = hit['conversation_id']
+            if conversation_id not in archives:
+                row = conn.execute(
+                    "SELECT codec, payload FROM archived_conversations WHERE conversation_id = ?",
+                    (conversation_id,)
+                ).fetchone()
+                archives[conversation_id] = {m[0]: m for m in self._decode_archive(row)} if row else {}
+            message = archives[conversation_id].get(hit['id'])
+            if message is None:
+                continue
+            
+            _, role, content, timestamp, _ = message
+            results.append({
+                "message_id": hit['id'],
+                "conversation_id": conversation_id,
+                "title": hit['title'],
+                "role": role,
+                "timestamp": timestamp,
+                "snippet": _snippet(content, terms),
+                "rank": hit['rank'],
+                "archived": True
+            })
+        return results
+    
+    def archive_idle_conversations(self, max_idle_days: int = 30, batch_size: int = 100) -> int:
         """
-        messages = self.get_messages(conversation_id)
+        Move para armazenamento frio as conversas sem atividade recente
         
-        # Começar do final e adicionar mensagens até atingir o limite
-        context_messages = []
-        current_tokens = 0
+        As mensagens viram um único blob comprimido e saem da tabela messages
+        até a conversa ser acessada de novo; o texto continua pesquisável
+        pelo índice das arquivadas.
         
-        for message in reversed(messages):
-            message_tokens = len(message['content']) // 4
+        Args:
+            max_idle_days: Dias sem atividade para arquivar
+            batch_size: Máximo de conversas arquivadas por chamada
             
-            if current_tokens + message_tokens > max_tokens:
-                break
+        Returns:
+            Número de conversas arquivadas
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=max_idle_days)).strftime(TIMESTAMP_FORMAT)
+        compress, _ = ARCHIVE_CODECS[self.archive_codec]
+        archived = 0
+        
+        with self._pool.connection() as conn:
+            candidates = [
+                row['id'] for row in conn.execute(
+                    """
+                    SELECT c.id FROM conversations AS c
+                    WHERE c.updated_at < ?
+                      AND NOT EXISTS (
+                          SELECT 1 FROM archived_conversations AS a WHERE a.conversation_id = c.id
+                      )
+                      AND EXISTS (
+                          SELECT 1 FROM messages AS m WHERE m.conversation_id = c.id
+                      )
+                    LIMIT ?
+                    """,
+                    (cutoff, batch_size)
+                ).fetchall()
+            ]
+            
+            for conversation_id in candidates:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Uma mensagem pode ter chegado entre a seleção e o BEGIN
+                    still_idle = conn.execute(
+                        """
+                        SELECT 1 FROM conversations AS c
+                        WHERE c.id = ? AND c.updated_at < ?
+                          AND NOT EXISTS (
+                              SELECT 1 FROM archived_conversations AS a WHERE a.conversation_id = c.id
+                          )
+                        """,
+                        (conversation_id, cutoff)
+                    ).fetchone()
+                    if not still_idle:
+                        conn.rollback()
+                        continue
+                    
+                    rows = conn.execute(
+                        """
+                        SELECT id, role, content, timestamp, token_count
+                        FROM messages WHERE conversation_id = ?
+                        ORDER BY id ASC
+                        """,
+                        (conversation_id,)
+                    ).fetchall()
+                    payload = compress(json.dumps([tuple(row) for row in rows]).encode('utf-8'))
+                    
+                    conn.execute(
+                        """
+                        INSERT INTO archived_conversations (conversation_id, codec, payload, message_count)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        (conversation_id, self.archive_codec, payload, len(rows))
+                    )
+                    # O trigger tira as mensagens de messages_fts; o texto segue
+                    # pesquisável pelo índice das arquivadas
+                    if self.fts_enabled:
+                        self._index_archived(conn, conversation_id, [tuple(row) for row in rows])
+                    conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                
+                if self.cache:
+                    self.cache.invalidate(conversation_id)
+                archived += 1
+        
+        return archived
+    
+    def _rehydrate_if_archived(self, conn: sqlite3.Connection, conversation_id: str) -> bool:
+        """Restaura as mensagens de uma conversa arquivada (ids originais preservados)"""
+        row = conn.execute(
+            "SELECT codec, payload FROM archived_conversations WHERE conversation_id = ?",
+            (conversation_id,)
+        ).fetchone()
+        if not row:
+            return False
+        
+        messages = self._decode_archive(row)
+        
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Outra thread pode ter restaurado a conversa enquanto descomprimíamos
+            cursor = conn.execute(
+                "DELETE FROM archived_conversations WHERE conversation_id = ?",
+                (conversation_id,)
+            )
+            if cursor.rowcount:
+                if self.fts_enabled:
+                    self._unindex_archived(conn, conversation_id, messages)
+                conn.executemany(
+                    """
+                    INSERT INTO messages (id, conversation_id, role, content, timestamp, token_count)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    [(m[0], conversation_id, *m[1:]) for m in messages]
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        return bool(cursor.rowcount)
+    
+    @staticmethod
+    def _decode_archive(row: sqlite3.Row) -> List[list]:
+        """Mensagens [id, role, content, timestamp, token_count] de um blob arquivado"""
+        _, decompress = ARCHIVE_CODECS[row['codec']]
+        return json.loads(decompress(row['payload']).decode('utf-8'))
+    
+    def _index_archived(self, conn: sqlite3.Connection, conversation_id: str, messages: List):
+        """Inclui as mensagens arquivadas no índice de busca das arquivadas"""
+        conn.executemany(
+            "INSERT INTO archived_messages (id, conversation_id) VALUES (?, ?)",
+            [(m[0], conversation_id) for m in messages]
+        )
+        conn.executemany(
+            "INSERT INTO archived_fts (rowid, content) VALUES (?, ?)",
+            [(m[0], m[2]) for m in messages]
+        )
+    
+    def _unindex_archived(self, conn: sqlite3.Connection, conversation_id: str, messages: List):
+        """Remove as mensagens do índice das arquivadas (FTS sem conteúdo exige o texto original)"""
+        conn.execute("DELETE FROM archived_messages WHERE conversation_id = ?", (conversation_id,))
+        conn.executemany(
+            "INSERT INTO archived_fts (archived_fts, rowid, content) VALUES ('delete', ?, ?)",
+            [(m[0], m[2]) for m in messages]
+        )
+    
+    def enable_incremental_vacuum(self, max_bytes: Optional[int] = None) -> bool:
+        """
+        Converte um banco existente para auto_vacuum incremental (VACUUM completo)
+        
+        Feito uma única vez: bloqueia escritas enquanto o banco é reescrito.
+        
+        Args:
+            max_bytes: Não converte bancos maiores que isso (None = sem limite)
             
-            context_messages.insert(0, message)
-            current_tokens += message_tokens
+        Returns:
+            True se o banco foi convertido agora
+        """
+        with self._pool.connection() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            if max_bytes is not None:
+                pages = conn.execute("PRAGMA page_count").fetchone()[0]
+                if pages * conn.execute("PRAGMA page_size").fetchone()[0] > max_bytes:
+                    return False
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return True
+    
+    def incremental_vacuum(self, max_pages: Optional[int] = None) -> int:
+        """
+        Devolve ao sistema de arquivos páginas livres do banco
         
-        return context_messages
+        Args:
+            max_pages: Máximo de páginas liberadas (None = todas)
+            
+        Returns:
+            Número de páginas liberadas
+        """
+        with self._pool.connection() as conn:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # executescript executa o pragma até o fim; execute() libera só uma página
+            conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages or 0)});")
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            return before - after
+
+
+def _snippet(content: str, terms: List[str], width: int = 120) -> str:
+    """Trecho ao redor do primeiro termo encontrado, com o termo destacado"""
+    lowered = content.lower()
+    for term in terms:
+        start = lowered.find(term.lower())
+        if start >= 0:
+            end = start + len(term)
+            before = max(0, start - width // 2)
+            after = min(len(content), end + width // 2)
+            return (("…" if before else "") + content[before:start] + "**" + content[start:end] + "**"
+                    + content[end:after] + ("…" if after < len(content) else ""))
+    return content[:width] + ("…" if len(content) > width else "")
@@ -0,0 +1,179 @@
+"""
+Cache LRU em memória de históricos de conversa
+"""
+
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+
+class CachedMessage(NamedTuple):
+    """Mensagem armazenada no cache (ordenável por id)"""
+    id: int
+    role: str
+    content: str
+    timestamp: str
+    token_count: int
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "role": self.role,
+            "content": self.content,
+            "timestamp": self.timestamp
+        }
+
+
+# Custo aproximado da tupla + campos pequenos, além do texto em si
+_MESSAGE_OVERHEAD = 200
+
+
+def _message_size(message: CachedMessage) -> int:
+    return sys.getsizeof(message.content) + _MESSAGE_OVERHEAD
+
+
+class MessageCache:
+    """
+    LRU limitado por bytes com o histórico completo das conversas ativas
+
+    Leituras concorrentes com escritas usam begin_load/finish_load: um
+    histórico carregado do disco só entra no cache se nenhuma escrita na
+    mesma conversa aconteceu durante a leitura.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, List[CachedMessage]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Leituras em andamento por conversa e escritas ocorridas durante elas
+        self._loads: Dict[str, int] = {}
+        self._versions: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, conversation_id: str) -> Optional[List[CachedMessage]]:
+        """Retorna o histórico em cache (ou None) e atualiza a ordem LRU"""
+        with self._lock:
+            messages = self._entries.get(conversation_id)
+            if messages is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(conversation_id)
+            self.hits += 1
+            return list(messages)
+
+    def begin_load(self, conversation_id: str) -> int:
+        """Registra o início de uma leitura do disco; retorna a versão atual"""
+        with self._lock:
+            self._loads[conversation_id] = self._loads.get(conversation_id, 0) + 1
+            return self._versions.get(conversation_id, 0)
+
+    def finish_load(self, conversation_id: str, version: int,
+                    messages: Optional[List[CachedMessage]]) -> bool:
+        """Armazena o histórico lido se ele ainda estiver atualizado"""
+        with self._lock:
+            current = self._versions.get(conversation_id, 0)
+            self._loads[conversation_id] -= 1
+            if not self._loads[conversation_id]:
+                del self._loads[conversation_id]
+                self._versions.pop(conversation_id, None)
+
+            if messages is None or current != version:
+                return False
+            return self._store(conversation_id, list(messages))
+
+    def append(self, conversation_id: str, message: CachedMessage):
+        """Write-through: adiciona a mensagem se a conversa estiver em cache"""
+        with self._lock:
+            self._bump(conversation_id)
+
+            messages = self._entries.get(conversation_id)
+            if messages is None:
+                return
+
+            # Escritas concorrentes podem chegar fora de ordem, e uma leitura
+            # do disco feita após o commit pode já ter trazido a mensagem
+            if messages and messages[-1].id >= message.id:
+                index = bisect_left(messages, message.id, key=lambda m: m.id)
+                if index < len(messages) and messages[index].id == message.id:
+                    return
+                messages.insert(index, message)
+            else:
+                messages.append(message)
+
+            size = _message_size(message)
+            self._sizes[conversation_id] += size
+            self._bytes += size
+            self._entries.move_to_end(conversation_id)
+            self._evict()
+
+    def invalidate(self, conversation_id: str):
+        """Remove a conversa do cache"""
+        with self._lock:
+            self._bump(conversation_id)
+            self._remove(conversation_id)
+
+    def clear(self):
+        """Esvazia o cache"""
+        with self._lock:
+            for conversation_id in list(self._versions):
+                self._bump(conversation_id)
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Contadores para monitoramento"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "conversations": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _bump(self, conversation_id: str):
+        if conversation_id in self._loads:
+            self._versions[conversation_id] = self._versions.get(conversation_id, 0) + 1
+
+    def _store(self, conversation_id: str, messages: List[CachedMessage]) -> bool:
+        size = sum(_message_size(m) for m in messages)
+        # Conversas maiores que 1/4 do cache expulsariam todo o resto
+        if size > self.max_bytes // 4:
+            return False
+
+        self._remove(conversation_id)
+        self._entries[conversation_id] = messages
+        self._sizes[conversation_id] = size
+        self._bytes += size
+        self._evict()
+        return True
+
+    def _remove(self, conversation_id: str):
+        if self._entries.pop(conversation_id, None) is not None:
+            self._bytes -= self._sizes.pop(conversation_id)
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            conversation_id, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(conversation_id)
+            self.evictions += 1
+
+
+def slice_after(messages: List[CachedMessage], after_id: Optional[int]) -> List[CachedMessage]:
+    """Mensagens com id maior que after_id (lista ordenada por id)"""
+    if not after_id:
+        return messages
+    return messages[bisect_right(messages, after_id, key=lambda m: m.id):]
@@ -0,0 +1,163 @@
+"""
+Motor de recuperação BM25 sobre os trechos de código do projeto
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .search_index import tokenize
+
+
+class BM25Index:
+    """
+    Índice BM25 com matriz termo×trecho esparsa (uma coluna por termo)
+
+    Cada termo guarda suas postings (ids de trecho e frequências) como
+    arrays NumPy, recriados só quando o termo muda; a pontuação de uma
+    consulta é vetorizada sobre essas colunas. Ids de trechos removidos
+    são reaproveitados. Não é thread-safe: o ProjectIndexer serializa o acesso.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        # Metadados por id de trecho (None = id livre)
+        self._chunks: List[Optional[Tuple[str, Dict]]] = []
+        self._free: List[int] = []
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._total_length = 0.0
+        self._count = 0
+
+        # termo -> {id do trecho: frequência}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        # termo -> (ids, frequências) em arrays, invalidado quando o termo muda
+        self._columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # arquivo -> ids dos seus trechos
+        self._files: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add_file(self, path: str, chunks: List[Dict]):
+        """Indexa (ou reindexa) os trechos de um arquivo"""
+        self.remove_file(path)
+
+        ids = []
+        for chunk in chunks:
+            terms = chunk["terms"]
+            chunk_id = self._free.pop() if self._free else len(self._chunks)
+            if chunk_id == len(self._chunks):
+                self._chunks.append(None)
+                if chunk_id >= len(self._lengths):
+                    self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+
+            meta = {k: v for k, v in chunk.items() if k != "terms"}
+            # Termos guardados para a remoção incremental
+            meta["_terms"] = list(terms)
+            self._chunks[chunk_id] = (path, meta)
+            length = float(sum(terms.values()))
+            self._lengths[chunk_id] = length
+            self._total_length += length
+            self._count += 1
+
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[chunk_id] = tf
+                self._columns.pop(term, None)
+            ids.append(chunk_id)
+
+        self._files[path] = ids
+
+    def remove_file(self, path: str):
+        """Remove os trechos de um arquivo"""
+        ids = self._files.pop(path, None)
+        if not ids:
+            return
+
+        removed = set(ids)
+        terms = set()
+        for chunk_id in ids:
+            terms.update(self._chunk_terms(chunk_id))
+
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            for chunk_id in removed.intersection(posting):
+                del posting[chunk_id]
+            self._columns.pop(term, None)
+            if not posting:
+                del self._postings[term]
+
+        for chunk_id in ids:
+            self._total_length -= float(self._lengths[chunk_id])
+            self._lengths[chunk_id] = 0.0
+            self._chunks[chunk_id] = None
+            self._free.append(chunk_id)
+            self._count -= 1
+
+    def _chunk_terms(self, chunk_id: int) -> List[str]:
+        _, meta = self._chunks[chunk_id]
+        return meta["_terms"]
+
+    def clear(self):
+        self.__init__(self.k1, self.b)
+
+    def _column(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        column = self._columns.get(term)
+        if column is None:
+            posting = self._postings.get(term)
+            if not posting:
+                return None
+            column = (
+                np.fromiter(posting.keys(), dtype=np.int32, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float32, count=len(posting))
+            )
+            self._columns[term] = column
+        return column
+
+    def search(self, query: str, k: int = 5) -> List[Dict]:
+        """
+        Trechos mais relevantes para a consulta
+
+        Returns:
+            Lista de {"path", "name", "kind", "line", "end_line", "score"}
+        """
+        if not self._count:
+            return []
+
+        terms = {t for t in tokenize(query) if len(t) > 1}
+        columns = [(t, c) for t in terms if (c := self._column(t)) is not None]
+        if not columns:
+            return []
+
+        n = self._count
+        avg_length = self._total_length / n if n else 1.0
+        ids_parts, weight_parts = [], []
+        for _, (ids, tf) in columns:
+            df = len(ids)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[ids] / avg_length)
+            ids_parts.append(ids)
+            weight_parts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        scores = np.bincount(
+            np.concatenate(ids_parts),
+            weights=np.concatenate(weight_parts),
+            minlength=len(self._chunks)
+        )
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = []
+        for chunk_id in candidates:
+            path, meta = self._chunks[chunk_id]
+            result = {key: value for key, value in meta.items() if not key.startswith("_")}
+            result.update(path=path, score=round(float(scores[chunk_id]), 4))
+            results.append(result)
+        return results
@@ -0,0 +1,91 @@
+"""
+Divisão de arquivos em trechos (chunks) do tamanho de funções e classes
+"""
+
+from collections import Counter
+from typing import Dict, List
+
+from .search_index import tokenize
+
+# Definições maiores que isso são divididas nos seus membros
+MAX_CHUNK_LINES = 80
+# Tamanho das janelas para código fora de definições
+WINDOW_LINES = 40
+
+
+def chunk_terms(text: str, name: str = "") -> Dict[str, int]:
+    """Frequência dos termos de um trecho; tokens do nome da definição ganham peso extra"""
+    terms = Counter(t for t in tokenize(text) if len(t) > 1)
+    for token in tokenize(name):
+        if len(token) > 1:
+            terms[token] += 1
+    return dict(terms)
+
+
+def chunk_file(content: str, definitions: List[Dict]) -> List[Dict]:
+    """
+    Divide um arquivo em trechos a partir das definições extraídas
+
+    Funções e classes pequenas viram um trecho cada; classes grandes são
+    divididas em cabeçalho + métodos; o código restante (imports, código de
+    módulo) vira janelas de até WINDOW_LINES linhas.
+
+    Returns:
+        Lista de {"name", "kind", "line", "end_line", "terms"} (linhas 1-based)
+    """
+    lines = content.splitlines()
+    chunks: List[Dict] = []
+
+    def add(start: int, end: int, name: str, kind: str):
+        end = min(end, len(lines))
+        if start > end:
+            return
+        text = "\n".join(lines[start - 1:end])
+        if not text.strip():
+            return
+        chunks.append({
+            "name": name,
+            "kind": kind,
+            "line": start,
+            "end_line": end,
+            "terms": chunk_terms(text, name)
+        })
+
+    def add_windows(start: int, end: int, name: str, kind: str):
+        for window_start in range(start, end + 1, WINDOW_LINES):
+            add(window_start, min(window_start + WINDOW_LINES - 1, end), name, kind)
+
+    # Árvore de definições por contenção de linhas
+    nodes = [dict(d, children=[]) for d in sorted(definitions, key=lambda d: (d["line"], -d["end_line"]))]
+    roots: List[Dict] = []
+    stack: List[Dict] = []
+    for node in nodes:
+        while stack and node["line"] > stack[-1]["end_line"]:
+            stack.pop()
+        (stack[-1]["children"] if stack else roots).append(node)
+        stack.append(node)
+
+    def emit_range(start: int, end: int, children: List[Dict], name: str, kind: str):
+        """Emite os filhos e janelas para as lacunas entre eles"""
+        cursor = start
+        for child in children:
+            if child["line"] > cursor:
+                add_windows(cursor, child["line"] - 1, name, kind)
+            emit(child)
+            cursor = max(cursor, child["end_line"] + 1)
+        if cursor <= end:
+            add_windows(cursor, end, name, kind)
+
+    def emit(node: Dict):
+        size = node["end_line"] - node["line"] + 1
+        if size <= MAX_CHUNK_LINES:
+            add(node["line"], node["end_line"], node["qualname"], node["kind"])
+        elif not node["children"]:
+            add_windows(node["line"], node["end_line"], node["qualname"], node["kind"])
+        else:
+            # Cabeçalho (assinatura, docstring, atributos) fica com o nome da definição
+            emit_range(node["line"], node["end_line"], node["children"], node["qualname"], node["kind"])
+
+    emit_range(1, len(lines), roots, "", "module")
+    return chunks
+
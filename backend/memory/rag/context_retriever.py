@@ -0,0 +1,113 @@
+"""
+Recuperação automática de contexto do projeto antes de chamar o LLM
+"""
+
+from typing import Dict, List, Optional
+
+from backend.memory.conversation_manager import estimate_tokens
+from .project_indexer import ProjectIndexer
+
+# Constante da fusão por posição (reciprocal rank fusion)
+RRF_K = 60
+
+
+class ContextRetriever:
+    """
+    Busca trechos relevantes para a mensagem do usuário e os formata para o
+    prompt, dentro de um orçamento de tokens e sem repetir código já citado
+    nas mensagens do histórico
+
+    Blocos injetados e resultados de ferramentas não são gravados no
+    histórico, então somem do prompt no turno seguinte; por isso um trecho
+    relevante é injetado de novo a cada turno em que for recuperado.
+    """
+
+    HEADER = "Trechos do projeto possivelmente relevantes (recuperados automaticamente):"
+
+    def __init__(
+        self,
+        indexer: ProjectIndexer,
+        max_tokens: int = 1500,
+        top_k: int = 5,
+        min_bm25_score: float = 2.0,
+        min_similarity: float = 0.25
+    ):
+        """
+        Args:
+            indexer: Índice do projeto
+            max_tokens: Orçamento de tokens para os trechos injetados
+            top_k: Máximo de trechos
+            min_bm25_score: Score BM25 mínimo para um trecho ser considerado
+            min_similarity: Similaridade mínima (embeddings) para ser considerado
+        """
+        self.indexer = indexer
+        self.max_tokens = max_tokens
+        self.top_k = top_k
+        self.min_bm25_score = min_bm25_score
+        self.min_similarity = min_similarity
+
+    def _candidates(self, query: str) -> List[Dict]:
+        """Une BM25 e busca semântica por posição (RRF)"""
+        pool = self.top_k * 2
+        ranked: Dict[tuple, Dict] = {}
+        for results, min_score in (
+            (self.indexer.retrieve_chunks(query, pool, with_code=False), self.min_bm25_score),
+            (self.indexer.semantic_search(query, pool, with_code=False), self.min_similarity),
+        ):
+            for rank, result in enumerate(r for r in results if r["score"] >= min_score):
+                key = (result["path"], result["line"])
+                entry = ranked.setdefault(key, dict(result, fused=0.0))
+                entry["fused"] += 1.0 / (RRF_K + rank)
+
+        return sorted(ranked.values(), key=lambda r: -r["fused"])
+
+    def retrieve(self, query: str, history: List[str]) -> Optional[str]:
+        """
+        Monta o bloco de contexto para a mensagem
+
+        Args:
+            query: Mensagem do usuário
+            history: Conteúdo das mensagens do histórico que vão no prompt
+
+        Returns:
+            Texto a injetar como mensagem de sistema, ou None
+        """
+        if not self.indexer.loaded or self.max_tokens <= 0:
+            return None
+
+        candidates = self._candidates(query)
+        if not candidates:
+            return None
+        self.indexer.attach_code(candidates)
+
+        budget = self.max_tokens - estimate_tokens(self.HEADER)
+        selected: List[Dict] = []
+        parts = [self.HEADER]
+        for chunk in candidates:
+            code = chunk["code"].strip()
+            location = f"{chunk['path']}:{chunk['line']}-{chunk['end_line']}"
+            if not code:
+                continue
+            # Código já citado literalmente numa mensagem que vai no prompt
+            if any(code in text for text in history):
+                continue
+            # Trechos sobrepostos do mesmo arquivo
+            if any(s["path"] == chunk["path"] and s["line"] <= chunk["end_line"]
+                   and chunk["line"] <= s["end_line"] for s in selected):
+                continue
+
+            label = f" ({chunk['kind']} {chunk['name']})" if chunk["name"] else ""
+            part = f"# {location}{label}\n```\n{code}\n```"
+            cost = estimate_tokens(part)
+            if cost > budget:
+                continue
+
+            budget -= cost
+            selected.append(chunk)
+            parts.append(part)
+            if len(selected) >= self.top_k:
+                break
+
+        if not selected:
+            return None
+        return "\n\n".join(parts)
@@ -0,0 +1,383 @@
+"""
+Índice semântico local: embeddings de n-gramas com hashing, sem rede
+
+Cada trecho (chunk) do índice do projeto vira um vetor float32 de dimensão
+fixa, gravado numa matriz memory-mapped em `.brain/embeddings/`. A busca é
+força bruta (produto matricial) ou, em repositórios grandes, IVF: os vetores
+são agrupados por k-means e a consulta só visita os grupos mais próximos.
+"""
+
+import json
+import math
+import os
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .search_index import tokenize
+
+EMBEDDING_VERSION = 1
+EMBEDDING_DIM = 256
+
+# A partir de quantos vetores vale treinar o IVF
+IVF_MIN_ROWS = 50000
+# Grupos visitados por consulta no modo IVF
+IVF_NPROBE = 8
+# Vetores usados para treinar o k-means
+IVF_SAMPLE = 32768
+IVF_ITERATIONS = 10
+
+# Trechos com menos termos que isso (ex: duas linhas de HTML) não são indexados:
+# vetores quase vazios têm cosseno alto com qualquer consulta que os toque
+MIN_CHUNK_TERMS = 8
+
+# Peso do bloco de trigramas de caracteres em relação ao termo inteiro
+TRIGRAM_WEIGHT = 0.5
+
+
+@lru_cache(maxsize=200000)
+def _term_features(term: str, dim: int) -> Tuple[Tuple[int, float], ...]:
+    """Posições e pesos (com sinal) de um termo e dos seus trigramas"""
+    padded = f"<{term}>"
+    trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+    # Trigramas aproximam variações (compress/compression); norma do bloco ~ TRIGRAM_WEIGHT
+    trigram_weight = TRIGRAM_WEIGHT / math.sqrt(len(trigrams))
+
+    features = []
+    for gram, weight in [(term, 1.0)] + [(t, trigram_weight) for t in trigrams]:
+        # crc32 é estável entre processos (hash() do Python não é)
+        h = zlib.crc32(gram.encode('utf-8'))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        features.append((h % dim, sign * weight))
+    return tuple(features)
+
+
+def embed_terms(terms: Dict[str, int], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Vetor normalizado de um saco de termos (frequência sublinear)"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for term, tf in terms.items():
+        scale = 1.0 + math.log(tf)
+        for index, weight in _term_features(term, dim):
+            vector[index] += weight * scale
+    norm = float(np.linalg.norm(vector))
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def embed_text(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    terms: Dict[str, int] = {}
+    for token in tokenize(text):
+        if len(token) > 1:
+            terms[token] = terms.get(token, 0) + 1
+    return embed_terms(terms, dim)
+
+
+class EmbeddingIndex:
+    """
+    Matriz de embeddings dos trechos, sincronizada com o manifesto do índice
+
+    Linhas de arquivos removidos ou alterados são liberadas e reaproveitadas.
+    Não é thread-safe: o ProjectIndexer serializa o acesso.
+    """
+
+    def __init__(self, directory: Path, dim: int = EMBEDDING_DIM,
+                 ivf_min_rows: int = IVF_MIN_ROWS, nprobe: int = IVF_NPROBE):
+        self.directory = Path(directory)
+        self.dim = dim
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+
+        self.vectors_file = self.directory / "vectors.f32"
+        self.meta_file = self.directory / "meta.json"
+        self.ivf_file = self.directory / "ivf.npz"
+
+        self._reset()
+
+    def _reset(self):
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._free: List[int] = []
+        # arquivo -> {"hash", "rows"} (linha de cada chunk, -1 se não indexado)
+        self._files: Dict[str, Dict] = {}
+        # linha -> (arquivo, posição do chunk)
+        self._owners: Dict[int, Tuple[str, int]] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_rows = 0
+        # Linhas já usadas no arquivo (as livres entre elas ficam em _free)
+        self._next_row = 0
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    @property
+    def mode(self) -> str:
+        return "ivf" if self._centroids is not None else "brute"
+
+    # --- armazenamento ---------------------------------------------------
+
+    def _grow(self, rows: int):
+        """Garante capacidade para `rows` linhas (dobra o arquivo mapeado)"""
+        if rows <= self._capacity:
+            return
+        capacity = max(1024, self._capacity)
+        while capacity < rows:
+            capacity *= 2
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self.vectors_file, 'ab') as f:
+            f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(self.vectors_file, dtype=np.float32, mode='r+',
+                                  shape=(capacity, self.dim))
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._alive = alive
+        assign = np.full(capacity, -1, dtype=np.int32)
+        assign[:len(self._assign)] = self._assign
+        self._assign = assign
+        self._capacity = capacity
+
+    def load(self) -> bool:
+        """Abre a matriz persistida; retorna False se não existe ou é incompatível"""
+        self._reset()
+        try:
+            with open(self.meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get("version") != EMBEDDING_VERSION or meta.get("dim") != self.dim:
+            return False
+        expected_size = meta["capacity"] * self.dim * 4
+        if not self.vectors_file.exists() or self.vectors_file.stat().st_size < expected_size:
+            return False
+
+        self._capacity = meta["capacity"]
+        self._vectors = np.memmap(self.vectors_file, dtype=np.float32, mode='r+',
+                                  shape=(self._capacity, self.dim))
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        self._assign = np.full(self._capacity, -1, dtype=np.int32)
+        self._files = meta["files"]
+        for path, info in self._files.items():
+            for position, row in enumerate(info["rows"]):
+                if row >= 0:
+                    self._owners[row] = (path, position)
+                    self._alive[row] = True
+        used = set(self._owners)
+        self._free = [row for row in range(meta["rows"]) if row not in used]
+        self._next_row = meta["rows"]
+
+        if self.ivf_file.exists():
+            try:
+                ivf = np.load(self.ivf_file)
+                self._centroids = ivf["centroids"]
+                assign = ivf["assign"]
+                self._assign[:len(assign)] = assign[:self._capacity]
+                self._trained_rows = int(ivf["trained_rows"])
+            except (OSError, ValueError, KeyError):
+                self._centroids = None
+        return True
+
+    def save(self):
+        """Persiste o mapa de linhas (os vetores já estão no arquivo mapeado)"""
+        state = self.snapshot()
+        if state is not None:
+            self.write(state)
+
+    def snapshot(self) -> Optional[Dict]:
+        """
+        Cópia do que `write` grava, ou None se nada mudou
+
+        É barata e deve ser tirada sob o lock do indexador; a gravação
+        pode rodar depois, fora dele.
+        """
+        if not self._dirty:
+            return None
+        self._dirty = False
+        state = {
+            "vectors": self._vectors,
+            "meta": {
+                "version": EMBEDDING_VERSION,
+                "dim": self.dim,
+                "capacity": self._capacity,
+                "rows": self._next_row,
+                "files": dict(self._files)
+            },
+            "ivf": None
+        }
+        if self._centroids is not None:
+            state["ivf"] = {
+                "centroids": self._centroids,
+                "assign": self._assign[:self._next_row].copy(),
+                "trained_rows": self._trained_rows
+            }
+        return state
+
+    def mark_dirty(self):
+        """Força a próxima gravação (ex: após um `write` que falhou)"""
+        self._dirty = True
+
+    def write(self, state: Dict):
+        """Grava um `snapshot`"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if state["vectors"] is not None:
+            state["vectors"].flush()
+
+        tmp_file = self.meta_file.with_suffix(".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state["meta"], f, separators=(',', ':'))
+        os.replace(tmp_file, self.meta_file)
+
+        if state["ivf"] is not None:
+            with open(self.ivf_file, 'wb') as f:
+                np.savez(f, **state["ivf"])
+        elif self.ivf_file.exists():
+            self.ivf_file.unlink()
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        row = self._next_row
+        self._grow(row + 1)
+        self._next_row = row + 1
+        return row
+
+    # --- atualização incremental -----------------------------------------
+
+    def has_file(self, path: str, content_hash: Optional[str]) -> bool:
+        info = self._files.get(path)
+        return info is not None and info["hash"] == content_hash
+
+    def add_file(self, path: str, content_hash: Optional[str], chunks: List[Dict]):
+        """(Re)calcula os embeddings dos trechos de um arquivo"""
+        if self.has_file(path, content_hash):
+            return
+        self.remove_file(path)
+
+        rows = []
+        for position, chunk in enumerate(chunks):
+            if sum(chunk["terms"].values()) < MIN_CHUNK_TERMS:
+                rows.append(-1)
+                continue
+            row = self._allocate()
+            self._vectors[row] = embed_terms(chunk["terms"], self.dim)
+            self._alive[row] = True
+            self._owners[row] = (path, position)
+            if self._centroids is not None:
+                self._assign[row] = int(np.argmax(self._centroids @ self._vectors[row]))
+            rows.append(row)
+
+        self._files[path] = {"hash": content_hash, "rows": rows}
+        self._dirty = True
+
+    def remove_file(self, path: str):
+        info = self._files.pop(path, None)
+        if not info:
+            return
+        for row in info["rows"]:
+            if row < 0:
+                continue
+            self._alive[row] = False
+            self._assign[row] = -1
+            self._owners.pop(row, None)
+            self._free.append(row)
+        self._dirty = True
+
+    def sync(self, files: Dict[str, Dict]):
+        """Alinha a matriz com o manifesto: só arquivos novos/alterados são recalculados"""
+        for path in list(self._files):
+            if path not in files:
+                self.remove_file(path)
+        for path, entry in files.items():
+            self.add_file(path, entry.get("hash"), entry.get("chunks", []))
+
+    def maintain(self):
+        """Treina (ou retreina) o IVF quando o índice cresce o bastante"""
+        rows = len(self._owners)
+        if rows < self.ivf_min_rows:
+            if self._centroids is not None:
+                self._centroids = None
+                self._assign[:] = -1
+                self._dirty = True
+            return
+        if self._centroids is not None and rows < 2 * self._trained_rows:
+            return
+        self._train_ivf()
+        self._dirty = True
+
+    def _train_ivf(self):
+        """k-means esférico sobre uma amostra; depois atribui todas as linhas"""
+        alive_rows = np.flatnonzero(self._alive[:self._next_row])
+        n_lists = int(min(4096, max(16, math.sqrt(len(alive_rows)))))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(alive_rows, size=min(IVF_SAMPLE, len(alive_rows)), replace=False))
+        sample = np.asarray(self._vectors[sample_rows])
+
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(IVF_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            centroids = np.where(empty[:, None], centroids, sums / np.maximum(norms, 1e-12))
+
+        self._centroids = centroids.astype(np.float32)
+        self._assign[:] = -1
+        for start in range(0, len(alive_rows), 65536):
+            batch = alive_rows[start:start + 65536]
+            self._assign[batch] = np.argmax(np.asarray(self._vectors[batch]) @ self._centroids.T, axis=1)
+        self._trained_rows = len(alive_rows)
+
+    # --- busca -------------------------------------------------------------
+
+    def search(self, query: str, k: int = 5, mode: str = "auto") -> List[Tuple[str, int, float]]:
+        """
+        Trechos mais próximos da consulta
+
+        Args:
+            mode: "auto" (IVF se treinado), "brute" ou "ivf"
+
+        Returns:
+            Lista de (arquivo, posição do chunk, similaridade)
+        """
+        if not self._owners:
+            return []
+        q = embed_text(query, self.dim)
+        if not q.any():
+            return []
+
+        used = self._next_row
+        if mode != "brute" and self._centroids is not None:
+            probes = np.argsort(-(self._centroids @ q))[:self.nprobe]
+            rows = np.flatnonzero(np.isin(self._assign[:used], probes))
+            scores = np.asarray(self._vectors[rows]) @ q
+        else:
+            # Produto sobre o bloco contíguo é mais rápido que indexar linhas soltas
+            rows = np.flatnonzero(self._alive[:used])
+            scores = (np.asarray(self._vectors[:used]) @ q)[rows]
+        if not len(rows):
+            return []
+
+        if len(rows) > k:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        results = []
+        for i in top:
+            if scores[i] <= 0:
+                continue
+            path, position = self._owners[int(rows[i])]
+            results.append((path, position, round(float(scores[i]), 4)))
+        return results
@@ -0,0 +1,289 @@
+"""
+Observação do sistema de arquivos para manter o índice do projeto atualizado
+
+Usa inotify (Linux, via ctypes) quando disponível e cai para polling de
+tamanho/mtime nos demais casos. Eventos são agrupados (debounce) antes de
+virar uma atualização incremental do ProjectIndexer.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from .project_walker import ProjectWalker
+from .project_indexer import ProjectIndexer, INDEXED_EXTENSIONS
+
+# Evento especial: o backend perdeu eventos e o projeto precisa ser reindexado
+RESCAN = None
+
+
+class PollingBackend:
+    """Compara periodicamente tamanho e mtime dos arquivos indexáveis"""
+
+    name = "polling"
+
+    def __init__(self, root: Path, interval: float = 2.0, walker: Optional[ProjectWalker] = None):
+        self.root = root
+        self.interval = interval
+        self.walker = walker or ProjectWalker(root)
+
+    def _snapshot(self) -> Dict[str, tuple]:
+        return {
+            path: (stat.st_size, stat.st_mtime_ns)
+            for path, _, stat in self.walker.files(INDEXED_EXTENSIONS)
+        }
+
+    def run(self, emit: Callable[[Optional[str]], None], stop: threading.Event):
+        previous = self._snapshot()
+        while not stop.wait(self.interval):
+            current = self._snapshot()
+            for path in current.keys() | previous.keys():
+                if current.get(path) != previous.get(path):
+                    emit(path)
+            previous = current
+
+
+class InotifyBackend:
+    """Observa os diretórios do projeto com inotify (somente Linux)"""
+
+    name = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                  IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR)
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root: Path, walker: Optional[ProjectWalker] = None):
+        self.root = root
+        self.walker = walker or ProjectWalker(root)
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify indisponível")
+
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self._watches: Dict[int, str] = {}
+
+        try:
+            self._watch_tree(str(root))
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _watch_tree(self, top: str, emit: Optional[Callable] = None):
+        """Adiciona watches recursivamente (inotify não é recursivo)"""
+        for dirpath, files in self.walker.walk(top):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOENT, errno.ENOTDIR):
+                    continue
+                # ENOSPC: limite de fs.inotify.max_user_watches
+                raise OSError(err, f"inotify_add_watch falhou em {dirpath}")
+            self._watches[wd] = dirpath
+
+            # Arquivos criados antes do watch existir (ex: mkdir -p && cp)
+            if emit:
+                for entry in files:
+                    emit(entry.path)
+
+    def run(self, emit: Callable[[Optional[str]], None], stop: threading.Event):
+        try:
+            while not stop.is_set():
+                ready, _, _ = select.select([self._fd], [], [], 0.5)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._dispatch(data, emit)
+        finally:
+            os.close(self._fd)
+
+    def _dispatch(self, data: bytes, emit: Callable[[Optional[str]], None]):
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                emit(RESCAN)
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+
+            if mask & self.IN_ISDIR:
+                if self.walker.is_ignored(os.path.relpath(path, self.root), is_dir=True):
+                    continue
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        self._watch_tree(path, emit)
+                    except OSError:
+                        emit(RESCAN)
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    # Arquivos do diretório removido saem do índice numa reindexação
+                    emit(RESCAN)
+                continue
+
+            emit(path)
+
+
+class FileWatcher:
+    """
+    Observa o projeto e aplica as mudanças no índice em lotes
+
+    Outros componentes recebem os lotes aplicados via `subscribe()`.
+    """
+
+    def __init__(
+        self,
+        indexer: ProjectIndexer,
+        debounce: float = 0.5,
+        max_delay: float = 5.0,
+        backend: str = "auto",
+        poll_interval: float = 2.0
+    ):
+        """
+        Args:
+            indexer: Indexador a atualizar
+            debounce: Segundos sem eventos antes de aplicar um lote
+            max_delay: Atraso máximo de um lote sob escrita contínua
+            backend: "auto", "inotify" ou "polling"
+            poll_interval: Intervalo do backend de polling
+        """
+        self.indexer = indexer
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.backend_name = backend
+        self.poll_interval = poll_interval
+        self.backend = None
+
+        self._pending: Set[Optional[str]] = set()
+        self._first_event_at: Optional[float] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing = False
+        self._stop = threading.Event()
+        self._subscribers: List[asyncio.Queue] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _create_backend(self):
+        root = self.indexer.project_root
+        if self.backend_name in ("auto", "inotify"):
+            try:
+                return InotifyBackend(root, self.indexer.walker)
+            except (OSError, AttributeError) as e:
+                if self.backend_name == "inotify":
+                    raise
+                print(f"⚠️ inotify indisponível ({e}); usando polling")
+        return PollingBackend(root, self.poll_interval, self.indexer.walker)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Fila que recebe {"type": "files_changed", "paths", "stats"} a cada lote"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    async def run(self):
+        """Observa até ser cancelado"""
+        self._loop = asyncio.get_running_loop()
+        self._stop.clear()
+        self.backend = await asyncio.to_thread(self._create_backend)
+        print(f"👀 Observando alterações no projeto ({self.backend.name})")
+        try:
+            await asyncio.to_thread(self.backend.run, self._emit, self._stop)
+        finally:
+            self._stop.set()
+            if self._timer:
+                self._timer.cancel()
+
+    def stop(self):
+        self._stop.set()
+
+    def _emit(self, path: Optional[str]):
+        """Chamado pela thread do backend para cada evento"""
+        if path is not RESCAN and self.indexer.relative_path(path) is None:
+            return
+        self._loop.call_soon_threadsafe(self._add_event, path)
+
+    def _add_event(self, path: Optional[str]):
+        now = self._loop.time()
+        if self._first_event_at is None:
+            self._first_event_at = now
+        self._pending.add(path)
+        self._schedule(min(now + self.debounce, self._first_event_at + self.max_delay))
+
+    def _schedule(self, when: float):
+        if self._timer:
+            self._timer.cancel()
+        self._timer = self._loop.call_at(when, lambda: asyncio.ensure_future(self._flush()))
+
+    async def _flush(self):
+        """Aplica o lote pendente ao índice e notifica os assinantes"""
+        # Um lote por vez; a indexação inicial já vai ver estes arquivos
+        if self._flushing or self.indexer.status["state"] == "indexing":
+            self._schedule(self._loop.time() + self.debounce)
+            return
+
+        paths, self._pending = self._pending, set()
+        self._first_event_at = None
+        self._timer = None
+        if not paths:
+            return
+
+        self._flushing = True
+        try:
+            if RESCAN in paths:
+                stats = await asyncio.to_thread(self.indexer.index_project)
+                paths.discard(RESCAN)
+            else:
+                stats = await asyncio.to_thread(self.indexer.update_files, paths)
+        except Exception as e:
+            print(f"Erro ao atualizar índice: {e}")
+            return
+        finally:
+            self._flushing = False
+
+        relative = sorted(filter(None, (self.indexer.relative_path(p) for p in paths)))
+        self.publish({"type": "files_changed", "paths": relative, "stats": stats})
+
+    def publish(self, event: Dict):
+        """Entrega um evento a todos os assinantes (descarta se a fila estiver cheia)"""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass
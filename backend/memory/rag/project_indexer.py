@@ -1,80 +1,726 @@
 import os
 import json
-import re
+import hashlib
+import struct
+import zlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from backend.process_context import process_context
+from .project_walker import ProjectWalker
+from .bm25 import BM25Index
+from .chunker import chunk_file
+from .embedding_index import EmbeddingIndex
+from .reference_extractor import extract_references
+from .reference_graph import ReferenceGraph
+from .search_index import SearchIndex
+from .symbol_extractor import extract_symbols
+
+
+# Versão do formato do índice; índices de outra versão são refeitos do zero
+INDEX_VERSION = 6
+
+# Cabeçalho do arquivo binário: assinatura, versão e geração (incrementada a cada gravação)
+INDEX_MAGIC = b"PIDX"
+INDEX_HEADER = struct.Struct("<4sHQ")
+
+INDEXED_EXTENSIONS = ('.py', '.js', '.html', '.css', '.rs', '.go', '.ts')
+
+# Segundos entre uma atualização incremental e a gravação do índice; as
+# alterações que chegam nesse intervalo saem numa única gravação
+SAVE_DELAY = 2.0
+
+# Abaixo disso o custo de subir processos supera o ganho
+PARALLEL_MIN_FILES = 256
+# Arquivos por tarefa enviada a um processo do pool
+SHARD_SIZE = 64
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _scan_file(file_path: str, relative_path: str, previous_hash: Optional[str]) -> Dict[str, Any]:
+    """
+    Lê um arquivo e extrai seus símbolos (função pura, roda em processos do pool)
+
+    Returns:
+        Entrada do manifesto; sem a chave "symbols" se o conteúdo não mudou
+    """
+    with open(file_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+
+    digest = _content_hash(data)
+    scanned = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": digest}
+    if digest == previous_hash:
+        return scanned
+
+    content = data.decode('utf-8', errors='replace')
+
+    # Símbolos só são extraídos de novo quando o hash muda
+    definitions = extract_symbols(file_path, content)
+    scanned["symbols"] = sorted({d["name"] for d in definitions})
+    scanned["definitions"] = definitions
+    scanned["chunks"] = chunk_file(content, definitions)
+    # Imports resolvidos pelo caminho relativo (pacote / diretório do arquivo)
+    scanned["references"] = extract_references(relative_path, content)
+    return scanned
+
+
+def _pack_terms(files: Dict[str, Dict]) -> Tuple[List[str], Dict[str, Dict]]:
+    """
+    Cópia de `files` com os termos dos trechos compactados para gravação
+
+    Cada trecho guarda [id, frequência, id, frequência, ...] sobre um
+    vocabulário comum, em vez de repetir o texto dos termos em todo trecho.
+
+    Returns:
+        (vocabulário, arquivos)
+    """
+    vocab: Dict[str, int] = {}
+    packed = {}
+    for path, entry in files.items():
+        chunks = []
+        for chunk in entry.get("chunks", []):
+            flat = []
+            for term, tf in chunk["terms"].items():
+                flat.append(vocab.setdefault(term, len(vocab)))
+                flat.append(tf)
+            chunks.append(dict(chunk, terms=flat))
+        packed[path] = dict(entry, chunks=chunks)
+    return list(vocab), packed
+
+
+def _unpack_terms(vocab: List[str], files: Dict[str, Dict]):
+    """Desfaz `_pack_terms` nos trechos carregados do disco"""
+    for entry in files.values():
+        for chunk in entry.get("chunks", []):
+            flat = chunk["terms"]
+            chunk["terms"] = {vocab[term_id]: tf for term_id, tf in zip(flat[::2], flat[1::2])}
+
+
+def _scan_batch(batch: List[Tuple[str, str, Optional[str]]]) -> List[Tuple[str, Optional[Dict], Optional[str]]]:
+    """Analisa um lote de (caminho, caminho relativo, hash anterior)"""
+    results = []
+    for file_path, relative_path, previous_hash in batch:
+        try:
+            results.append((relative_path, _scan_file(file_path, relative_path, previous_hash), None))
+        except Exception as e:
+            results.append((relative_path, None, str(e)))
+    return results
 
 
 class ProjectIndexer:
     """Indexador leve de projeto para busca de símbolos e contexto"""
 
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, workers: int = 0, walker: Optional[ProjectWalker] = None,
+                 save_delay: float = SAVE_DELAY):
+        """
+        Args:
+            project_root: Raiz do projeto
+            workers: Processos para indexação paralela (0 = número de CPUs)
+            walker: Varredura de arquivos (padrão: respeita .gitignore)
+            save_delay: Segundos para agrupar gravações de `update_files` (0 = grava na hora)
+        """
         self.project_root = Path(project_root)
-        self.index_file = self.project_root / ".brain" / "project_index.json"
+        self.workers = workers
+        self.save_delay = save_delay
+        self.walker = walker or ProjectWalker(project_root)
+        # O antigo project_index.json (só símbolos, sem manifesto) é ignorado:
+        # a primeira indexação refaz tudo
+        self.index_file = self.project_root / ".brain" / "project_index.bin"
         self.index_file.parent.mkdir(parents=True, exist_ok=True)
-        self.index = {
-            "files": {},
-            "symbols": {} # {name: [file_paths]}
+        self.index = self._empty_index()
+        # Geração do arquivo em disco que corresponde ao índice em memória
+        self._generation = 0
+        # Índice invertido/trigramas, derivado de self.index (não persistido)
+        self.search_index = SearchIndex()
+        # BM25 sobre trechos de funções/classes, também derivado de self.index
+        self.chunk_index = BM25Index()
+        # Embeddings locais dos mesmos trechos, em matriz memory-mapped
+        self.embeddings = EmbeddingIndex(self.project_root / ".brain" / "embeddings")
+        # Imports, chamadas e usos por arquivo, com índices reversos
+        self.reference_graph = ReferenceGraph()
+        self._loaded = False
+        self._dirty = False
+        # Protege self.index: buscas podem rodar enquanto outra thread indexa
+        self._lock = threading.RLock()
+        # Serializa leitura e gravação do arquivo, que não seguram self._lock
+        self._io_lock = threading.Lock()
+        # Gravação agendada por update_files
+        self._save_timer: Optional[threading.Timer] = None
+        self._status = {
+            "state": "idle",  # idle | indexing | ready | error
+            "files_processed": 0,
+            "started_at": None,
+            "finished_at": None,
+            "last_run": None,
+            "error": None
         }
 
-    def index_project(self):
-        """Escaneia todo o projeto e cria o índice"""
-        for root, dirs, files in os.walk(self.project_root):
-            # Ignorar diretórios irrelevantes
-            if any(p in root for p in [".git", "__pycache__", "node_modules", ".brain", "venv", ".next"]):
-                continue
+    @staticmethod
+    def _empty_index() -> Dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "files": {},  # {path: {size, mtime, hash, symbols, definitions, chunks, references}}
+            "symbols": {} # {name: [file_paths]} (derivado de files, não é gravado)
+        }
+
+    @property
+    def loaded(self) -> bool:
+        """Indica se o índice já foi carregado do disco ou construído"""
+        return self._loaded
 
-            for file in files:
-                if file.endswith(('.py', '.js', '.html', '.css', '.rs', '.go', '.ts')):
-                    file_path = Path(root) / file
-                    relative_path = os.path.relpath(file_path, self.project_root)
-                    self._index_file(file_path, relative_path)
-        
-        self.save_index()
+    @property
+    def status(self) -> Dict[str, Any]:
+        """Progresso e prontidão da indexação"""
+        with self._lock:
+            return dict(self._status, files_indexed=len(self.index["files"]))
 
-    def _index_file(self, file_path: Path, relative_path: str):
-        """Analisa um arquivo e extrai símbolos"""
+    def _set_status(self, **changes):
+        with self._lock:
+            self._status.update(changes)
+
+    def _add_processed(self, count: int = 1):
+        # /health lê o status de outra thread
+        with self._lock:
+            self._status["files_processed"] += count
+
+    def index_project(self) -> Dict[str, int]:
+        """
+        Atualiza o índice incrementalmente
+
+        Arquivos com mesmo tamanho e mtime do manifesto não são relidos; os
+        demais só são reanalisados se o hash do conteúdo mudou. Arquivos que
+        sumiram do disco têm seus símbolos removidos. Com muitos arquivos a
+        analisar, o trabalho é dividido entre processos (ver `workers`).
+
+        Returns:
+            Contagem de arquivos adicionados, atualizados, removidos e inalterados
+        """
+        started = time.time()
+        self._set_status(state="indexing", files_processed=0, started_at=started,
+                         finished_at=None, error=None)
         try:
-            content = file_path.read_text(encoding='utf-8', errors='replace')
-            
-            # Regex simples para símbolos (funções e classes)
-            # Python
-            symbols = re.findall(r'(?:def|class)\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
-            # JS
-            symbols += re.findall(r'(?:function|class|const|let)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*[:=]', content)
-
-            self.index["files"][relative_path] = {
-                "size": file_path.stat().st_size,
-                "symbols": list(set(symbols)),
-                "summary": content[:500] # Opcional: resumo curto
-            }
+            if not self._loaded:
+                self.refresh()
+
+            stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+            seen = set()
+            pending: List[Tuple[str, str, Optional[str]]] = []
+
+            # O stat vem da própria varredura (scandir), sem nova chamada por arquivo
+            for file_path, relative_path, stat in self.walker.files(INDEXED_EXTENSIONS):
+                seen.add(relative_path)
+
+                entry = self.index["files"].get(relative_path)
+                if entry and self._is_unchanged(file_path, entry, stat):
+                    stats["unchanged"] += 1
+                    self._add_processed()
+                else:
+                    pending.append((file_path, relative_path, entry["hash"] if entry else None))
+
+            workers = self._resolve_workers(len(pending))
+            scan_started = time.time()
+            if workers > 1:
+                results = self._scan_parallel(pending, workers)
+            else:
+                results = (result for task in pending for result in _scan_batch([task]))
+
+            for relative_path, scanned, error in results:
+                if error:
+                    print(f"Erro ao indexar {relative_path}: {error}")
+                    stats["unchanged"] += 1
+                else:
+                    stats[self._apply_scan(relative_path, scanned)] += 1
+                self._add_processed()
+            scan_duration = time.time() - scan_started
+
+            with self._lock:
+                for relative_path in set(self.index["files"]) - seen:
+                    self._remove_file(relative_path)
+                    stats["removed"] += 1
+
+            if self._dirty:
+                self.save_index()
+
+        except Exception as e:
+            self._set_status(state="error", finished_at=time.time(), error=str(e))
+            raise
+
+        self._set_status(
+            state="ready",
+            finished_at=time.time(),
+            last_run=dict(
+                stats,
+                duration=round(time.time() - started, 3),
+                workers=workers,
+                files_scanned=len(pending),
+                files_per_second=round(len(pending) / scan_duration, 1) if scan_duration > 0 else None
+            )
+        )
+        return stats
+
+    def update_files(self, paths) -> Dict[str, int]:
+        """
+        Atualiza só os arquivos informados (edições, eventos do watcher)
+
+        Args:
+            paths: Caminhos absolutos ou relativos à raiz do projeto
+
+        Returns:
+            Contagem de arquivos adicionados, atualizados, removidos e inalterados
+        """
+        if not self._loaded:
+            self.refresh()
+
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        for path in paths:
+            relative_path = self.relative_path(path)
+            if relative_path is None:
+                continue
+
+            file_path = self.project_root / relative_path
+            if file_path.is_file():
+                stats[self._index_file(file_path, relative_path)] += 1
+            else:
+                with self._lock:
+                    if relative_path in self.index["files"]:
+                        self._remove_file(relative_path)
+                        stats["removed"] += 1
+
+        if self._dirty:
+            self._schedule_save()
+        return stats
+
+    def relative_path(self, path) -> Optional[str]:
+        """Caminho relativo à raiz se o arquivo deve ser indexado; senão None"""
+        path = Path(path)
+        if path.is_absolute():
+            for root in (self.project_root, self.project_root.resolve()):
+                try:
+                    path = path.relative_to(root)
+                    break
+                except ValueError:
+                    continue
+            else:
+                return None
+        relative_path = os.path.normpath(str(path))
+        if relative_path.startswith('..') or not relative_path.endswith(INDEXED_EXTENSIONS):
+            return None
+        if self.walker.is_ignored(relative_path):
+            return None
+        return relative_path
+
+    def _resolve_workers(self, pending_files: int) -> int:
+        """Número de processos para analisar os arquivos pendentes"""
+        if pending_files < PARALLEL_MIN_FILES:
+            return 1
+        workers = self.workers or os.cpu_count() or 1
+        # Cada processo recebe ao menos alguns lotes completos
+        return max(1, min(workers, pending_files // SHARD_SIZE))
+
+    def _scan_parallel(self, pending: List[Tuple[str, str, Optional[str]]], workers: int):
+        """Distribui os arquivos em lotes por um pool de processos"""
+        shards = [pending[i:i + SHARD_SIZE] for i in range(0, len(pending), SHARD_SIZE)]
+
+        # index_project roda numa thread do servidor: nada de fork aqui
+        context = process_context(__name__)
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [executor.submit(_scan_batch, shard) for shard in shards]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def _is_unchanged(self, file_path: str, entry: Dict[str, Any],
+                      stat: Optional[os.stat_result] = None) -> bool:
+        """Compara tamanho e mtime do arquivo com o manifesto"""
+        if stat is None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return False
+        return entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns
 
-            for sym in symbols:
+    def _index_file(self, file_path: Path, relative_path: str) -> str:
+        """
+        Analisa um arquivo e extrai símbolos, se ele mudou desde o último índice
+
+        Returns:
+            "added", "updated" ou "unchanged"
+        """
+        entry = self.index["files"].get(relative_path)
+        if entry and self._is_unchanged(str(file_path), entry):
+            return "unchanged"
+
+        [(_, scanned, error)] = _scan_batch([(str(file_path), relative_path, entry["hash"] if entry else None)])
+        if error:
+            print(f"Erro ao indexar {relative_path}: {error}")
+            return "unchanged"
+        return self._apply_scan(relative_path, scanned)
+
+    def _apply_scan(self, relative_path: str, scanned: Dict[str, Any]) -> str:
+        """
+        Incorpora ao índice o resultado de `_scan_file`
+
+        Returns:
+            "added", "updated" ou "unchanged"
+        """
+        with self._lock:
+            entry = self.index["files"].get(relative_path)
+
+            self._dirty = True
+            if "symbols" not in scanned:
+                # Só o mtime mudou (touch, checkout): conteúdo já indexado
+                entry.update(scanned)
+                return "unchanged"
+
+            if entry:
+                self._remove_file(relative_path)
+
+            self.index["files"][relative_path] = scanned
+            for sym in scanned["symbols"]:
                 if sym not in self.index["symbols"]:
                     self.index["symbols"][sym] = []
-                if relative_path not in self.index["symbols"][sym]:
-                    self.index["symbols"][sym].append(relative_path)
+                self.index["symbols"][sym].append(relative_path)
+            self.search_index.add_file(relative_path, scanned["symbols"])
+            self.chunk_index.add_file(relative_path, scanned["chunks"])
+            self.embeddings.add_file(relative_path, scanned["hash"], scanned["chunks"])
+            self.reference_graph.add_file(relative_path, scanned["references"])
 
-        except Exception as e:
-            print(f"Erro ao indexar {relative_path}: {e}")
+            return "updated" if entry else "added"
+
+    def _remove_file(self, relative_path: str):
+        """Remove um arquivo do índice e das listas de símbolos"""
+        entry = self.index["files"].pop(relative_path, None)
+        if not entry:
+            return
+        self._dirty = True
+        self.search_index.remove_file(relative_path)
+        self.chunk_index.remove_file(relative_path)
+        self.embeddings.remove_file(relative_path)
+        self.reference_graph.remove_file(relative_path)
+
+        for sym in entry["symbols"]:
+            paths = self.index["symbols"].get(sym)
+            if not paths:
+                continue
+            if relative_path in paths:
+                paths.remove(relative_path)
+            if not paths:
+                del self.index["symbols"][sym]
 
     def search_symbols(self, query: str) -> List[str]:
         """Busca arquivos que contêm o símbolo"""
-        return self.index["symbols"].get(query, [])
+        with self._lock:
+            return list(self.index["symbols"].get(query, []))
 
-    def search_keyword(self, keyword: str) -> List[str]:
-        """Busca arquivos que contêm uma palavra-chave no nome ou símbolos"""
+    def find_symbol(self, name: str, path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Localiza definições pelo nome simples ou qualificado (ex: "Classe.metodo")
+
+        Returns:
+            Definições com "path", "kind", "qualname", "line", "end_line" e "signature"
+        """
+        simple = name.rsplit('.', 1)[-1]
         results = []
-        for path, data in self.index["files"].items():
-            if keyword.lower() in path.lower() or any(keyword.lower() in sym.lower() for sym in data["symbols"]):
-                results.append(path)
+        with self._lock:
+            for file_path in self.index["symbols"].get(simple, []):
+                if path and file_path != path:
+                    continue
+                for definition in self.index["files"][file_path].get("definitions", []):
+                    if definition["name"] == name or definition["qualname"] == name:
+                        results.append(dict(definition, path=file_path))
         return results
 
+    def definitions_for(self, path: str, names: List[str]) -> List[Dict[str, Any]]:
+        """Definições de um arquivo cujos nomes estão em `names`"""
+        with self._lock:
+            entry = self.index["files"].get(path)
+            if not entry:
+                return []
+            return [d for d in entry.get("definitions", []) if d["name"] in names]
+
+    def find_usages(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Chamadas e usos de um nome no projeto
+
+        Num nome qualificado ("Classe.metodo", "modulo.funcao") o receptor de
+        cada chamada não é resolvido: só contam os arquivos que definem o
+        dono ou o importam.
+
+        Returns:
+            Lista de {"path", "line", "kind"} ("call" ou "ref")
+        """
+        owner, _, simple = name.rpartition('.')
+        with self._lock:
+            if not owner:
+                return self.reference_graph.usages(simple)
+            owner_name = owner.rsplit('.', 1)[-1]
+            defining = {
+                path for path in self.index["symbols"].get(owner_name, [])
+                if any(
+                    d["name"] == owner_name
+                    and (owner == owner_name or d["qualname"] == owner or owner.endswith("." + d["qualname"]))
+                    for d in self.index["files"][path].get("definitions", [])
+                )
+            }
+            return self.reference_graph.usages(simple, self.reference_graph.scope(owner, defining))
+
+    def module_imports(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Dependências de um arquivo nas duas direções
+
+        Returns:
+            {"imports": [{"statement", "line", "path"}], "imported_by": [arquivos]},
+            ou None se o arquivo não está no índice
+        """
+        with self._lock:
+            if path not in self.index["files"]:
+                return None
+            return {
+                "imports": self.reference_graph.imports(path),
+                "imported_by": sorted(self.reference_graph.importers(path))
+            }
+
+    def change_impact(self, path: str, max_depth: int = 3) -> Optional[Dict[str, Any]]:
+        """
+        Arquivos possivelmente afetados por uma mudança em `path`
+
+        Soma os dependentes via imports (até `max_depth` níveis) e os arquivos
+        que chamam as funções/classes definidas nele. Métodos têm nomes
+        genéricos demais, então só contam chamadas vindas dos dependentes.
+
+        Returns:
+            {"dependents": {arquivo: profundidade}, "callers": {símbolo: [arquivos]},
+             "affected": [arquivos]}, ou None se o arquivo não está no índice
+        """
+        with self._lock:
+            entry = self.index["files"].get(path)
+            if entry is None:
+                return None
+
+            dependents = self.reference_graph.dependents(path, max_depth)
+            callers: Dict[str, List[str]] = {}
+            for definition in entry.get("definitions", []):
+                if definition["kind"] == "variable" or definition["name"].startswith("__"):
+                    continue
+                files = self.reference_graph.callers(definition["name"]) - {path}
+                if definition["kind"] == "method":
+                    files &= dependents.keys()
+                if files:
+                    callers.setdefault(definition["qualname"], sorted(files))
+
+            affected = set(dependents)
+            for files in callers.values():
+                affected.update(files)
+            return {"dependents": dependents, "callers": callers, "affected": sorted(affected)}
+
+    def read_span(self, path: str, start: int, end: int) -> str:
+        """Lê as linhas [start, end] (1-based) de um arquivo do projeto"""
+        lines = []
+        with open(self.project_root / path, 'r', encoding='utf-8', errors='replace') as f:
+            for number, line in enumerate(f, 1):
+                if number > end:
+                    break
+                if number >= start:
+                    lines.append(line)
+        return "".join(lines)
+
+    def retrieve_chunks(self, query: str, k: int = 5, with_code: bool = True) -> List[Dict[str, Any]]:
+        """
+        Trechos de código (funções, classes, blocos) mais relevantes por BM25
+
+        Returns:
+            Lista de {"path", "name", "kind", "line", "end_line", "score"}
+            (+ "code" se with_code)
+        """
+        with self._lock:
+            results = self.chunk_index.search(query, k)
+
+        if with_code:
+            self.attach_code(results)
+        return results
+
+    def semantic_search(self, query: str, k: int = 5, mode: str = "auto",
+                        with_code: bool = True) -> List[Dict[str, Any]]:
+        """
+        Trechos semanticamente próximos da consulta (embeddings locais)
+
+        Args:
+            mode: "auto", "brute" ou "ivf"
+
+        Returns:
+            Lista de {"path", "name", "kind", "line", "end_line", "score"}
+            (+ "code" se with_code)
+        """
+        results = []
+        with self._lock:
+            for path, position, score in self.embeddings.search(query, k, mode):
+                chunk = self.index["files"][path]["chunks"][position]
+                result = {key: value for key, value in chunk.items() if key != "terms"}
+                result.update(path=path, score=score)
+                results.append(result)
+
+        if with_code:
+            self.attach_code(results)
+        return results
+
+    def attach_code(self, results: List[Dict[str, Any]]):
+        """Adiciona o código de cada trecho em "code" """
+        for result in results:
+            try:
+                result["code"] = self.read_span(result["path"], result["line"], result["end_line"])
+            except OSError:
+                result["code"] = ""
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Busca ranqueada por símbolo, token, substring ou aproximação
+
+        Returns:
+            Lista de {"path", "score", "matches"} (símbolos encontrados)
+        """
+        with self._lock:
+            return self.search_index.search(query, limit)
+
+    def search_keyword(self, keyword: str, limit: int = 50) -> List[str]:
+        """Busca arquivos que contêm uma palavra-chave no nome ou símbolos"""
+        return [result["path"] for result in self.search(keyword, limit)]
+
     def save_index(self):
-        with open(self.index_file, 'w', encoding='utf-8') as f:
-            json.dump(self.index, f, indent=2)
+        """
+        Grava o índice (cabeçalho + JSON compacto comprimido) de forma atômica
+
+        Só a cópia rasa do manifesto é feita sob o lock; serialização,
+        compressão e escrita não bloqueiam as buscas.
+        """
+        with self._io_lock:
+            with self._lock:
+                # Entradas são substituídas (não alteradas) ao reindexar; a
+                # cópia de cada uma protege do update de mtime
+                files = {path: dict(entry) for path, entry in self.index["files"].items()}
+                self.embeddings.maintain()
+                embeddings = self.embeddings.snapshot()
+                self._dirty = False
+
+            try:
+                vocab, files = _pack_terms(files)
+                payload = json.dumps({"vocab": vocab, "files": files}, separators=(',', ':'))
+                generation = max(self._generation, self._read_generation() or 0) + 1
+
+                tmp_file = self.index_file.with_suffix(".tmp")
+                with open(tmp_file, 'wb') as f:
+                    f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, generation))
+                    f.write(zlib.compress(payload.encode('utf-8'), 6))
+                os.replace(tmp_file, self.index_file)
+
+                if embeddings is not None:
+                    self.embeddings.write(embeddings)
+            except Exception:
+                # Fica para a próxima gravação
+                with self._lock:
+                    self._dirty = True
+                    if embeddings is not None:
+                        self.embeddings.mark_dirty()
+                raise
+            self._generation = generation
+
+    def _schedule_save(self):
+        """Agenda a gravação, agrupando as alterações dos próximos `save_delay` segundos"""
+        if self.save_delay <= 0:
+            self.save_index()
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self._save_scheduled)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save_scheduled(self):
+        with self._lock:
+            self._save_timer = None
+            dirty = self._dirty
+        if not dirty:
+            return
+        try:
+            self.save_index()
+        except Exception as e:
+            print(f"Erro ao gravar o índice: {e}")
+
+    def flush(self):
+        """Grava na hora alterações com gravação agendada (ex: no shutdown)"""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+            dirty = self._dirty
+        if timer is not None:
+            timer.cancel()
+        if dirty:
+            self.save_index()
+
+    def _read_generation(self) -> Optional[int]:
+        """Geração do arquivo em disco (lê só o cabeçalho); None se ausente ou inválido"""
+        try:
+            with open(self.index_file, 'rb') as f:
+                header = f.read(INDEX_HEADER.size)
+        except OSError:
+            return None
+        if len(header) < INDEX_HEADER.size:
+            return None
+        magic, version, generation = INDEX_HEADER.unpack(header)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            return None
+        return generation
+
+    def refresh(self):
+        """Carrega o índice se necessário; só relê o arquivo se a geração mudou"""
+        with self._io_lock:
+            generation = self._read_generation()
+            if self._loaded and generation in (None, self._generation):
+                return
+            self.load_index()
 
     def load_index(self):
+        """Lê o índice do disco (fora do lock) e troca o estado em memória"""
+        files, generation = {}, 0
         if self.index_file.exists():
-            with open(self.index_file, 'r', encoding='utf-8') as f:
-                self.index = json.load(f)
+            with open(self.index_file, 'rb') as f:
+                data = f.read()
+            try:
+                magic, version, generation = INDEX_HEADER.unpack_from(data)
+                # Índices de outra versão são descartados
+                if magic == INDEX_MAGIC and version == INDEX_VERSION:
+                    stored = json.loads(zlib.decompress(data[INDEX_HEADER.size:]))
+                    files = stored["files"]
+                    _unpack_terms(stored["vocab"], files)
+                else:
+                    generation = 0
+            except (struct.error, zlib.error, ValueError, KeyError, TypeError, IndexError) as e:
+                # Arquivo truncado ou corrompido (ex: queda no meio da gravação):
+                # como um índice de outra versão, é refeito na próxima indexação
+                print(f"⚠️ Índice do projeto inválido, será refeito: {e}")
+                files, generation = {}, 0
+
+        with self._lock:
+            self.index = self._empty_index()
+            self.index["files"] = files
+            self.search_index.clear()
+            self.chunk_index.clear()
+            self.reference_graph.clear()
+            for path, entry in files.items():
+                for sym in entry["symbols"]:
+                    self.index["symbols"].setdefault(sym, []).append(path)
+                self.search_index.add_file(path, entry["symbols"])
+                self.chunk_index.add_file(path, entry.get("chunks", []))
+                self.reference_graph.add_file(path, entry.get("references"))
+            # Embeddings persistidos são reaproveitados quando o hash bate
+            self.embeddings.load()
+            self.embeddings.sync(files)
+            self._generation = generation
+            self._dirty = False
+            self._loaded = True
@@ -0,0 +1,288 @@
+"""
+Varredura de arquivos do projeto respeitando .gitignore/.ignore
+"""
+
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Diretórios nunca visitados, além dos padrões de ignore
+DEFAULT_EXCLUDES = [".git", "__pycache__", "node_modules", ".brain", "venv", ".venv", ".next"]
+
+IGNORE_FILES = (".gitignore", ".ignore")
+
+
+class IgnoreRule(NamedTuple):
+    regex: "re.Pattern"
+    negate: bool
+    dir_only: bool
+    base: str  # Diretório (relativo à raiz) do arquivo que definiu a regra
+
+
+class WalkEntry(NamedTuple):
+    path: str           # Caminho absoluto
+    relative_path: str  # Relativo à raiz do projeto
+    stat: os.stat_result
+
+
+def _translate(pattern: str) -> str:
+    """Converte um padrão estilo gitignore em regex (relativa ao diretório base)"""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 3] == '**/':
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = pattern.find(']', i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def parse_ignore_file(content: str, base: str) -> List[IgnoreRule]:
+    """Lê as regras de um .gitignore localizado em `base`"""
+    rules = []
+    for line in content.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+
+        # Com "/" no início ou no meio o padrão é ancorado no diretório base;
+        # sem "/" vale para o nome em qualquer profundidade
+        anchored = '/' in line
+        line = line.lstrip('/')
+        prefix = '' if anchored else '(?:.*/)?'
+        regex = re.compile(f'^{prefix}{_translate(line)}$')
+        rules.append(IgnoreRule(regex, negate, dir_only, base))
+    return rules
+
+
+class ProjectWalker:
+    """
+    Percorre o projeto podando diretórios ignorados antes de descer neles
+
+    Usa os.scandir (o DirEntry guarda o tipo e o stat) e, opcionalmente,
+    `git ls-files` para listar só arquivos versionados ou não ignorados.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        excludes: Optional[Iterable[str]] = None,
+        use_gitignore: bool = True,
+        use_git: bool = False
+    ):
+        """
+        Args:
+            root: Raiz do projeto
+            excludes: Nomes de diretórios ou padrões gitignore sempre ignorados
+            use_gitignore: Respeita .gitignore/.ignore encontrados na árvore
+            use_git: Lista arquivos com `git ls-files` quando a raiz é um repositório
+        """
+        self.root = Path(root)
+        self.excludes = list(DEFAULT_EXCLUDES if excludes is None else excludes)
+        self.use_gitignore = use_gitignore
+        self.use_git = use_git
+
+        self._exclude_names = {e for e in self.excludes if not any(ch in e for ch in '*?[/')}
+        self._exclude_rules = parse_ignore_file(
+            "\n".join(e for e in self.excludes if e not in self._exclude_names), ""
+        )
+        # diretório relativo -> (mtimes dos arquivos de ignore, regras próprias)
+        self._rule_cache: Dict[str, Tuple[tuple, List[IgnoreRule]]] = {}
+
+    # --- regras ------------------------------------------------------------
+
+    def _dir_rules(self, relative_dir: str) -> List[IgnoreRule]:
+        """Regras definidas pelos arquivos de ignore de um diretório (com cache)"""
+        if not self.use_gitignore:
+            return []
+        directory = self.root / relative_dir
+        mtimes = []
+        for name in IGNORE_FILES:
+            try:
+                mtimes.append(os.stat(directory / name).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        mtimes = tuple(mtimes)
+
+        cached = self._rule_cache.get(relative_dir)
+        if cached and cached[0] == mtimes:
+            return cached[1]
+
+        rules = []
+        for name, mtime in zip(IGNORE_FILES, mtimes):
+            if mtime is None:
+                continue
+            try:
+                content = (directory / name).read_text(encoding='utf-8', errors='replace')
+            except OSError:
+                continue
+            rules.extend(parse_ignore_file(content, relative_dir))
+        self._rule_cache[relative_dir] = (mtimes, rules)
+        return rules
+
+    @staticmethod
+    def _matches(rules: List[IgnoreRule], relative_path: str, is_dir: bool,
+                 ignored: bool = False) -> bool:
+        """Aplica as regras em ordem; a última que casar decide"""
+        for rule in rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.base:
+                if not relative_path.startswith(rule.base + '/'):
+                    continue
+                candidate = relative_path[len(rule.base) + 1:]
+            else:
+                candidate = relative_path
+            if rule.regex.match(candidate):
+                ignored = not rule.negate
+        return ignored
+
+    def _excluded(self, name: str, relative_path: str, is_dir: bool) -> bool:
+        if is_dir and name in self._exclude_names:
+            return True
+        return self._matches(self._exclude_rules, relative_path, is_dir)
+
+    def is_ignored(self, relative_path: str, is_dir: bool = False) -> bool:
+        """Indica se um caminho (relativo à raiz) seria ignorado pela varredura"""
+        parts = Path(relative_path).parts
+        if not parts or parts[0] == '..':
+            return True
+
+        rules: List[IgnoreRule] = list(self._dir_rules(""))
+        for depth, name in enumerate(parts):
+            current = "/".join(parts[:depth + 1])
+            current_is_dir = is_dir or depth < len(parts) - 1
+            if self._excluded(name, current, current_is_dir) or \
+                    self._matches(rules, current, current_is_dir):
+                return True
+            if current_is_dir and depth < len(parts) - 1:
+                rules = rules + self._dir_rules(current)
+        return False
+
+    # --- varredura -----------------------------------------------------------
+
+    def walk(self, top: Optional[str] = None) -> Iterator[Tuple[str, List[os.DirEntry]]]:
+        """
+        Gera (diretório, arquivos) como os.walk, sem descer em diretórios ignorados
+
+        Args:
+            top: Subdiretório (absoluto) de onde começar; padrão é a raiz
+        """
+        top_path = Path(top) if top else self.root
+        relative_top = os.path.relpath(top_path, self.root)
+        relative_top = "" if relative_top == "." else relative_top.replace(os.sep, "/")
+        if relative_top and self.is_ignored(relative_top, is_dir=True):
+            return
+
+        # Regras herdadas dos diretórios acima de `top`
+        inherited: List[IgnoreRule] = list(self._dir_rules(""))
+        parts = relative_top.split("/") if relative_top else []
+        for depth in range(len(parts)):
+            inherited += self._dir_rules("/".join(parts[:depth + 1]))
+
+        stack = [(str(top_path), relative_top, inherited)]
+        while stack:
+            directory, relative_dir, rules = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            files = []
+            for entry in entries:
+                relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if self._excluded(entry.name, relative_path, is_dir) or \
+                        self._matches(rules, relative_path, is_dir):
+                    continue
+                if is_dir:
+                    stack.append((entry.path, relative_path, rules + self._dir_rules(relative_path)))
+                elif entry.is_file():
+                    files.append(entry)
+
+            yield directory, files
+
+    def files(self, extensions: Optional[Tuple[str, ...]] = None) -> Iterator[WalkEntry]:
+        """Arquivos não ignorados (opcionalmente filtrados por extensão) com stat"""
+        if self.use_git:
+            listed = self._git_files()
+            if listed is not None:
+                yield from self._stat_listed(listed, extensions)
+                return
+
+        for _, entries in self.walk():
+            for entry in entries:
+                if extensions and not entry.name.endswith(extensions):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                relative_path = os.path.relpath(entry.path, self.root)
+                yield WalkEntry(entry.path, relative_path, stat)
+
+    def _git_files(self) -> Optional[List[str]]:
+        """Arquivos versionados + não rastreados não ignorados; None se não for repositório git"""
+        try:
+            result = subprocess.run(
+                ["git", "-C", str(self.root), "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+                capture_output=True, timeout=30
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode != 0:
+            return None
+        return [p for p in result.stdout.decode('utf-8', errors='replace').split('\0') if p]
+
+    def _stat_listed(self, listed: List[str], extensions: Optional[Tuple[str, ...]]) -> Iterator[WalkEntry]:
+        for relative_path in listed:
+            if extensions and not relative_path.endswith(extensions):
+                continue
+            parts = relative_path.split('/')
+            if any(self._excluded(name, "/".join(parts[:i + 1]), i < len(parts) - 1)
+                   for i, name in enumerate(parts)):
+                continue
+            path = os.path.join(self.root, relative_path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Removido mas ainda no índice do git
+            yield WalkEntry(path, os.path.normpath(relative_path), stat)
@@ -0,0 +1,178 @@
+"""
+Extração de referências de um arquivo: imports, chamadas e usos de nomes
+
+Python usa o módulo `ast`; JS/TS reaproveitam o tokenizador do extrator de
+símbolos (chamadas/usos) e uma regex para os especificadores de import.
+Módulos são identificados por chaves: nome pontuado em Python
+("backend.memory.rag.bm25") e caminho sem extensão em JS/TS ("frontend/app").
+"""
+
+import ast
+import posixpath
+import re
+from typing import Dict, List
+
+from .symbol_extractor import _JS_EXTENSIONS, _tokenize_js
+
+_JS_KEYWORDS = {
+    'if', 'for', 'while', 'switch', 'catch', 'return', 'function', 'new', 'typeof',
+    'class', 'const', 'let', 'var', 'import', 'export', 'from', 'await', 'async',
+    'this', 'super', 'true', 'false', 'null', 'undefined', 'in', 'of', 'else',
+    'try', 'finally', 'throw', 'delete', 'void', 'instanceof', 'extends', 'default',
+    'case', 'break', 'continue', 'do', 'yield', 'static', 'get', 'set', 'type', 'interface'
+}
+
+_JS_IMPORT_RE = re.compile(
+    r'''(?:\bimport\s+(?:[\w*${},\s]+\s+from\s+)?|\bexport\s+[\w*${},\s]+\s+from\s+|\brequire\s*\(\s*|\bimport\s*\(\s*)'''
+    r'''(["'])([^"'\n]+)\1'''
+)
+
+
+def module_keys(path: str) -> List[str]:
+    """Chaves pelas quais outros arquivos importam este arquivo"""
+    path = path.replace('\\', '/')
+    base, ext = posixpath.splitext(path)
+    if ext == '.py':
+        parts = base.split('/')
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        return [".".join(parts)] if parts else []
+    if ext in _JS_EXTENSIONS:
+        keys = [base]
+        if posixpath.basename(base) == 'index':
+            keys.append(posixpath.dirname(base))
+        return keys
+    return []
+
+
+def extract_references(path: str, content: str) -> Dict:
+    """
+    Extrai as referências de um arquivo
+
+    Returns:
+        {"imports": [{"statement", "line", "targets"}],
+         "calls": {nome: [linhas]}, "refs": {nome: [linhas]}}
+        onde "targets" são chaves de módulo candidatas (ver `module_keys`)
+    """
+    if path.endswith('.py'):
+        try:
+            return _extract_python(path, content)
+        except (SyntaxError, ValueError, RecursionError):
+            pass
+    elif path.endswith(_JS_EXTENSIONS):
+        return _extract_js(path, content)
+    return {"imports": [], "calls": {}, "refs": {}}
+
+
+def _add(table: Dict[str, List[int]], name: str, line: int):
+    lines = table.setdefault(name, [])
+    if not lines or lines[-1] != line:
+        lines.append(line)
+
+
+# --- Python -----------------------------------------------------------------
+
+def _extract_python(path: str, content: str) -> Dict:
+    tree = ast.parse(content)
+    imports, calls, refs = [], {}, {}
+
+    # Pacote do arquivo, para resolver imports relativos
+    package = path.replace('\\', '/').rsplit('.', 1)[0].split('/')
+    package = package[:-1]
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append({"statement": f"import {alias.name}", "line": node.lineno,
+                                "targets": [alias.name]})
+
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[:len(package) - node.level + 1] if node.level <= len(package) + 1 else []
+                module = ".".join(base + ([node.module] if node.module else []))
+            else:
+                module = node.module or ""
+            names = [alias.name for alias in node.names]
+            # "from pacote import modulo" importa o submódulo, não só o pacote
+            targets = [f"{module}.{name}" if module else name for name in names if name != '*']
+            if module:
+                targets.append(module)
+            imports.append({"statement": f"from {'.' * node.level}{node.module or ''} import {', '.join(names)}",
+                            "line": node.lineno, "targets": targets})
+            for name in names:
+                if name != '*':
+                    _add(refs, name, node.lineno)
+
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name):
+                _add(calls, func.id, node.lineno)
+            elif isinstance(func, ast.Attribute):
+                _add(calls, func.attr, node.lineno)
+
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            _add(refs, node.id, node.lineno)
+
+        elif isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Load):
+            _add(refs, node.attr, node.lineno)
+
+    for table in (calls, refs):
+        for lines in table.values():
+            lines.sort()
+    return {"imports": imports, "calls": calls, "refs": refs}
+
+
+# --- JS / TS ----------------------------------------------------------------
+
+def _extract_js(path: str, content: str) -> Dict:
+    imports, calls, refs = [], {}, {}
+    directory = posixpath.dirname(path.replace('\\', '/'))
+
+    for match in _JS_IMPORT_RE.finditer(content):
+        spec = match.group(2)
+        line = content.count('\n', 0, match.start()) + 1
+        if spec.startswith('.'):
+            base = posixpath.normpath(posixpath.join(directory, spec))
+            stem, ext = posixpath.splitext(base)
+            if ext in _JS_EXTENSIONS:
+                base = stem
+            targets = [base, f"{base}/index"]
+        else:
+            targets = [spec]
+        imports.append({"statement": f"import '{spec}'", "line": line, "targets": targets})
+
+    tokens = _tokenize_js(content)
+    for i, (kind, value, line, _) in enumerate(tokens):
+        if kind != 'ident' or value in _JS_KEYWORDS:
+            continue
+        previous = tokens[i - 1][1] if i else ''
+        following = tokens[i + 1][1] if i + 1 < len(tokens) else ''
+        # Declarações ("function nome(", "class Nome") não são usos
+        if previous in ('function', 'class'):
+            continue
+        if following != '(':
+            _add(refs, value, line)
+            continue
+        # "nome(...) {" no início de um comando é declaração de método
+        if previous in ('{', '}', ';', '') or previous in _JS_KEYWORDS:
+            close = _skip_parens(tokens, i + 1)
+            if close < len(tokens) and tokens[close][1] in ('{', ':'):
+                continue
+        _add(calls, value, line)
+
+    return {"imports": imports, "calls": calls, "refs": refs}
+
+
+def _skip_parens(tokens: List, i: int) -> int:
+    """Índice do token seguinte ao ")" que fecha o "(" em `i`"""
+    depth = 0
+    while i < len(tokens):
+        value = tokens[i][1]
+        if value == '(':
+            depth += 1
+        elif value == ')':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
@@ -0,0 +1,175 @@
+"""
+Grafo de referências do projeto: quem chama/usa um nome e quem importa um módulo
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Set
+
+from .reference_extractor import module_keys
+
+
+class ReferenceGraph:
+    """
+    Listas de adjacência derivadas das referências extraídas de cada arquivo
+
+    Mantém os índices reversos (nome -> arquivos que chamam/usam, módulo ->
+    arquivos que importam) atualizados a cada arquivo adicionado ou removido,
+    então as consultas não percorrem o projeto. Não é thread-safe: o
+    ProjectIndexer serializa o acesso.
+    """
+
+    def __init__(self):
+        # nome -> {arquivo: [linhas]}
+        self._calls: Dict[str, Dict[str, List[int]]] = {}
+        self._refs: Dict[str, Dict[str, List[int]]] = {}
+        # chave de módulo -> arquivos que a importam
+        self._importers: Dict[str, Set[str]] = {}
+        # chave de módulo -> arquivo do projeto que a define
+        self._modules: Dict[str, str] = {}
+        # arquivo -> referências (para a remoção incremental)
+        self._files: Dict[str, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def add_file(self, path: str, references: Optional[Dict]):
+        """Indexa (ou reindexa) as referências de um arquivo"""
+        self.remove_file(path)
+        references = references or {"imports": [], "calls": {}, "refs": {}}
+        self._files[path] = references
+
+        for key in module_keys(path):
+            self._modules[key] = path
+        for table, graph in ((references["calls"], self._calls), (references["refs"], self._refs)):
+            for name, lines in table.items():
+                graph.setdefault(name, {})[path] = lines
+        for record in references["imports"]:
+            for target in record["targets"]:
+                self._importers.setdefault(target, set()).add(path)
+
+    def remove_file(self, path: str):
+        """Remove as referências de um arquivo"""
+        references = self._files.pop(path, None)
+        if references is None:
+            return
+
+        for key in module_keys(path):
+            if self._modules.get(key) == path:
+                del self._modules[key]
+        for table, graph in ((references["calls"], self._calls), (references["refs"], self._refs)):
+            for name in table:
+                users = graph.get(name)
+                if users is None:
+                    continue
+                users.pop(path, None)
+                if not users:
+                    del graph[name]
+        for record in references["imports"]:
+            for target in record["targets"]:
+                importers = self._importers.get(target)
+                if importers is None:
+                    continue
+                importers.discard(path)
+                if not importers:
+                    del self._importers[target]
+
+    def clear(self):
+        self.__init__()
+
+    def resolve(self, targets: List[str]) -> Optional[str]:
+        """Arquivo do projeto correspondente a um import (None se externo)"""
+        for target in targets:
+            path = self._modules.get(target)
+            if path:
+                return path
+        return None
+
+    def usages(self, name: str, paths: Optional[Set[str]] = None) -> List[Dict]:
+        """
+        Chamadas e usos de um nome simples
+
+        Args:
+            paths: Considera só estes arquivos (None = todos)
+
+        Returns:
+            Lista de {"path", "line", "kind"} com kind "call" ou "ref",
+            ordenada por arquivo e linha
+        """
+        found: Dict[tuple, str] = {}
+        for kind, graph in (("ref", self._refs), ("call", self._calls)):
+            for path, lines in graph.get(name, {}).items():
+                if paths is not None and path not in paths:
+                    continue
+                for line in lines:
+                    # Uma chamada também aparece como uso; vale a mais específica
+                    found[(path, line)] = kind
+        return [{"path": path, "line": line, "kind": kind} for (path, line), kind in sorted(found.items())]
+
+    def scope(self, owner: str, defining: Set[str]) -> Set[str]:
+        """
+        Arquivos onde membros de `owner` podem ser usados
+
+        Args:
+            owner: Classe, função ou módulo (ex: "ProjectIndexer", "json")
+            defining: Arquivos que definem `owner`
+
+        Returns:
+            Os arquivos que definem `owner` (ou são o módulo `owner`) e os
+            que os importam, mais os que importam `owner` como módulo externo
+        """
+        files = set(defining)
+        for key, path in self._modules.items():
+            if key == owner or key.endswith(('.' + owner, '/' + owner)):
+                files.add(path)
+        result = set(files)
+        for path in files:
+            result.update(self.importers(path))
+        result.update(self._importers.get(owner, ()))
+        return result
+
+    def callers(self, name: str) -> Set[str]:
+        """Arquivos que chamam um nome"""
+        return set(self._calls.get(name, {}))
+
+    def imports(self, path: str) -> List[Dict]:
+        """
+        Imports de um arquivo
+
+        Returns:
+            Lista de {"statement", "line", "path"} ("path" é None para módulos externos)
+        """
+        references = self._files.get(path)
+        if not references:
+            return []
+        return [
+            {"statement": record["statement"], "line": record["line"], "path": self.resolve(record["targets"])}
+            for record in references["imports"]
+        ]
+
+    def importers(self, path: str) -> Set[str]:
+        """Arquivos que importam um arquivo do projeto"""
+        result: Set[str] = set()
+        for key in module_keys(path):
+            result.update(self._importers.get(key, ()))
+        result.discard(path)
+        return result
+
+    def dependents(self, path: str, max_depth: int = 3) -> Dict[str, int]:
+        """
+        Arquivos que dependem de `path` direta ou transitivamente via imports
+
+        Returns:
+            {arquivo: profundidade} (1 = importa diretamente)
+        """
+        depths: Dict[str, int] = {}
+        queue = deque([(path, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            for importer in self.importers(current):
+                if importer == path or importer in depths:
+                    continue
+                depths[importer] = depth + 1
+                queue.append((importer, depth + 1))
+        return depths
@@ -0,0 +1,194 @@
+"""
+Índice invertido e de trigramas para busca de arquivos e símbolos
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+# Pesos de cada tipo de correspondência no ranking
+EXACT_SYMBOL_SCORE = 10.0
+TOKEN_SCORE = 4.0
+SUBSTRING_SCORE = 2.0
+FUZZY_SCORE = 1.5
+
+# Similaridade mínima (trigramas em comum / trigramas da consulta) para fuzzy
+FUZZY_MIN_SIMILARITY = 0.5
+# Trigramas muito frequentes não ajudam a discriminar candidatos fuzzy
+FUZZY_MAX_POSTINGS = 5000
+
+_WORD_RE = re.compile(r'[A-Za-z0-9]+')
+_CAMEL_RE = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Quebra identificadores e caminhos em tokens (snake_case, camelCase, /)"""
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        tokens.append(word.lower())
+        parts = _CAMEL_RE.findall(word)
+        if len(parts) > 1:
+            tokens.extend(p.lower() for p in parts)
+    return tokens
+
+
+def trigrams(term: str) -> Set[str]:
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class SearchIndex:
+    """
+    Busca ranqueada sobre símbolos e caminhos do projeto
+
+    Mantém listas invertidas token→arquivos e trigrama→termos, atualizadas
+    arquivo a arquivo, para que a consulta não percorra o projeto inteiro.
+    Não é thread-safe: o ProjectIndexer serializa o acesso com seu lock.
+    """
+
+    def __init__(self):
+        # token -> {arquivo: ocorrências}
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        # termo (símbolo ou caminho, minúsculo) -> arquivos
+        self._terms: Dict[str, Set[str]] = defaultdict(set)
+        # termo minúsculo -> grafias originais (para exibir o símbolo encontrado)
+        self._spellings: Dict[str, Set[str]] = defaultdict(set)
+        # trigrama -> termos que o contêm
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        # arquivo -> (tokens, termos) indexados, para remoção incremental
+        self._files: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def add_file(self, path: str, symbols: Iterable[str]):
+        """Indexa (ou reindexa) o caminho e os símbolos de um arquivo"""
+        self.remove_file(path)
+
+        symbols = list(symbols)
+        tokens: Dict[str, int] = defaultdict(int)
+        for text in [path, *symbols]:
+            for token in tokenize(text):
+                tokens[token] += 1
+
+        terms = {path.lower()}
+        for sym in symbols:
+            term = sym.lower()
+            terms.add(term)
+            self._spellings[term].add(sym)
+
+        for token, count in tokens.items():
+            self._postings[token][path] = count
+        for term in terms:
+            if not self._terms[term]:
+                for gram in trigrams(term):
+                    self._trigrams[gram].add(term)
+            self._terms[term].add(path)
+
+        self._files[path] = (list(tokens), terms)
+
+    def remove_file(self, path: str):
+        """Remove um arquivo de todas as listas"""
+        indexed = self._files.pop(path, None)
+        if not indexed:
+            return
+
+        tokens, terms = indexed
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(path, None)
+                if not posting:
+                    del self._postings[token]
+
+        for term in terms:
+            paths = self._terms.get(term)
+            if paths is None:
+                continue
+            paths.discard(path)
+            if paths:
+                continue
+            del self._terms[term]
+            self._spellings.pop(term, None)
+            for gram in trigrams(term):
+                grams = self._trigrams.get(gram)
+                if grams is not None:
+                    grams.discard(term)
+                    if not grams:
+                        del self._trigrams[gram]
+
+    def clear(self):
+        self.__init__()
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Busca arquivos por símbolo, token, substring ou aproximação
+
+        Returns:
+            Lista de {"path", "score", "matches"} em ordem decrescente de score
+        """
+        q = query.strip().lower()
+        if not q:
+            return []
+
+        scores: Dict[str, float] = defaultdict(float)
+        matches: Dict[str, Set[str]] = defaultdict(set)
+        # Arquivos encontrados por símbolo/caminho (não só por token)
+        term_hits: Set[str] = set()
+
+        def hit(term: str, score: float):
+            for path in self._terms.get(term, ()):
+                scores[path] += score
+                term_hits.add(path)
+                if term != path.lower():
+                    matches[path].update(self._spellings.get(term, ()))
+
+        # 1. Símbolo com o nome exato
+        if q in self._terms:
+            hit(q, EXACT_SYMBOL_SCORE)
+
+        # 2. Tokens da consulta (partes de snake_case/camelCase e do caminho)
+        for token in set(tokenize(query)):
+            for path, count in self._postings.get(token, {}).items():
+                scores[path] += TOKEN_SCORE * (2 + min(count, 3)) / 5
+
+        query_grams = trigrams(q)
+        if query_grams:
+            # 3. Substring: o termo precisa conter todos os trigramas da consulta
+            candidates = None
+            for gram in sorted(query_grams, key=lambda g: len(self._trigrams.get(g, ()))):
+                terms = self._trigrams.get(gram)
+                if not terms:
+                    candidates = set()
+                    break
+                candidates = set(terms) if candidates is None else candidates & terms
+                if not candidates:
+                    break
+
+            substring_terms = set()
+            for term in candidates or ():
+                if term != q and q in term:
+                    substring_terms.add(term)
+                    hit(term, SUBSTRING_SCORE * len(q) / len(term))
+
+            # 4. Aproximada (erros de digitação), só se faltarem resultados
+            if len(term_hits) < limit:
+                shared: Dict[str, int] = defaultdict(int)
+                for gram in query_grams:
+                    terms = self._trigrams.get(gram, ())
+                    if len(terms) > FUZZY_MAX_POSTINGS:
+                        continue
+                    for term in terms:
+                        shared[term] += 1
+
+                for term, count in shared.items():
+                    if term == q or term in substring_terms:
+                        continue
+                    similarity = count / max(len(query_grams), len(trigrams(term)))
+                    if similarity >= FUZZY_MIN_SIMILARITY:
+                        hit(term, FUZZY_SCORE * similarity)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [
+            {"path": path, "score": round(score, 3), "matches": sorted(matches.get(path, ()))}
+            for path, score in ranked
+        ]
@@ -0,0 +1,374 @@
+"""
+Extração de símbolos com tipo, nome qualificado e localização
+
+Python usa o módulo `ast`; JS/TS usam um tokenizador simples que ignora
+strings e comentários e acompanha o aninhamento de chaves. Demais
+linguagens (ou arquivos com erro de sintaxe) caem nas regexes antigas.
+"""
+
+import ast
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+# Tamanho máximo da assinatura guardada no índice
+MAX_SIGNATURE = 200
+
+_JS_EXTENSIONS = ('.js', '.jsx', '.mjs', '.ts', '.tsx')
+
+_PY_SYMBOL_RE = re.compile(r'(def|class)\s+([a-zA-Z_][a-zA-Z0-9_]*)')
+_JS_SYMBOL_RE = re.compile(r'(function|class|const|let)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*[:=]')
+
+# Palavras que parecem chamadas de método no corpo de uma classe JS
+_JS_NOT_METHODS = {'if', 'for', 'while', 'switch', 'catch', 'return', 'function', 'new', 'typeof'}
+_JS_MODIFIERS = {'static', 'async', 'get', 'set', 'public', 'private', 'protected', 'readonly', 'override', 'abstract'}
+
+
+def _symbol(name: str, qualname: str, kind: str, line: int, end_line: int, signature: str) -> Dict:
+    signature = " ".join(signature.split())
+    return {
+        "name": name,
+        "qualname": qualname,
+        "kind": kind,  # class | function | method | variable | symbol
+        "line": line,
+        "end_line": end_line,
+        "signature": signature[:MAX_SIGNATURE]
+    }
+
+
+def _line_text(content: str, offset: int) -> str:
+    end = content.find('\n', offset)
+    return content[offset:end if end != -1 else len(content)]
+
+
+def extract_symbols(path: str, content: str) -> List[Dict]:
+    """
+    Extrai os símbolos de um arquivo
+
+    Returns:
+        Lista de {"name", "qualname", "kind", "line", "end_line", "signature"}
+        com linhas 1-based inclusivas, na ordem em que aparecem
+    """
+    if path.endswith('.py'):
+        try:
+            return _extract_python(content)
+        except (SyntaxError, ValueError, RecursionError):
+            pass
+    elif path.endswith(_JS_EXTENSIONS):
+        return _extract_js(content)
+    return _extract_regex(content)
+
+
+# --- Python -----------------------------------------------------------------
+
+def _extract_python(content: str) -> List[Dict]:
+    tree = ast.parse(content)
+    symbols: List[Dict] = []
+
+    def visit(body, scope: List[str], in_class: bool):
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                bases = ", ".join(ast.unparse(b) for b in node.bases + node.keywords)
+                signature = f"class {node.name}({bases})" if bases else f"class {node.name}"
+                symbols.append(_symbol(node.name, ".".join(scope + [node.name]), "class",
+                                       _start_line(node), node.end_lineno, signature))
+                visit(node.body, scope + [node.name], True)
+
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+                signature = f"{prefix} {node.name}({ast.unparse(node.args)})"
+                if node.returns is not None:
+                    signature += f" -> {ast.unparse(node.returns)}"
+                symbols.append(_symbol(node.name, ".".join(scope + [node.name]),
+                                       "method" if in_class else "function",
+                                       _start_line(node), node.end_lineno, signature))
+                visit(node.body, scope + [node.name], False)
+
+            elif isinstance(node, (ast.If, ast.Try, ast.With, ast.AsyncWith)) and not scope:
+                # Definições condicionais no nível do módulo (if TYPE_CHECKING, try/except ImportError),
+                # na ordem do código: try, except, else, finally
+                blocks = [node.body] + [handler.body for handler in getattr(node, 'handlers', [])]
+                blocks += [getattr(node, 'orelse', []), getattr(node, 'finalbody', [])]
+                for block in blocks:
+                    visit(block, scope, in_class)
+
+    visit(tree.body, [], False)
+    return symbols
+
+
+def _start_line(node) -> int:
+    """Linha inicial incluindo decorators"""
+    lines = [d.lineno for d in getattr(node, 'decorator_list', [])]
+    return min(lines + [node.lineno])
+
+
+# --- JS / TS ----------------------------------------------------------------
+
+# (tipo, valor, linha, offset)
+_Token = tuple
+
+_JS_TOKEN_RE = re.compile(r'''
+    (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?)
+  | (?P<ident>[A-Za-z_$][A-Za-z0-9_$]*)
+  | (?P<arrow>=>)
+  | (?P<punct>[{}()\[\];,=:<>*.])
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+
+
+_JS_QUOTED_RE = re.compile(r'''"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?''')
+# Literal de regex: classes [...] podem conter `/`; não começa com `/` ou `*` (comentários)
+_JS_REGEX_RE = re.compile(r'/(?![*/])(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[A-Za-z]*')
+# Após estas palavras um `/` abre um regex, não é divisão
+_JS_REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'instanceof', 'yield', 'await'
+}
+
+
+def _template_end(content: str, i: int) -> int:
+    """Fim do template literal que abre em i (`${...}` pode ter strings e templates aninhados)"""
+    i += 1
+    while i < len(content):
+        char = content[i]
+        if char == '\\':
+            i += 2
+        elif char == '`':
+            return i + 1
+        elif content.startswith('${', i):
+            i = _expression_end(content, i + 2)
+        else:
+            i += 1
+    return len(content)
+
+
+def _expression_end(content: str, i: int) -> int:
+    """Índice após o `}` que fecha uma expressão `${` iniciada antes de i"""
+    depth = 1
+    while i < len(content):
+        char = content[i]
+        if char == '`':
+            i = _template_end(content, i)
+            continue
+        if char in '"\'':
+            i = _JS_QUOTED_RE.match(content, i).end()
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(content)
+
+
+def _tokenize_js(content: str) -> List[_Token]:
+    tokens = []
+    line = 1
+    position = 0
+    # Um `/` aqui começaria um regex (início, após operador ou palavra-chave)
+    regex_allowed = True
+    while position < len(content):
+        start = position
+        char = content[position]
+        regex = _JS_REGEX_RE.match(content, position) if char == '/' and regex_allowed else None
+        if regex:
+            kind, position = 'regex', regex.end()
+        elif char == '`':
+            kind, position = 'string', _template_end(content, position)
+        else:
+            match = _JS_TOKEN_RE.match(content, position)
+            kind, position = match.lastgroup, match.end()
+        value = content[start:position]
+
+        if kind in ('ident', 'arrow', 'punct'):
+            tokens.append((kind, value, line, start))
+        if kind == 'ident':
+            regex_allowed = value in _JS_REGEX_KEYWORDS
+        elif kind in ('string', 'regex'):
+            regex_allowed = False
+        elif kind in ('punct', 'arrow', 'other'):
+            # Depois de `)`, `]` ou de um número, `/` é divisão
+            regex_allowed = value not in (')', ']') and not value.isalnum()
+        line += value.count('\n')
+    return tokens
+
+
+def _extract_js(content: str) -> List[Dict]:
+    tokens = _tokenize_js(content)
+    symbols: List[Dict] = []
+    # Escopos abertos: (símbolo ou None, é corpo de classe)
+    scopes: List[tuple] = []
+    # Símbolo declarado cujo corpo `{` ainda não abriu
+    pending: Optional[Dict] = None
+    pending_start = 0
+
+    def scope_names() -> List[str]:
+        return [s["name"] for s, _ in scopes if s is not None]
+
+    def in_class_body() -> bool:
+        return bool(scopes) and scopes[-1][1]
+
+    def declare(name: str, kind: str, index: int, start_index: int) -> Dict:
+        qualname = ".".join(scope_names() + [name])
+        sym = _symbol(name, qualname, kind, tokens[start_index][2], tokens[index][2], "")
+        symbols.append(sym)
+        return sym
+
+    def signature(start_index: int, end_offset: int) -> str:
+        return " ".join(content[tokens[start_index][3]:end_offset].split())[:MAX_SIGNATURE]
+
+    def skip_parens(i: int) -> int:
+        """Índice do `)` que fecha o `(` em i"""
+        depth = 0
+        while i < len(tokens):
+            if tokens[i][1] == '(':
+                depth += 1
+            elif tokens[i][1] == ')':
+                depth -= 1
+                if depth == 0:
+                    return i
+            i += 1
+        return len(tokens) - 1
+
+    def body_start(i: int) -> int:
+        """A partir dos parâmetros em i, índice do `{` do corpo (ou de `;`/`}`)"""
+        while i < len(tokens) and tokens[i][1] != '(':
+            i += 1
+        i = skip_parens(i) + 1
+        # Tipo de retorno TS até o corpo; `{` dentro de genéricos é tipo, não corpo
+        angles = 0
+        while i < len(tokens) and (angles or tokens[i][1] not in ('{', ';', '}')):
+            if tokens[i][1] == '<':
+                angles += 1
+            elif tokens[i][1] == '>':
+                angles = max(0, angles - 1)
+            i += 1
+        return i
+
+    i = 0
+    while i < len(tokens):
+        kind, value, line, offset = tokens[i]
+
+        if value == '{':
+            sym = pending
+            pending = None
+            if sym is not None:
+                sym["signature"] = signature(pending_start, offset)
+            scopes.append((sym, sym is not None and sym["kind"] == "class"))
+            i += 1
+            continue
+
+        if value == '}':
+            if scopes:
+                sym, _ = scopes.pop()
+                if sym is not None:
+                    sym["end_line"] = line
+            i += 1
+            continue
+
+        if value == ';':
+            pending = None
+
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+
+        if kind == 'ident' and value == 'class' and nxt and nxt[0] == 'ident':
+            pending = declare(nxt[1], "class", i + 1, i)
+            pending_start = i
+            i += 2
+            continue
+
+        if kind == 'ident' and value == 'function':
+            j = i + 1
+            if j < len(tokens) and tokens[j][1] == '*':
+                j += 1
+            if j < len(tokens) and tokens[j][0] == 'ident':
+                start = i - 1 if i > 0 and tokens[i - 1][1] == 'async' else i
+                sym = declare(tokens[j][1], "function", j, start)
+                i = body_start(j)
+                if i < len(tokens) and tokens[i][1] == '{':
+                    pending = sym
+                    pending_start = start
+                continue
+
+        if kind == 'ident' and value in ('const', 'let', 'var') and nxt and nxt[0] == 'ident' \
+                and not in_class_body():
+            j = i + 2
+            # Anotação de tipo TS: const x: Tipo = ...
+            if j < len(tokens) and tokens[j][1] == ':':
+                while j < len(tokens) and tokens[j][1] not in ('=', ';'):
+                    j += 1
+            if j < len(tokens) and tokens[j][1] == '=':
+                k = j + 1
+                if k < len(tokens) and tokens[k][1] == 'async':
+                    k += 1
+                is_function = k < len(tokens) and (
+                    tokens[k][1] == 'function'
+                    or (tokens[k][1] == '(' and skip_parens(k) + 1 < len(tokens)
+                        and tokens[skip_parens(k) + 1][0] == 'arrow')
+                    or (tokens[k][0] == 'ident' and k + 1 < len(tokens) and tokens[k + 1][0] == 'arrow')
+                )
+                if is_function:
+                    sym = declare(nxt[1], "function", i + 1, i)
+                    start = i
+                    # Pula os parâmetros (e a seta) até onde o corpo começaria
+                    if tokens[k][1] == 'function':
+                        i = body_start(k)
+                    else:
+                        i = (skip_parens(k) if tokens[k][1] == '(' else k) + 2
+                    if i < len(tokens) and tokens[i][1] == '{':
+                        pending = sym
+                        pending_start = start
+                    else:
+                        # Arrow sem chaves: o corpo é uma expressão
+                        sym["signature"] = _line_text(content, offset)
+                    continue
+                if not scopes:
+                    sym = declare(nxt[1], "variable", i + 1, i)
+                    sym["signature"] = _line_text(content, offset)
+            i += 2
+            continue
+
+        # Métodos: nome(...) { no corpo de uma classe
+        if kind == 'ident' and in_class_body() and pending is None and value not in _JS_NOT_METHODS \
+                and nxt and nxt[1] in ('(', '<'):
+            start = i
+            while start > 0 and tokens[start - 1][1] in _JS_MODIFIERS and tokens[start - 1][2] == line:
+                start -= 1
+            # Um membro começa após `{`, `}` ou `;` (evita `campo: Tipo<...>`)
+            member_start = start == 0 or tokens[start - 1][1] in ('{', '}', ';')
+            k = body_start(i + 1)
+            if member_start and k < len(tokens) and tokens[k][1] == '{':
+                pending = declare(value, "method", i, start)
+                pending_start = start
+                i = k
+                continue
+
+        i += 1
+
+    return symbols
+
+
+# --- Fallback ---------------------------------------------------------------
+
+def _extract_regex(content: str) -> List[Dict]:
+    symbols = []
+    line_starts = [0] + [m.end() for m in re.finditer('\n', content)]
+
+    seen = set()
+    for regex in (_PY_SYMBOL_RE, _JS_SYMBOL_RE):
+        for match in regex.finditer(content):
+            keyword, name = match.groups()
+            line = bisect_right(line_starts, match.start())
+            if (name, line) in seen:
+                continue
+            seen.add((name, line))
+            kind = {"def": "function", "function": "function", "class": "class"}.get(keyword, "symbol")
+            symbols.append(_symbol(name, name, kind, line, line, _line_text(content, match.start())))
+
+    symbols.sort(key=lambda s: s["line"])
+    return symbols
@@ -0,0 +1,33 @@
+"""
+Contexto de multiprocessing para pools criados com o servidor em execução
+"""
+
+import multiprocessing
+from typing import List
+
+# Módulos pré-importados pelo servidor de processos (forkserver)
+_preload: List[str] = []
+
+
+def process_context(*preload: str):
+    """
+    Contexto seguro para criar processos a partir de um processo com threads
+
+    fork copiaria o servidor com o pool do SQLite, executores e watcher
+    rodando, e o filho pode herdar um lock preso por outra thread. O
+    forkserver cria os workers a partir de um processo limpo, que importa
+    os módulos de `preload` uma única vez.
+
+    Args:
+        preload: Módulos com as funções executadas nos workers
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+
+    for module in preload:
+        if module not in _preload:
+            _preload.append(module)
+    context = multiprocessing.get_context("forkserver")
+    # Só tem efeito antes de o servidor subir; depois os workers importam sob demanda
+    context.set_forkserver_preload(list(_preload))
+    return context
@@ -2,7 +2,7 @@
 Sistema de registro e execução de ferramentas
 """
 
-from typing import Dict, Callable, Any, Optional
+from typing import Dict, Callable, Any, Optional, List
 from dataclasses import dataclass
 import asyncio
 
@@ -21,6 +21,8 @@ class ToolRegistry:
     
     def __init__(self):
         self.tools: Dict[str, Tool] = {}
+        # Callbacks executados após uma ferramenta: hook(parameters, result)
+        self.hooks: Dict[str, List[Callable]] = {}
         self._register_built_in_tools()
     
     def register_tool(self, name: str, description: str, function: Callable, 
@@ -33,6 +35,10 @@ class ToolRegistry:
             parameters=parameters
         )
     
+    def add_hook(self, tool_name: str, hook: Callable):
+        """Registra um callback (sync ou async) chamado após cada execução da ferramenta"""
+        self.hooks.setdefault(tool_name, []).append(hook)
+
     def _register_built_in_tools(self):
         """Registra ferramentas built-in"""
         from backend.tools.file_operations import (
@@ -122,14 +128,23 @@ class ToolRegistry:
             result = await tool.function(**parameters)
         else:
             result = tool.function(**parameters)
+
+        for hook in self.hooks.get(tool_name, []):
+            try:
+                if asyncio.iscoroutinefunction(hook):
+                    await hook(parameters, result)
+                else:
+                    hook(parameters, result)
+            except Exception as e:
+                print(f"Erro no hook de '{tool_name}': {e}")
         
         return result
     
-    def register_execution_tools(self, conversation_id: str, provider: Optional[Any] = None, agent_manager: Optional[Any] = None):
+    def register_execution_tools(self, conversation_id: str, provider: Optional[Any] = None, agent_manager: Optional[Any] = None, indexer: Optional[Any] = None):
         """Registra ferramentas de execução (terminal/browser) para uma conversa"""
         from backend.execution.execution_tools import ExecutionTools
         
-        exec_tools = ExecutionTools(conversation_id, provider=provider, agent_manager=agent_manager, tool_registry=self)
+        exec_tools = ExecutionTools(conversation_id, provider=provider, agent_manager=agent_manager, tool_registry=self, indexer=indexer)
         
         self.register_tool(
             "terminal_run",
@@ -179,6 +194,90 @@ class ToolRegistry:
             }
         )
 
+        self.register_tool(
+            "code_retrieve",
+            "Busca os trechos de código (funções, classes) mais relevantes para uma descrição, sem ler arquivos inteiros",
+            exec_tools.code_retrieve,
+            {
+                "query": {
+                    "type": "string",
+                    "description": "Descrição ou palavras-chave do código procurado"
+                },
+                "k": {
+                    "type": "integer",
+                    "description": "Quantidade de trechos (ex: 5)"
+                }
+            }
+        )
+
+        self.register_tool(
+            "semantic_search",
+            "Encontra código que faz algo descrito em linguagem natural, mesmo sem saber os nomes usados",
+            exec_tools.semantic_search,
+            {
+                "query": {
+                    "type": "string",
+                    "description": "O que o código faz (ex: 'comprimir conversas antigas')"
+                },
+                "k": {
+                    "type": "integer",
+                    "description": "Quantidade de trechos (ex: 5)"
+                }
+            }
+        )
+
+        self.register_tool(
+            "read_symbol",
+            "Lê o código de uma função, classe ou método pelo nome (mais barato que ler o arquivo inteiro)",
+            exec_tools.read_symbol,
+            {
+                "name": {
+                    "type": "string",
+                    "description": "Nome simples ou qualificado do símbolo (ex: ProjectIndexer.search)"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Caminho relativo do arquivo para desambiguar, ou string vazia"
+                }
+            }
+        )
+
+        self.register_tool(
+            "find_usages",
+            "Lista onde uma função, classe, método ou variável é chamada ou usada no projeto",
+            exec_tools.find_usages,
+            {
+                "name": {
+                    "type": "string",
+                    "description": "Nome simples ou qualificado (ex: ProjectIndexer.search; qualificado só conta arquivos que definem ou importam o dono)"
+                }
+            }
+        )
+
+        self.register_tool(
+            "module_imports",
+            "Mostra o que um arquivo importa e quais arquivos do projeto o importam",
+            exec_tools.module_imports,
+            {
+                "path": {
+                    "type": "string",
+                    "description": "Caminho relativo do arquivo"
+                }
+            }
+        )
+
+        self.register_tool(
+            "change_impact",
+            "Lista os arquivos que podem ser afetados ao alterar um arquivo (dependentes e chamadores)",
+            exec_tools.change_impact,
+            {
+                "path": {
+                    "type": "string",
+                    "description": "Caminho relativo do arquivo a alterar"
+                }
+            }
+        )
+
         self.register_tool(
             "autonomous_terminal_run",
             "Executa um comando terminal com IA para auto-correção se falhar",
@@ -6,6 +6,8 @@
 let currentConversationId = null;
 let ws = null;
 let isStreaming = false;
+let pendingRender = null; // mensagem com texto ainda não renderizado
+let renderFrame = null;
 
 // Inicialização
 document.addEventListener('DOMContentLoaded', () => {
@@ -27,10 +29,43 @@ function createNotificationContainer() {
     }
 }
 
+// Sugestões proativas ativas (id -> sugestão), mantidas pelos diffs do servidor
+const proactiveSuggestions = new Map();
+
+function applyProactiveSuggestions(data) {
+    if (data.snapshot) {
+        // O snapshot substitui o estado: toasts fora dele estão obsoletos
+        proactiveSuggestions.clear();
+        const current = new Set(data.added.map(suggestion => String(suggestion.id)));
+        document.querySelectorAll('.proactive-toast').forEach(toast => {
+            if (!current.has(toast.dataset.suggestionId)) toast.remove();
+        });
+    }
+
+    // Sugestões resolvidas saem da lista e da tela
+    data.resolved.forEach(suggestion => {
+        proactiveSuggestions.delete(suggestion.id);
+        const toast = document.querySelector(`.proactive-toast[data-suggestion-id="${suggestion.id}"]`);
+        if (toast) toast.remove();
+    });
+
+    const added = data.added.filter(suggestion => !proactiveSuggestions.has(suggestion.id));
+    added.forEach(suggestion => proactiveSuggestions.set(suggestion.id, suggestion));
+
+    // Mostrar apenas a nova sugestão de maior prioridade para não floodar
+    if (added.length > 0) {
+        showProactiveSuggestion(added[0]);
+    }
+}
+
 function showProactiveSuggestion(suggestion) {
+    // Após um snapshot a sugestão pode já estar na tela
+    if (document.querySelector(`.proactive-toast[data-suggestion-id="${suggestion.id}"]`)) return;
+
     const container = document.getElementById('notification-container');
     const toast = document.createElement('div');
     toast.className = `proactive-toast alert-${suggestion.priority} glass-panel`;
+    toast.dataset.suggestionId = suggestion.id;
     toast.innerHTML = `
         <div class="toast-header">
             <span>✨ Sugestão Proativa</span>
@@ -101,10 +136,11 @@ function connectWebSocket() {
             if (window.terminalDashboard) {
                 window.terminalDashboard.logToolResult(data.tool, data.result);
             }
-        } else if (data.type === 'proactive_suggestion') {
-            showProactiveSuggestion(data.content);
+        } else if (data.type === 'proactive_suggestions') {
+            applyProactiveSuggestions(data);
         } else if (data.type === 'done') {
             isStreaming = false;
+            flushRender();
             Prism.highlightAll();
             // Processar Mermaid após a resposta completa
             mermaid.run({
@@ -186,13 +222,28 @@ function appendToLastMessage(chunk) {
     if (lastMessage && lastMessage.classList.contains('assistant-message')) {
         const contentDiv = lastMessage.querySelector('.message-content');
         const currentText = contentDiv.getAttribute('data-raw-text') || '';
-        const newText = currentText + chunk;
-        contentDiv.setAttribute('data-raw-text', newText);
+        contentDiv.setAttribute('data-raw-text', currentText + chunk);
 
-        const html = marked.parse(newText);
-        contentDiv.innerHTML = html;
-        scrollToBottom();
+        // Tokens chegam um a um: renderiza o markdown no máximo uma vez por frame
+        pendingRender = contentDiv;
+        if (!renderFrame) {
+            renderFrame = requestAnimationFrame(flushRender);
+        }
+    }
+}
+
+// Renderizar o texto acumulado da mensagem em streaming
+function flushRender() {
+    if (renderFrame) {
+        cancelAnimationFrame(renderFrame);
+        renderFrame = null;
     }
+    if (!pendingRender) return;
+
+    const contentDiv = pendingRender;
+    pendingRender = null;
+    contentDiv.innerHTML = marked.parse(contentDiv.getAttribute('data-raw-text') || '');
+    scrollToBottom();
 }
 
 // Nova conversa
@@ -204,13 +255,20 @@ function newChat() {
 }
 
 // Carregar conversas
-async function loadConversations() {
+async function loadConversations(cursor = null) {
     try {
-        const response = await fetch('/api/conversations');
-        const conversations = await response.json();
+        const url = cursor
+            ? `/api/conversations?cursor=${encodeURIComponent(cursor)}`
+            : '/api/conversations';
+        const response = await fetch(url);
+        const { conversations, next_cursor } = await response.json();
 
         const listDiv = document.getElementById('conversations-list');
-        listDiv.innerHTML = '';
+        // Primeira página recomeça a lista; as seguintes são acrescentadas
+        if (!cursor) {
+            listDiv.innerHTML = '';
+        }
+        listDiv.querySelector('.load-more-btn')?.remove();
 
         conversations.forEach(conv => {
             const item = document.createElement('div');
@@ -219,8 +277,22 @@ async function loadConversations() {
             item.onclick = () => loadConversation(conv.id);
             listDiv.appendChild(item);
         });
+
+        if (next_cursor) {
+            const loadMore = document.createElement('button');
+            loadMore.className = 'load-more-btn';
+            loadMore.textContent = 'Carregar mais';
+            loadMore.onclick = () => {
+                loadMore.disabled = true;
+                loadConversations(next_cursor);
+            };
+            listDiv.appendChild(loadMore);
+        }
     } catch (e) {
         console.error('Erro ao carregar conversas:', e);
+        // Permite tentar a página de novo
+        const loadMore = document.querySelector('.load-more-btn');
+        if (loadMore) loadMore.disabled = false;
     }
 }
 
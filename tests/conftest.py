@@ -0,0 +1,19 @@
+"""
+Fixtures compartilhadas dos testes
+"""
+
+import pytest
+
+from backend.memory.conversation_manager import ConversationManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "conversations.db")
+
+
+@pytest.fixture
+def manager(db_path):
+    manager = ConversationManager(db_path, pool_size=3)
+    yield manager
+    manager.close()
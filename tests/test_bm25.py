@@ -0,0 +1,95 @@
+"""
+Testes do BM25 sobre trechos e da sua atualização incremental
+"""
+
+from backend.memory.rag.bm25 import BM25Index
+from backend.memory.rag.chunker import chunk_file, chunk_terms
+from backend.memory.rag.symbol_extractor import extract_symbols
+
+
+def _chunk(name, text, line=1):
+    return {"name": name, "kind": "function", "line": line, "end_line": line, "terms": chunk_terms(text, name)}
+
+
+FILES = {
+    "store.py": [
+        _chunk("compress_payload", "compress payload zlib compress level bytes", 1),
+        _chunk("write_file", "open file write bytes flush", 5),
+    ],
+    "api.py": [
+        _chunk("handle_request", "request payload json response status", 1),
+    ],
+    "cache.py": [
+        _chunk("evict", "lru cache evict oldest entry bytes budget", 1),
+        _chunk("compress_entry", "compress cache entry before storing", 9),
+    ],
+}
+
+
+def _index(files=FILES):
+    index = BM25Index()
+    for path, chunks in files.items():
+        index.add_file(path, chunks)
+    return index
+
+
+def _ranked(results):
+    return [(result["path"], result["name"]) for result in results]
+
+
+def test_top_k_is_ordered_by_score():
+    results = _index().search("compress payload", k=3)
+
+    assert _ranked(results) == [
+        ("store.py", "compress_payload"),
+        ("cache.py", "compress_entry"),
+        ("api.py", "handle_request"),
+    ]
+    assert results[0]["score"] > results[1]["score"] > results[2]["score"]
+    assert _ranked(_index().search("compress payload", k=1)) == [("store.py", "compress_payload")]
+    assert "terms" not in results[0] and "_terms" not in results[0]
+
+
+def test_unknown_terms_return_nothing():
+    assert _index().search("zebra quux") == []
+    assert BM25Index().search("compress") == []
+
+
+def test_remove_and_readd_matches_a_fresh_index():
+    index = _index()
+    fresh = index.search("compress bytes", k=5)
+
+    index.remove_file("store.py")
+    assert all(result["path"] != "store.py" for result in index.search("compress bytes", k=5))
+    assert len(index) == 3
+    assert "zlib" not in index._postings
+
+    index.add_file("store.py", FILES["store.py"])
+    assert index.search("compress bytes", k=5) == fresh
+    # Ids liberados são reaproveitados
+    assert len(index._chunks) == 5
+
+
+def test_readd_replaces_previous_chunks():
+    index = _index()
+    index.add_file("store.py", [_chunk("decompress", "decompress payload zlib")])
+
+    assert len(index) == 4
+    assert ("store.py", "compress_payload") not in _ranked(index.search("compress", k=10))
+    assert _ranked(index.search("decompress", k=10)) == [("store.py", "decompress")]
+
+
+def test_chunks_of_a_scanned_file_are_searchable():
+    content = (
+        "def compress_payload(data):\n"
+        "    return zlib.compress(data)\n"
+        "\n"
+        "def render_page(request):\n"
+        "    return template.render(request)\n"
+    )
+    chunks = chunk_file(content, extract_symbols("m.py", content))
+    index = BM25Index()
+    index.add_file("m.py", chunks)
+
+    assert [c["name"] for c in chunks] == ["compress_payload", "render_page"]
+    assert _ranked(index.search("render template", k=1)) == [("m.py", "render_page")]
@@ -0,0 +1,94 @@
+"""
+Testes do pool de conexões SQLite
+"""
+
+import threading
+import time
+
+import pytest
+
+from backend.memory.connection_pool import SQLiteConnectionPool
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = SQLiteConnectionPool(db_path, size=3, timeout=2.0)
+    yield pool
+    pool.close()
+
+
+def test_wal_mode_and_pragmas(pool):
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_connections_are_reused(pool):
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+
+
+def test_never_exceeds_size_under_contention(pool):
+    in_use = set()
+    peak = 0
+    lock = threading.Lock()
+    errors = []
+
+    def worker():
+        nonlocal peak
+        try:
+            for _ in range(20):
+                with pool.connection() as conn:
+                    with lock:
+                        in_use.add(id(conn))
+                        peak = max(peak, len(in_use))
+                    conn.execute("SELECT 1").fetchone()
+                    time.sleep(0.001)
+                    with lock:
+                        in_use.discard(id(conn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert peak <= pool.size
+    assert pool._created <= pool.size
+
+
+def test_timeout_when_exhausted(db_path):
+    pool = SQLiteConnectionPool(db_path, size=1, timeout=0.05)
+    try:
+        with pool.connection():
+            with pytest.raises(TimeoutError):
+                with pool.connection():
+                    pass
+    finally:
+        pool.close()
+
+
+def test_release_rolls_back_open_transaction(pool):
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+        assert conn.in_transaction
+
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_closed_pool_rejects_acquire(pool):
+    pool.close()
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            pass
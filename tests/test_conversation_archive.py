@@ -0,0 +1,196 @@
+"""
+Testes do arquivamento de conversas e da restauração sob demanda
+"""
+
+import asyncio
+import contextlib
+
+from backend.memory.async_conversation_manager import AsyncConversationManager
+from backend.memory.conversation_archiver import ConversationArchiver
+from backend.memory.conversation_manager import ConversationManager
+
+from tests.test_conversation_manager import _create_baseline_db
+
+
+def _make_idle(manager, conversation_id):
+    with manager._pool.connection() as conn, conn:
+        conn.execute(
+            "UPDATE conversations SET updated_at = '2000-01-01 00:00:00' WHERE id = ?",
+            (conversation_id,)
+        )
+
+
+def _conversation(manager, *contents):
+    conversation_id = manager.create_conversation("Arquivada")
+    for content in contents:
+        manager.add_message(conversation_id, "user", content)
+    _make_idle(manager, conversation_id)
+    return conversation_id
+
+
+def _stored_rows(manager, table, conversation_id):
+    with manager._pool.connection() as conn:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE conversation_id = ?", (conversation_id,)
+        ).fetchone()[0]
+
+
+def test_archive_and_rehydrate_round_trip(manager):
+    conversation_id = _conversation(manager, "primeira", "segunda", "terceira")
+    before = manager.get_messages(conversation_id)
+    manager.cache.clear()
+
+    assert manager.archive_idle_conversations(max_idle_days=1) == 1
+    assert _stored_rows(manager, "messages", conversation_id) == 0
+    assert _stored_rows(manager, "archived_conversations", conversation_id) == 1
+
+    # Acesso restaura as mensagens com os ids originais
+    assert manager.get_messages(conversation_id) == before
+    assert _stored_rows(manager, "archived_conversations", conversation_id) == 0
+    assert _stored_rows(manager, "archived_messages", conversation_id) == 0
+
+
+def test_lzma_codec_round_trip(db_path):
+    manager = ConversationManager(db_path, archive_codec="lzma")
+    try:
+        conversation_id = _conversation(manager, "comprimida com lzma")
+        before = manager.get_messages(conversation_id)
+        assert manager.archive_idle_conversations(max_idle_days=1) == 1
+        assert manager.get_messages(conversation_id) == before
+    finally:
+        manager.close()
+
+
+def test_archived_conversations_stay_searchable(manager):
+    conversation_id = _conversation(manager, "configurar o webpack", "outra coisa")
+    manager.archive_idle_conversations(max_idle_days=1)
+
+    results = manager.search_messages("webpack")
+    assert len(results) == 1
+    assert results[0]["conversation_id"] == conversation_id
+    assert results[0]["archived"] is True
+    assert "**webpack**" in results[0]["snippet"]
+
+    # Depois de restaurada, a mensagem volta ao índice principal sem duplicar
+    manager.get_messages(conversation_id)
+    results = manager.search_messages("webpack")
+    assert [(r["conversation_id"], r["archived"]) for r in results] == [(conversation_id, False)]
+
+
+def test_archive_rehydrate_archive_keeps_one_hit(manager):
+    conversation_id = _conversation(manager, "mensagem sobre kubernetes")
+    for _ in range(2):
+        manager.archive_idle_conversations(max_idle_days=1)
+        manager.get_messages(conversation_id)
+        _make_idle(manager, conversation_id)
+    manager.archive_idle_conversations(max_idle_days=1)
+
+    assert len(manager.search_messages("kubernetes")) == 1
+
+
+def test_delete_archived_conversation_clears_search(manager):
+    conversation_id = _conversation(manager, "segredo apagado")
+    manager.archive_idle_conversations(max_idle_days=1)
+
+    manager.delete_conversation(conversation_id)
+    assert manager.search_messages("segredo") == []
+    assert _stored_rows(manager, "archived_messages", conversation_id) == 0
+
+
+def test_migration_indexes_existing_archives(db_path):
+    manager = ConversationManager(db_path)
+    conversation_id = _conversation(manager, "arquivada antes da busca")
+    manager.archive_idle_conversations(max_idle_days=1)
+    # Volta o banco para a versão anterior ao índice das arquivadas
+    with manager._pool.connection() as conn, conn:
+        conn.execute("DROP TABLE archived_fts")
+        conn.execute("DROP TABLE archived_messages")
+        conn.execute("PRAGMA user_version = 6")
+    manager.close()
+
+    manager = ConversationManager(db_path)
+    try:
+        results = manager.search_messages("busca")
+        assert [r["conversation_id"] for r in results] == [conversation_id]
+    finally:
+        manager.close()
+
+
+def test_existing_database_is_not_vacuumed_at_startup(db_path):
+    _create_baseline_db(db_path)
+    manager = ConversationManager(db_path)
+    try:
+        with manager._pool.connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+        assert manager.enable_incremental_vacuum() is True
+        assert manager.enable_incremental_vacuum() is False
+        with manager._pool.connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        manager.close()
+
+
+def test_conversion_skips_databases_over_the_limit(db_path):
+    _create_baseline_db(db_path)
+    manager = ConversationManager(db_path)
+    try:
+        assert manager.enable_incremental_vacuum(max_bytes=1024) is False
+        with manager._pool.connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    finally:
+        manager.close()
+
+
+def test_archiver_converts_only_when_enabled(db_path):
+    _create_baseline_db(db_path)
+    manager = AsyncConversationManager(ConversationManager(db_path))
+    try:
+        asyncio.run(ConversationArchiver(manager).run_once())
+        with manager.manager._pool.connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+        asyncio.run(ConversationArchiver(manager, convert_vacuum=True, convert_max_mb=0).run_once())
+        with manager.manager._pool.connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+        asyncio.run(ConversationArchiver(manager, convert_vacuum=True).run_once())
+        with manager.manager._pool.connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    finally:
+        manager.close()
+
+
+class _ConnectionProxy:
+    """Conexão que roda `before_begin` antes do primeiro BEGIN IMMEDIATE"""
+
+    def __init__(self, conn, before_begin):
+        self._conn = conn
+        self._before_begin = before_begin
+
+    def execute(self, sql, *args):
+        if sql == "BEGIN IMMEDIATE" and self._before_begin:
+            callback, self._before_begin = self._before_begin, None
+            callback()
+        return self._conn.execute(sql, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_conversation_active_before_begin_is_not_archived(manager, monkeypatch):
+    conversation_id = _conversation(manager, "antiga")
+    pool_connection = manager._pool.connection
+
+    @contextlib.contextmanager
+    def connection():
+        # Só a conexão do arquivamento é interceptada; add_message usa o pool normal
+        monkeypatch.undo()
+        with pool_connection() as conn:
+            yield _ConnectionProxy(conn, lambda: manager.add_message(conversation_id, "user", "nova"))
+
+    monkeypatch.setattr(manager._pool, "connection", connection)
+    assert manager.archive_idle_conversations(max_idle_days=1) == 0
+
+    assert _stored_rows(manager, "archived_conversations", conversation_id) == 0
+    assert [m["content"] for m in manager.get_messages(conversation_id)] == ["antiga", "nova"]
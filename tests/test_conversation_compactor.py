@@ -0,0 +1,72 @@
+"""
+Testes da compactação de conversas em resumo acumulado
+"""
+
+import asyncio
+
+import pytest
+
+from backend.memory.async_conversation_manager import AsyncConversationManager
+from backend.memory.conversation_compactor import ConversationCompactor
+
+
+class FakeProvider:
+    name = "fake"
+
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    async def generate(self, messages):
+        self.prompts.append(messages[0]["content"])
+        return self.response
+
+
+@pytest.fixture
+def async_manager(manager):
+    async_manager = AsyncConversationManager(manager)
+    yield async_manager
+    async_manager._executor.shutdown(wait=True)
+
+
+def _compactor(async_manager, provider, keep_recent=20):
+    return ConversationCompactor(
+        async_manager, lambda: provider, threshold_tokens=30, keep_recent_tokens=keep_recent
+    )
+
+
+def test_folds_old_messages_and_keeps_recent(manager, async_manager):
+    conversation_id = manager.create_conversation()
+    for i in range(4):
+        manager.add_message(conversation_id, "user", f"m{i} " + "x" * 37)  # 10 tokens
+    ids = [m["id"] for m in manager.get_messages(conversation_id)]
+
+    provider = FakeProvider({"content": "resumo"})
+    assert asyncio.run(_compactor(async_manager, provider).compact(conversation_id))
+
+    summary = manager.get_summary(conversation_id)
+    assert summary == {"summary": "resumo", "upto_id": ids[1]}
+    assert "m1" in provider.prompts[0] and "m2" not in provider.prompts[0]
+
+
+def test_newest_message_is_never_folded(manager, async_manager):
+    conversation_id = manager.create_conversation()
+    manager.add_message(conversation_id, "user", "antiga " + "x" * 30)
+    manager.add_message(conversation_id, "user", "enorme " + "x" * 400)  # > keep_recent sozinha
+    ids = [m["id"] for m in manager.get_messages(conversation_id)]
+
+    provider = FakeProvider({"content": "resumo"})
+    assert asyncio.run(_compactor(async_manager, provider).compact(conversation_id))
+
+    assert manager.get_summary(conversation_id)["upto_id"] == ids[0]
+    assert "enorme" not in provider.prompts[0]
+
+
+def test_provider_error_keeps_previous_summary(manager, async_manager):
+    conversation_id = manager.create_conversation()
+    for i in range(4):
+        manager.add_message(conversation_id, "user", "x" * 40)
+
+    provider = FakeProvider({"content": "Erro ao gerar resposta: quota", "error": "quota"})
+    assert not asyncio.run(_compactor(async_manager, provider).compact(conversation_id))
+    assert manager.get_summary(conversation_id) is None
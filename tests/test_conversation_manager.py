@@ -0,0 +1,114 @@
+"""
+Testes de migrações e paginação do ConversationManager
+"""
+
+import sqlite3
+
+import pytest
+
+from backend.memory.conversation_manager import ConversationManager, estimate_tokens
+
+
+def _create_baseline_db(db_path):
+    """Banco no formato original (sem migrações aplicadas)"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE conversations (
+            id TEXT PRIMARY KEY,
+            title TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation_id TEXT,
+            role TEXT,
+            content TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (conversation_id) REFERENCES conversations(id)
+        );
+        INSERT INTO conversations (id, title) VALUES ('legado', 'Antiga');
+        INSERT INTO messages (conversation_id, role, content) VALUES ('legado', 'user', 'olá mundo legado');
+        INSERT INTO messages (conversation_id, role, content) VALUES ('legado', 'assistant', 'resposta');
+    """)
+    conn.commit()
+    conn.close()
+
+
+def _user_version(manager):
+    with manager._pool.connection() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_fresh_database_applies_all_migrations(manager):
+    with manager._pool.connection() as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert "idx_messages_conversation" in indexes
+    assert "idx_conversations_updated" in indexes
+    assert _user_version(manager) == 7
+
+
+def test_migrates_baseline_database(db_path):
+    _create_baseline_db(db_path)
+    manager = ConversationManager(db_path)
+    try:
+        assert _user_version(manager) == 7
+        messages = manager.get_messages("legado")
+        assert [m["content"] for m in messages] == ["olá mundo legado", "resposta"]
+        # token_count preenchido na migração
+        assert manager.count_tokens("legado") == estimate_tokens("olá mundo legado") + estimate_tokens("resposta")
+        # Mensagens antigas entram no índice de busca
+        assert [r["conversation_id"] for r in manager.search_messages("legado")] == ["legado"]
+    finally:
+        manager.close()
+
+
+def test_reopening_is_idempotent(db_path):
+    ConversationManager(db_path).close()
+    manager = ConversationManager(db_path)
+    try:
+        assert _user_version(manager) == 7
+    finally:
+        manager.close()
+
+
+def test_list_conversations_keyset_pagination(manager):
+    ids = {manager.create_conversation(f"c{i}") for i in range(7)}
+
+    seen, cursor = [], None
+    while True:
+        page = manager.list_conversations(limit=3, cursor=cursor)
+        seen.extend(c["id"] for c in page)
+        if len(page) < 3:
+            break
+        cursor = manager.make_cursor(page[-1])
+
+    assert len(seen) == len(set(seen)) == 7
+    assert set(seen) == ids
+
+
+def test_invalid_cursor(manager):
+    with pytest.raises(ValueError):
+        manager.list_conversations(limit=3, cursor="sem-separador")
+
+
+def test_get_messages_after_id_and_limit(manager):
+    conversation_id = manager.create_conversation()
+    for i in range(5):
+        manager.add_message(conversation_id, "user", f"m{i}")
+
+    first = manager.get_messages(conversation_id, limit=2)
+    assert [m["content"] for m in first] == ["m0", "m1"]
+    rest = manager.get_messages(conversation_id, after_id=first[-1]["id"])
+    assert [m["content"] for m in rest] == ["m2", "m3", "m4"]
+
+
+def test_context_window_respects_token_budget(manager):
+    conversation_id = manager.create_conversation()
+    for i in range(4):
+        manager.add_message(conversation_id, "user", "x" * 40)  # 10 tokens
+
+    window = manager.get_context_window(conversation_id, max_tokens=25)
+    assert len(window) == 2
+    assert window == manager.get_messages(conversation_id)[-2:]
@@ -0,0 +1,142 @@
+"""
+Testes do índice de embeddings: busca IVF x força bruta e reuso de linhas
+"""
+
+import random
+
+import pytest
+
+from backend.memory.rag.embedding_index import EmbeddingIndex, MIN_CHUNK_TERMS
+
+TOPICS = [
+    ["compress", "zlib", "payload", "bytes", "level", "deflate"],
+    ["request", "response", "status", "header", "json", "route"],
+    ["cache", "evict", "lru", "budget", "entry", "oldest"],
+    ["token", "parse", "lexer", "grammar", "syntax", "node"],
+    ["socket", "stream", "chunk", "websocket", "send", "receive"],
+    ["vector", "matrix", "embedding", "cosine", "norm", "dim"],
+]
+
+
+def _chunks(rng, count):
+    """Trechos com termos de um tema e um pouco de ruído"""
+    chunks = []
+    for _ in range(count):
+        topic = rng.choice(TOPICS)
+        terms = {}
+        for term in rng.choices(topic, k=10) + [f"noise{rng.randrange(200)}" for _ in range(3)]:
+            terms[term] = terms.get(term, 0) + 1
+        chunks.append({"terms": terms})
+    return chunks
+
+
+def _fill(index, files=40, chunks_per_file=5, seed=1):
+    rng = random.Random(seed)
+    for i in range(files):
+        index.add_file(f"f{i}.py", f"h{i}", _chunks(rng, chunks_per_file))
+
+
+QUERIES = ["compress payload bytes", "cache evict budget", "websocket stream chunk",
+           "parse syntax node", "embedding cosine", "json response status"]
+
+
+@pytest.fixture
+def ivf_index(tmp_path):
+    index = EmbeddingIndex(tmp_path / "embeddings", ivf_min_rows=100)
+    _fill(index)
+    index.maintain()
+    return index
+
+
+def test_small_index_stays_brute_force(tmp_path):
+    index = EmbeddingIndex(tmp_path / "embeddings", ivf_min_rows=1000)
+    _fill(index)
+    index.maintain()
+
+    assert index.mode == "brute"
+    assert index.search("compress payload", 5, mode="ivf") == index.search("compress payload", 5, mode="brute")
+
+
+def test_ivf_probing_every_list_matches_brute_force(ivf_index):
+    assert ivf_index.mode == "ivf"
+    ivf_index.nprobe = len(ivf_index._centroids)
+
+    for query in QUERIES:
+        assert ivf_index.search(query, 5) == ivf_index.search(query, 5, mode="brute")
+
+
+def test_ivf_top_k_agrees_with_brute_force(ivf_index):
+    overlap = 0
+    for query in QUERIES:
+        ivf = {(path, position) for path, position, _ in ivf_index.search(query, 5)}
+        brute = {(path, position) for path, position, _ in ivf_index.search(query, 5, mode="brute")}
+        overlap += len(ivf & brute)
+
+    assert overlap / (5 * len(QUERIES)) >= 0.8
+
+
+def test_ivf_is_retrained_when_rows_double(tmp_path):
+    index = EmbeddingIndex(tmp_path / "embeddings", ivf_min_rows=100)
+    _fill(index, files=30)
+    index.maintain()
+    trained = index._trained_rows
+    centroids = index._centroids
+
+    _fill(index, files=40, seed=2)
+    index.maintain()
+    assert index._centroids is centroids
+
+    for i in range(40, 80):
+        index.add_file(f"f{i}.py", f"h{i}", _chunks(random.Random(i), 5))
+    index.maintain()
+    assert index._trained_rows >= 2 * trained
+    assert index._centroids is not centroids
+    # Linhas novas entre retreinos também recebem um grupo
+    alive = index._alive[:index._next_row]
+    assert (index._assign[:index._next_row][alive] >= 0).all()
+
+    for i in range(80):
+        index.remove_file(f"f{i}.py")
+    index.maintain()
+    assert index.mode == "brute"
+
+
+def test_removed_rows_are_reused(tmp_path):
+    index = EmbeddingIndex(tmp_path / "embeddings")
+    _fill(index, files=10)
+    used = index._next_row
+    rows = set(index._files["f3.py"]["rows"])
+
+    index.remove_file("f3.py")
+    assert all(path != "f3.py" for path, _, _ in index.search("compress payload", 50))
+
+    index.add_file("f10.py", "h10", _chunks(random.Random(7), 5))
+    assert index._next_row == used
+    assert set(index._files["f10.py"]["rows"]) == rows
+
+
+def test_unchanged_hash_is_not_recomputed(tmp_path):
+    index = EmbeddingIndex(tmp_path / "embeddings")
+    _fill(index, files=3)
+    rows = list(index._files["f1.py"]["rows"])
+
+    index.add_file("f1.py", "h1", [])
+    assert index._files["f1.py"]["rows"] == rows
+
+    index.add_file("f1.py", "changed", [{"terms": {"tiny": 1}}])
+    assert index._files["f1.py"]["rows"] == [-1]
+    assert MIN_CHUNK_TERMS > 1
+
+
+def test_save_and_load_round_trip(tmp_path, ivf_index):
+    ivf_index.save()
+    expected = {query: ivf_index.search(query, 5) for query in QUERIES}
+
+    loaded = EmbeddingIndex(tmp_path / "embeddings", ivf_min_rows=100)
+    assert loaded.load()
+    assert loaded.mode == "ivf"
+    assert {query: loaded.search(query, 5) for query in QUERIES} == expected
+
+    # Sincronizar com o mesmo manifesto não recalcula nada
+    loaded.sync({path: {"hash": info["hash"]} for path, info in loaded._files.items()})
+    assert not loaded._dirty
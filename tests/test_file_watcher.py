@@ -0,0 +1,156 @@
+"""
+Testes do FileWatcher com o backend de polling: lotes, remoções e assinantes
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.memory.rag.file_watcher import FileWatcher, PollingBackend
+from backend.memory.rag.project_indexer import ProjectIndexer
+
+POLL = 0.05
+
+
+class RecordingIndexer(ProjectIndexer):
+    """Indexador real que guarda cada lote recebido do watcher"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def update_files(self, paths):
+        self.batches.append((time.monotonic(), sorted(self.relative_path(p) for p in paths)))
+        return super().update_files(paths)
+
+
+@pytest.fixture
+def indexer(tmp_path):
+    (tmp_path / "keep.py").write_text("def keep():\n    pass\n")
+    (tmp_path / "gone.py").write_text("def gone():\n    pass\n")
+    indexer = RecordingIndexer(str(tmp_path), workers=1, save_delay=60)
+    indexer.index_project()
+    yield indexer
+    indexer.flush()
+
+
+def _watch(indexer, scenario, **options):
+    """Roda `scenario(watcher)` com o watcher observando por polling"""
+    options.setdefault("debounce", 0.15)
+    watcher = FileWatcher(indexer, backend="polling", poll_interval=POLL, **options)
+
+    async def main():
+        task = asyncio.create_task(watcher.run())
+        while watcher.backend is None:
+            await asyncio.sleep(0.01)
+        # Espera o primeiro retrato do polling antes de mexer nos arquivos
+        await asyncio.sleep(POLL * 3)
+        try:
+            return await scenario(watcher)
+        finally:
+            watcher.stop()
+            await task
+
+    return asyncio.run(main())
+
+
+async def _next_event(queue, timeout=3.0):
+    return await asyncio.wait_for(queue.get(), timeout)
+
+
+def test_polling_backend_reports_created_modified_and_deleted(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    backend = PollingBackend(tmp_path, interval=POLL)
+    events, stop = [], threading.Event()
+    thread = threading.Thread(target=backend.run, args=(events.append, stop))
+    thread.start()
+    time.sleep(POLL * 3)
+
+    (tmp_path / "a.py").write_text("a = 2  # maior\n")
+    (tmp_path / "b.py").unlink()
+    (tmp_path / "c.py").write_text("c = 1\n")
+    (tmp_path / "notes.txt").write_text("fora do índice\n")
+    time.sleep(POLL * 4)
+    stop.set()
+    thread.join()
+
+    assert sorted(set(events)) == [str(tmp_path / name) for name in ("a.py", "b.py", "c.py")]
+
+
+def test_continuous_writes_are_coalesced_within_max_delay(indexer, tmp_path):
+    target = tmp_path / "keep.py"
+
+    async def scenario(watcher):
+        queue = watcher.subscribe()
+        for i in range(40):
+            with open(target, "a") as f:
+                f.write(f"# edição {i}\n")
+            await asyncio.sleep(0.03)
+        stopped = time.monotonic()
+        while True:
+            event = await _next_event(queue)
+            if not indexer.batches or indexer.batches[-1][0] >= stopped:
+                break
+        return stopped, event
+
+    stopped, event = _watch(indexer, scenario, max_delay=0.4)
+
+    # ~1,2s de escrita contínua: o debounce nunca expira, mas o max_delay força lotes
+    assert 2 <= len(indexer.batches) <= 6
+    assert indexer.batches[0][0] < stopped
+    assert all(paths == ["keep.py"] for _, paths in indexer.batches)
+    assert event["paths"] == ["keep.py"]
+    assert event["stats"]["updated"] == 1
+
+
+def test_deleted_file_leaves_the_index(indexer, tmp_path):
+    async def scenario(watcher):
+        queue = watcher.subscribe()
+        (tmp_path / "gone.py").unlink()
+        return await _next_event(queue)
+
+    event = _watch(indexer, scenario)
+
+    assert event == {
+        "type": "files_changed",
+        "paths": ["gone.py"],
+        "stats": {"added": 0, "updated": 0, "removed": 1, "unchanged": 0},
+    }
+    assert "gone.py" not in indexer.index["files"]
+    assert "keep.py" in indexer.index["files"]
+
+
+def test_batches_are_delivered_to_every_subscriber(indexer, tmp_path):
+    async def scenario(watcher):
+        first, second, dropped = watcher.subscribe(), watcher.subscribe(), watcher.subscribe()
+        watcher.unsubscribe(dropped)
+        (tmp_path / "new.py").write_text("def new():\n    pass\n")
+        (tmp_path / "gone.py").unlink()
+        return await _next_event(first), await _next_event(second), dropped.empty()
+
+    first, second, dropped_is_empty = _watch(indexer, scenario)
+
+    assert first == second
+    assert first["paths"] == ["gone.py", "new.py"]
+    assert first["stats"]["added"] == 1 and first["stats"]["removed"] == 1
+    assert dropped_is_empty
+    assert len(indexer.batches) == 1
+
+
+def test_full_subscriber_queue_does_not_block_others(indexer):
+    watcher = FileWatcher(indexer, backend="polling")
+
+    async def main():
+        full, ok = watcher.subscribe(), watcher.subscribe()
+        for _ in range(full.maxsize):
+            full.put_nowait({"type": "old"})
+        watcher.publish({"type": "files_changed", "paths": [], "stats": {}})
+        return full.qsize(), ok.get_nowait()
+
+    size, event = asyncio.run(main())
+
+    assert size == 100
+    assert event["type"] == "files_changed"
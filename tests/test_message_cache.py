@@ -0,0 +1,118 @@
+"""
+Testes do cache LRU de históricos e de suas corridas com escritas
+"""
+
+import threading
+
+from backend.memory.message_cache import CachedMessage, MessageCache
+
+
+def _message(message_id, content="x"):
+    return CachedMessage(message_id, "user", content, "2024-01-01 00:00:00", 1)
+
+
+def _contents(messages):
+    return [m.content for m in messages]
+
+
+def test_append_after_load_that_saw_the_row(manager):
+    """add_message comita, uma leitura concorrente carrega a linha nova e só depois o append roda"""
+    conversation_id = manager.create_conversation()
+    manager.add_message(conversation_id, "user", "a")
+
+    cache = manager.cache
+    real_append = cache.append
+    pending = []
+    # Adia o write-through do add_message para depois da leitura
+    cache.append = lambda cid, message: pending.append((cid, message))
+    manager.add_message(conversation_id, "user", "b")
+    cache.append = real_append
+
+    cache.invalidate(conversation_id)
+    assert _contents(manager._cached_messages(conversation_id)) == ["a", "b"]
+
+    for cid, message in pending:
+        cache.append(cid, message)
+
+    assert _contents(cache.get(conversation_id)) == ["a", "b"]
+    assert [m["content"] for m in manager.get_messages(conversation_id)] == ["a", "b"]
+
+
+def test_append_is_idempotent_by_id():
+    cache = MessageCache()
+    version = cache.begin_load("c")
+    cache.finish_load("c", version, [_message(1, "a"), _message(2, "b")])
+
+    cache.append("c", _message(2, "b"))
+    cache.append("c", _message(1, "a"))
+    assert _contents(cache.get("c")) == ["a", "b"]
+
+
+def test_out_of_order_append_keeps_id_order():
+    cache = MessageCache()
+    version = cache.begin_load("c")
+    cache.finish_load("c", version, [_message(1, "a"), _message(3, "c")])
+
+    cache.append("c", _message(2, "b"))
+    assert _contents(cache.get("c")) == ["a", "b", "c"]
+
+
+def test_write_during_load_discards_stale_history():
+    cache = MessageCache()
+    version = cache.begin_load("c")
+    cache.append("c", _message(2, "b"))
+
+    assert not cache.finish_load("c", version, [_message(1, "a")])
+    assert cache.get("c") is None
+
+
+def test_evicts_least_recently_used():
+    cache = MessageCache(max_bytes=6000)
+    for conversation_id in "abcde":
+        version = cache.begin_load(conversation_id)
+        assert cache.finish_load(conversation_id, version, [_message(1, "x" * 1000)])
+        if conversation_id == "b":
+            cache.get("a")
+
+    stats = cache.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] == 1
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_concurrent_writes_and_reads_match_database(manager):
+    conversation_id = manager.create_conversation()
+    errors = []
+
+    def writer(prefix):
+        try:
+            for i in range(30):
+                manager.add_message(conversation_id, "user", f"{prefix}{i}")
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(60):
+                manager.cache.invalidate(conversation_id)
+                manager.get_messages(conversation_id)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(p,)) for p in "ab"]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with manager._pool.connection() as conn:
+        stored = [row[0] for row in conn.execute(
+            "SELECT id FROM messages WHERE conversation_id = ? ORDER BY id", (conversation_id,)
+        )]
+    cached = manager.cache.get(conversation_id)
+    if cached is not None:
+        assert [m.id for m in cached] == stored
+    assert [m["id"] for m in manager.get_messages(conversation_id)] == stored
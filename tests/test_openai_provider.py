@@ -0,0 +1,115 @@
+"""
+Testes do streaming de texto e tool calls do provider OpenAI
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from backend.llm_providers.openai_provider import OpenAIProvider
+
+CONFIG = {
+    "llm": {
+        "model": "gpt-test",
+        "temperature": 0,
+        "max_tokens": 100,
+        "api_keys": {"openai": "sk-test"},
+    }
+}
+
+
+def _chunk(content=None, calls=(), finish_reason=None):
+    tool_calls = [
+        SimpleNamespace(index=index, function=SimpleNamespace(name=name, arguments=arguments))
+        for index, name, arguments in calls
+    ]
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls or None)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+class FakeCompletions:
+    """Devolve os chunks informados como um stream assíncrono"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.requests = []
+
+    async def create(self, **options):
+        self.requests.append(options)
+
+        async def stream():
+            for chunk in self.chunks:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+
+        return stream()
+
+
+def _events(chunks, tools=None):
+    provider = OpenAIProvider(CONFIG)
+    completions = FakeCompletions(chunks)
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    async def collect():
+        return [event async for event in provider.stream_chat([{"role": "user", "content": "oi"}], tools=tools)]
+
+    return asyncio.run(collect()), completions.requests
+
+
+def test_interleaved_tool_call_fragments_are_assembled_by_index():
+    tools = [{"type": "function", "function": {"name": "read_file"}}]
+    events, requests = _events([
+        _chunk("Vou "),
+        _chunk(calls=[(0, "read_", '{"pa')]),
+        _chunk(calls=[(1, "list_dir", ""), (0, "file", "")]),
+        _chunk("olhar", calls=[(1, None, '{"path"')]),
+        _chunk(calls=[(0, None, 'th": "a.py"}')]),
+        _chunk(calls=[(1, None, ': "src", "depth": 2}')]),
+        _chunk(finish_reason="tool_calls"),
+    ], tools=tools)
+
+    assert events == [
+        {"type": "text", "content": "Vou "},
+        {"type": "text", "content": "olhar"},
+        {"type": "tool_call", "name": "read_file", "arguments": {"path": "a.py"}},
+        {"type": "tool_call", "name": "list_dir", "arguments": {"path": "src", "depth": 2}},
+    ]
+    assert requests[0]["tools"] == tools
+    assert requests[0]["stream"] is True
+
+
+def test_calls_are_emitted_at_each_finish_and_at_stream_end():
+    events, requests = _events([
+        _chunk(calls=[(0, "first", "{}")], finish_reason="tool_calls"),
+        SimpleNamespace(choices=[]),
+        _chunk("depois"),
+        _chunk(calls=[(0, "second", '{"x": 1}')]),
+    ])
+
+    assert events == [
+        {"type": "tool_call", "name": "first", "arguments": {}},
+        {"type": "text", "content": "depois"},
+        {"type": "tool_call", "name": "second", "arguments": {"x": 1}},
+    ]
+    assert "tools" not in requests[0]
+
+
+def test_incomplete_arguments_become_an_empty_dict():
+    events, _ = _events([
+        _chunk(calls=[(0, "read_file", '{"path": "a.')]),
+        _chunk(calls=[(1, "list_dir", None)], finish_reason="tool_calls"),
+    ])
+
+    assert events == [
+        {"type": "tool_call", "name": "read_file", "arguments": {}},
+        {"type": "tool_call", "name": "list_dir", "arguments": {}},
+    ]
+
+
+def test_stream_error_becomes_a_text_event():
+    events, _ = _events([_chunk("parcial"), RuntimeError("conexão caiu")])
+
+    assert events == [
+        {"type": "text", "content": "parcial"},
+        {"type": "text", "content": "Erro ao gerar resposta: conexão caiu"},
+    ]
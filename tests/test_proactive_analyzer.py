@@ -0,0 +1,152 @@
+"""
+Testes dos diffs incrementais da análise proativa
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from backend.agents.builtin_rules import TodoRule
+from backend.agents.proactive_analyzer import AnalysisScheduler, ProactiveAnalyzer, _suggestion_id
+from backend.agents.rule_engine import RuleEngine
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    analyzer = ProactiveAnalyzer(str(tmp_path), workers=1, scan_budget=0, engine=RuleEngine([TodoRule()]))
+    yield analyzer
+    analyzer.close()
+
+
+def _write(path, content, mtime=None):
+    path.write_text(content)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def _messages(suggestions):
+    return sorted(s["message"] for s in suggestions)
+
+
+def _suggestion(file, message):
+    suggestion = {"type": "todo", "file": file, "message": message, "priority": "low"}
+    suggestion["id"] = _suggestion_id(suggestion)
+    return suggestion
+
+
+def test_scan_reports_only_changes(tmp_path, analyzer):
+    _write(tmp_path / "a.py", "# TODO: um\n# TODO: dois\n")
+    _write(tmp_path / "b.js", "// TODO: três\n")
+
+    diff = asyncio.run(analyzer.analyze_project())
+    assert len(diff["added"]) == 3 and diff["resolved"] == []
+    assert asyncio.run(analyzer.analyze_project()) == {"added": [], "resolved": []}
+
+    _write(tmp_path / "a.py", "# TODO: um\n# TODO: quatro\n", mtime=1_000_000_000)
+    diff = asyncio.run(analyzer.analyze_project())
+    assert _messages(diff["added"]) == ["TODO encontrado em `a.py`: quatro"]
+    assert _messages(diff["resolved"]) == ["TODO encontrado em `a.py`: dois"]
+    assert len(analyzer.suggestions) == 3
+
+
+def test_touched_file_with_same_content_is_not_reanalyzed(tmp_path, analyzer):
+    path = tmp_path / "a.py"
+    _write(path, "# TODO: um\n")
+    asyncio.run(analyzer.analyze_project())
+    stats = dict(analyzer.rule_stats["todo"])
+
+    _write(path, "# TODO: um\n", mtime=1_000_000_000)
+    assert asyncio.run(analyzer.analyze_project()) == {"added": [], "resolved": []}
+    assert analyzer.rule_stats["todo"] == stats
+    assert analyzer._files["a.py"]["mtime"] == 1_000_000_000
+
+
+def test_removed_file_resolves_its_suggestions(tmp_path, analyzer):
+    _write(tmp_path / "a.py", "# TODO: um\n")
+    _write(tmp_path / "b.py", "# TODO: dois\n")
+    asyncio.run(analyzer.analyze_project())
+
+    (tmp_path / "a.py").unlink()
+    diff = asyncio.run(analyzer.analyze_project())
+
+    assert diff["added"] == []
+    assert _messages(diff["resolved"]) == ["TODO encontrado em `a.py`: um"]
+    assert _messages(analyzer.suggestions) == ["TODO encontrado em `b.py`: dois"]
+
+
+def test_update_files_only_touches_given_paths(tmp_path, analyzer):
+    _write(tmp_path / "a.py", "# TODO: um\n")
+    _write(tmp_path / "b.py", "# TODO: dois\n")
+    asyncio.run(analyzer.analyze_project())
+
+    _write(tmp_path / "a.py", "x = 1\n", mtime=1_000_000_000)
+    _write(tmp_path / "b.py", "y = 2\n", mtime=1_000_000_000)
+    (tmp_path / "notes.txt").write_text("# TODO: fora\n")
+    diff = asyncio.run(analyzer.update_files(["a.py", "notes.txt", "missing.py"]))
+
+    assert diff["added"] == []
+    assert _messages(diff["resolved"]) == ["TODO encontrado em `a.py`: um"]
+    assert _messages(analyzer.suggestions) == ["TODO encontrado em `b.py`: dois"]
+
+
+def test_shared_suggestion_is_refcounted(analyzer):
+    shared = _suggestion("x.py", "compartilhada")
+    analyzer._set_file("a.py", {"hash": "1", "suggestions": [shared]})
+    analyzer._set_file("b.py", {"hash": "2", "suggestions": [dict(shared)]})
+    assert [s["id"] for s in analyzer._update_suggestions()["added"]] == [shared["id"]]
+
+    analyzer._set_file("a.py", None)
+    assert analyzer._update_suggestions() == {"added": [], "resolved": []}
+    assert analyzer.suggestions == [shared]
+
+    analyzer._set_file("b.py", None)
+    assert [s["id"] for s in analyzer._update_suggestions()["resolved"]] == [shared["id"]]
+    assert analyzer.suggestions == []
+
+
+def test_changes_that_cancel_out_are_not_reported(analyzer):
+    first = _suggestion("a.py", "primeira")
+    analyzer._set_file("a.py", {"hash": "1", "suggestions": [first]})
+    analyzer._update_suggestions()
+
+    # Resolvida e recriada entre dois diffs: nada muda para o cliente
+    analyzer._set_file("a.py", {"hash": "2", "suggestions": []})
+    analyzer._set_file("a.py", {"hash": "3", "suggestions": [dict(first)]})
+    assert analyzer._update_suggestions() == {"added": [], "resolved": []}
+
+    # Criada e resolvida entre dois diffs: também não
+    second = _suggestion("a.py", "segunda")
+    analyzer._set_file("a.py", {"hash": "4", "suggestions": [first, second]})
+    analyzer._set_file("a.py", {"hash": "5", "suggestions": [first]})
+    assert analyzer._update_suggestions() == {"added": [], "resolved": []}
+
+
+def test_suggestions_are_sorted_by_priority(analyzer):
+    low = _suggestion("a.py", "baixa")
+    high = dict(_suggestion("b.py", "alta"), priority="high")
+    analyzer._set_file("a.py", {"hash": "1", "suggestions": [low]})
+    analyzer._set_file("b.py", {"hash": "2", "suggestions": [high]})
+
+    assert analyzer.suggestions == [high, low]
+    assert analyzer._update_suggestions()["added"] == [high, low]
+
+
+def test_scheduler_sends_snapshot_and_replaces_backlog(analyzer):
+    analyzer._set_file("a.py", {"hash": "1", "suggestions": [_suggestion("a.py", "um")]})
+    scheduler = AnalysisScheduler(analyzer)
+
+    queue = scheduler.subscribe()
+    event = queue.get_nowait()
+    assert event["snapshot"] is True
+    assert event["added"] == analyzer.suggestions
+
+    for _ in range(queue.maxsize + 1):
+        scheduler.publish({"type": "proactive_suggestions", "snapshot": False, "added": [], "resolved": []})
+    # A fila cheia é trocada pelo estado completo
+    assert queue.qsize() == 1
+    assert queue.get_nowait()["snapshot"] is True
+
+    scheduler.unsubscribe(queue)
+    scheduler.publish({"type": "proactive_suggestions", "snapshot": False, "added": [], "resolved": []})
+    assert queue.empty()
@@ -0,0 +1,136 @@
+"""
+Testes da persistência do índice do projeto
+"""
+
+import time
+import zlib
+
+import pytest
+
+from backend.memory.rag.project_indexer import ProjectIndexer, _scan_file
+
+
+def _tree(root, files):
+    for relative_path, content in files.items():
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+@pytest.fixture
+def project(tmp_path):
+    _tree(tmp_path, {
+        "pkg/__init__.py": "",
+        "pkg/store.py": (
+            "class Store:\n"
+            "    def compress_payload(self, data):\n"
+            "        '''Comprime o payload antes de gravar'''\n"
+            "        return zlib.compress(data)\n"
+        ),
+        "pkg/api.py": (
+            "from pkg.store import Store\n"
+            "\n"
+            "def handle_request(request):\n"
+            "    return Store().compress_payload(request.body)\n"
+        ),
+    })
+    return tmp_path
+
+
+def test_incremental_updates_are_saved_together(project):
+    indexer = ProjectIndexer(str(project), workers=1, save_delay=0.2)
+    indexer.index_project()
+    generation = indexer._read_generation()
+
+    for i in range(3):
+        (project / "pkg" / f"extra{i}.py").write_text(f"def extra_{i}():\n    pass\n")
+        indexer.update_files([f"pkg/extra{i}.py"])
+    assert indexer._read_generation() == generation
+    assert indexer.find_symbol("extra_2")
+
+    deadline = time.monotonic() + 5
+    while indexer._read_generation() == generation and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert indexer._read_generation() == generation + 1
+
+    reloaded = ProjectIndexer(str(project))
+    reloaded.refresh()
+    assert {"extra_0", "extra_1", "extra_2"} <= set(reloaded.index["symbols"])
+
+
+def test_flush_writes_pending_changes(project):
+    indexer = ProjectIndexer(str(project), workers=1, save_delay=60)
+    indexer.index_project()
+    generation = indexer._read_generation()
+
+    (project / "pkg" / "api.py").unlink()
+    indexer.update_files(["pkg/api.py"])
+    indexer.flush()
+
+    assert indexer._read_generation() == generation + 1
+    assert indexer._save_timer is None
+    reloaded = ProjectIndexer(str(project))
+    reloaded.refresh()
+    assert "pkg/api.py" not in reloaded.index["files"]
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:6],
+    lambda data: data[:len(data) // 2],
+    lambda data: data[:14] + zlib.compress(b'{"files": '),
+    lambda data: data[:14] + zlib.compress(b'{"files": {}}'),
+])
+def test_corrupt_index_is_rebuilt(project, corrupt):
+    ProjectIndexer(str(project), workers=1).index_project()
+    index_file = project / ".brain" / "project_index.bin"
+    index_file.write_bytes(corrupt(index_file.read_bytes()))
+
+    indexer = ProjectIndexer(str(project), workers=1)
+    indexer.refresh()
+    assert indexer.loaded and indexer.index["files"] == {}
+
+    stats = indexer.index_project()
+    assert stats["added"] == 3
+    assert indexer.status["state"] == "ready"
+    assert indexer.find_symbol("handle_request")
+
+
+def test_qualified_usages_are_scoped_to_the_owner(project):
+    _tree(project, {
+        "pkg/other.py": (
+            "import json\n"
+            "\n"
+            "class Cache:\n"
+            "    def compress_payload(self, data):\n"
+            "        return data\n"
+            "\n"
+            "def run(cache):\n"
+            "    json.loads('{}')\n"
+            "    return cache.compress_payload(b'')\n"
+        ),
+        "pkg/loads.py": "def parse(loader):\n    return loader.loads('x')\n",
+    })
+    indexer = ProjectIndexer(str(project), workers=1)
+    indexer.index_project()
+
+    paths = lambda name: sorted({usage["path"] for usage in indexer.find_usages(name)})
+    assert paths("compress_payload") == ["pkg/api.py", "pkg/other.py"]
+    assert paths("Store.compress_payload") == ["pkg/api.py"]
+    assert paths("pkg.store.Store.compress_payload") == ["pkg/api.py"]
+    assert paths("Cache.compress_payload") == ["pkg/other.py"]
+    assert paths("json.loads") == ["pkg/other.py"]
+    assert paths("Missing.compress_payload") == []
+
+
+def test_loaded_terms_match_a_fresh_scan(project):
+    indexer = ProjectIndexer(str(project), workers=1)
+    indexer.index_project()
+
+    reloaded = ProjectIndexer(str(project))
+    reloaded.refresh()
+
+    for path, entry in indexer.index["files"].items():
+        scanned = _scan_file(str(project / path), path, None)
+        assert [c["terms"] for c in reloaded.index["files"][path]["chunks"]] == [c["terms"] for c in scanned["chunks"]]
+    assert reloaded.retrieve_chunks("compress payload", 3, with_code=False) == \
+        indexer.retrieve_chunks("compress payload", 3, with_code=False)
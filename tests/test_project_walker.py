@@ -0,0 +1,143 @@
+"""
+Testes da varredura do projeto e da semântica de .gitignore
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from backend.memory.rag.project_walker import ProjectWalker
+
+
+def _tree(root, files):
+    for relative_path, content in files.items():
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def _listed(walker, extensions=None):
+    return sorted(entry.relative_path.replace(os.sep, "/") for entry in walker.files(extensions))
+
+
+@pytest.fixture
+def project(tmp_path):
+    _tree(tmp_path, {
+        ".gitignore": "\n".join([
+            "# comentário",
+            "*.log",
+            "!keep.log",
+            "/build",
+            "out/",
+            "docs/**/draft.md",
+            "tmp[0-9].py",
+            "\\#literal",
+        ]),
+        "app.py": "",
+        "debug.log": "",
+        "keep.log": "",
+        "build/a.py": "",
+        "src/build/b.py": "",
+        "out/c.py": "",
+        "src/out": "",
+        "docs/draft.md": "",
+        "docs/guide/v1/draft.md": "",
+        "docs/guide/readme.md": "",
+        "tmp1.py": "",
+        "tmpx.py": "",
+        "#literal": "",
+        "node_modules/lib/index.js": "",
+        "src/.gitignore": "generated.py\n",
+        "src/generated.py": "",
+        "src/main.py": "",
+        "generated.py": "",
+    })
+    return tmp_path
+
+
+def test_gitignore_semantics(project):
+    assert _listed(ProjectWalker(str(project))) == [
+        ".gitignore",
+        "app.py",
+        "docs/guide/readme.md",
+        "generated.py",
+        "keep.log",
+        "src/.gitignore",
+        "src/build/b.py",
+        "src/main.py",
+        "src/out",
+        "tmpx.py",
+    ]
+
+
+@pytest.mark.parametrize("relative_path, is_dir, expected", [
+    ("debug.log", False, True),
+    ("src/deep/trace.log", False, True),
+    ("keep.log", False, False),
+    ("build", True, True),
+    ("build/a.py", False, True),
+    ("src/build/b.py", False, False),      # "/build" é ancorado na raiz
+    ("out", True, True),
+    ("src/out", False, False),            # "out/" só vale para diretórios
+    ("docs/guide/v1/draft.md", False, True),
+    ("docs/draft.md", False, True),       # "**/" também casa zero diretórios
+    ("docs/guide/readme.md", False, False),
+    ("tmp1.py", False, True),
+    ("#literal", False, True),
+    ("src/generated.py", False, True),    # regra do src/.gitignore
+    ("generated.py", False, False),       # ...que não vale fora de src/
+    ("node_modules/lib/index.js", False, True),
+    ("../fora.py", False, True),
+])
+def test_is_ignored(project, relative_path, is_dir, expected):
+    assert ProjectWalker(str(project)).is_ignored(relative_path, is_dir) is expected
+
+
+def test_directory_pruning_and_excludes(project):
+    walker = ProjectWalker(str(project), excludes=["node_modules", "src/build", "*.md"])
+    listed = _listed(walker)
+    assert "node_modules/lib/index.js" not in listed
+    assert "src/build/b.py" not in listed
+    assert "docs/guide/readme.md" not in listed
+    # Sem .gitignore só valem as exclusões
+    assert "debug.log" in _listed(ProjectWalker(str(project), excludes=[], use_gitignore=False))
+
+
+def test_extension_filter(project):
+    assert _listed(ProjectWalker(str(project)), ('.log',)) == ["keep.log"]
+
+
+def test_rules_reload_when_gitignore_changes(project):
+    walker = ProjectWalker(str(project))
+    assert not walker.is_ignored("app.py")
+
+    gitignore = project / ".gitignore"
+    gitignore.write_text(gitignore.read_text() + "\napp.py\n")
+    stat = gitignore.stat()
+    os.utime(gitignore, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert walker.is_ignored("app.py")
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git indisponível")
+def test_matches_git_check_ignore(project):
+    subprocess.run(["git", "init", "-q", str(project)], check=True)
+    candidates = sorted(
+        os.path.relpath(os.path.join(directory, name), project).replace(os.sep, "/")
+        for directory, _, names in os.walk(project)
+        if ".git" not in os.path.relpath(directory, project).split(os.sep)
+        for name in names
+    )
+    result = subprocess.run(
+        ["git", "-C", str(project), "check-ignore", "--stdin"],
+        input="\n".join(candidates), capture_output=True, text=True
+    )
+    git_ignored = set(result.stdout.split())
+
+    walker = ProjectWalker(str(project), excludes=[])
+    assert {p for p in candidates if walker.is_ignored(p)} == git_ignored
+
+    # use_git lista o mesmo que a varredura
+    assert _listed(ProjectWalker(str(project), excludes=[".git"], use_git=True)) == \
+        _listed(ProjectWalker(str(project), excludes=[".git"]))
@@ -0,0 +1,176 @@
+"""
+Testes do motor de regras da análise proativa
+"""
+
+import ast
+import logging
+import re
+
+from backend.agents import builtin_rules
+from backend.config_loader import load_config
+from backend.agents.rule_engine import Rule, RuleEngine, _Plan
+
+
+def _line_rule(name, pattern, flags=0):
+    """Regra que registra cada linha casada com o texto do match"""
+    class LineRule(Rule):
+        def check_line(self, ctx, number, match):
+            ctx.suggest(match.group(0), line=number)
+    LineRule.name = name
+    LineRule.pattern = pattern
+    LineRule.flags = flags
+    return LineRule()
+
+
+def _findings(suggestions, rule):
+    return [(s["line"], s["message"]) for s in suggestions if s["rule"] == rule]
+
+
+def test_backreference_rules_stay_out_of_the_gate():
+    plan = _Plan([_line_rule("repeat", r"\b(\w+) \1\b"), _line_rule("fixme", r"FIXME")])
+
+    assert plan.gate is not None
+    assert [r.name for r, _ in plan.ungated] == ["repeat"]
+
+
+def test_ungated_rules_run_on_lines_with_and_without_gate_hits():
+    engine = RuleEngine([_line_rule("repeat", r"\b(\w+) \1\b"), _line_rule("fixme", r"FIXME")])
+    content = "the the cat\nFIXME: x x\nnothing here\n"
+
+    suggestions, stats = engine.run("a.py", ".py", content)
+
+    assert _findings(suggestions, "repeat") == [(1, "the the"), (2, "x x")]
+    assert _findings(suggestions, "fixme") == [(2, "FIXME")]
+    assert stats["repeat"]["findings"] == 2
+
+
+def test_gate_keeps_each_rule_flags_scoped():
+    engine = RuleEngine([
+        _line_rule("todo", r"todo", re.IGNORECASE),
+        _line_rule("fixme", r"FIXME"),
+    ])
+
+    suggestions, _ = engine.run("a.js", ".js", "TODO a\nfixme b\nFIXME c\n")
+
+    assert _findings(suggestions, "todo") == [(1, "TODO")]
+    assert _findings(suggestions, "fixme") == [(3, "FIXME")]
+
+
+def test_patterns_that_do_not_combine_fall_back_to_ungated():
+    rules = [_line_rule("inline", r"(?i)abc"), _line_rule("plain", r"xyz")]
+    plan = _Plan(rules)
+
+    assert plan.gate is None
+    assert [r.name for r, _ in plan.ungated] == ["inline", "plain"]
+    suggestions, _ = RuleEngine(rules).run("a.py", ".py", "ABC\nxyz\n")
+    assert [s["rule"] for s in suggestions] == ["inline", "plain"]
+
+
+def test_node_dispatch_matches_subclasses_and_is_cached():
+    class StatementRule(Rule):
+        name = "statements"
+        node_types = (ast.stmt,)
+
+    class FunctionRule(Rule):
+        name = "functions"
+        node_types = (ast.FunctionDef,)
+
+    statements, functions = StatementRule(), FunctionRule()
+    plan = _Plan([statements, functions])
+
+    assert plan.rules_for_node(ast.FunctionDef) == [statements, functions]
+    assert plan.rules_for_node(ast.Return) == [statements]
+    assert plan.rules_for_node(ast.Name) == []
+    assert plan.rules_for_node(ast.FunctionDef) is plan.rules_for_node(ast.FunctionDef)
+
+
+def test_node_rules_receive_each_matching_node():
+    engine = RuleEngine([builtin_rules.MissingDocstringRule(), builtin_rules.BareExceptRule()])
+    content = (
+        "def public():\n"
+        "    try:\n"
+        "        pass\n"
+        "    except:\n"
+        "        pass\n"
+        "\n"
+        "async def documented():\n"
+        "    '''ok'''\n"
+        "\n"
+        "def _private():\n"
+        "    pass\n"
+    )
+
+    suggestions, stats = engine.run("m.py", ".py", content)
+
+    assert [(s["rule"], s["line"]) for s in suggestions] == [("missing-docstring", 1), ("bare-except", 4)]
+    assert stats["missing-docstring"]["findings"] == 1
+
+
+def test_node_rules_skip_non_python_and_invalid_syntax():
+    engine = RuleEngine([builtin_rules.MissingDocstringRule()])
+
+    assert engine.run("m.js", ".js", "function f() {}\n")[0] == []
+    assert engine.run("m.py", ".py", "def broken(:\n")[0] == []
+
+
+def test_failing_rule_is_counted_without_stopping_the_others():
+    class Broken(Rule):
+        name = "broken"
+        pattern = r"x"
+
+        def check_line(self, ctx, number, match):
+            raise ValueError("boom")
+
+    engine = RuleEngine([Broken(), _line_rule("plain", r"x")])
+
+    suggestions, stats = engine.run("a.py", ".py", "x\nx\n")
+
+    assert stats["broken"]["errors"] == 2
+    assert stats["broken"]["findings"] == 0
+    assert _findings(suggestions, "plain") == [(1, "x"), (2, "x")]
+
+
+def test_registry_skips_disabled_rules():
+    names = [rule.name for rule in RuleEngine.from_registry().rules]
+    assert {"large-file", "todo", "missing-docstring", "bare-except"} <= set(names)
+
+    enabled = [rule.name for rule in RuleEngine.from_registry(disabled=["todo"]).rules]
+    assert "todo" not in enabled
+    assert len(enabled) == len(names) - 1
+
+
+def test_builtin_line_and_file_rules():
+    engine = RuleEngine([builtin_rules.TodoRule(), builtin_rules.LargeFileRule()])
+    content = "// todo: migrar\n" + "x = 1\n" * builtin_rules.LargeFileRule.max_lines
+
+    suggestions, _ = engine.run("big.js", ".js", content)
+
+    assert [s["rule"] for s in suggestions] == ["large-file", "todo"]
+    assert suggestions[1]["message"].endswith(": migrar")
+    assert "line" not in suggestions[0]
+    assert engine.run("small.js", ".js", "x = 1\n")[0] == []
+
+
+def test_first_failure_of_each_rule_is_logged(caplog):
+    class Broken(Rule):
+        name = "broken"
+        pattern = r"x"
+
+        def check_line(self, ctx, number, match):
+            raise ValueError("boom")
+
+    engine = RuleEngine([Broken()])
+    with caplog.at_level(logging.ERROR, logger="backend.agents.rule_engine"):
+        engine.run("a.py", ".py", "x\nx\n")
+        engine.run("b.py", ".py", "x\n")
+
+    assert len(caplog.records) == 1
+    assert "broken" in caplog.records[0].getMessage()
+    assert caplog.records[0].exc_info[0] is ValueError
+
+
+def test_bare_except_is_disabled_in_the_default_config():
+    disabled = load_config()["proactive"]["disabled_rules"]
+    names = [rule.name for rule in RuleEngine.from_registry(disabled=disabled).rules]
+    assert "bare-except" not in names
+    assert "todo" in names
@@ -0,0 +1,82 @@
+"""
+Testes do ranking do índice invertido/trigramas do project_search
+"""
+
+from backend.memory.rag.search_index import SearchIndex, tokenize
+
+
+def _index(files):
+    index = SearchIndex()
+    for path, symbols in files.items():
+        index.add_file(path, symbols)
+    return index
+
+
+def _ranked(results):
+    return [result["path"] for result in results]
+
+
+def test_tokenize_splits_identifiers_and_paths():
+    assert tokenize("loadIndex") == ["loadindex", "load", "index"]
+    assert tokenize("rag/bm25_index.py") == ["rag", "bm25", "bm", "25", "index", "py"]
+    assert tokenize("HTTPServer") == ["httpserver", "http", "server"]
+
+
+def test_exact_beats_substring_beats_fuzzy():
+    index = _index({
+        "exact.py": ["parse"],
+        "substring.py": ["parse_config"],
+        "fuzzy.py": ["xparsy"],
+        "unrelated.py": ["render"],
+    })
+
+    results = index.search("parse")
+
+    assert _ranked(results) == ["exact.py", "substring.py", "fuzzy.py"]
+    assert results[0]["score"] > results[1]["score"] > results[2]["score"]
+    assert [result["matches"] for result in results] == [["parse"], ["parse_config"], ["xparsy"]]
+
+
+def test_fuzzy_only_runs_when_results_are_missing():
+    index = _index({"exact.py": ["parse"], "fuzzy.py": ["xparsy"]})
+
+    assert _ranked(index.search("parse", limit=1)) == ["exact.py"]
+    assert _ranked(index.search("parse", limit=5)) == ["exact.py", "fuzzy.py"]
+
+
+def test_typo_finds_symbol_by_trigrams():
+    index = _index({"store.py": ["compress_payload"], "other.py": ["render_page"]})
+
+    assert _ranked(index.search("compres_payload")) == ["store.py"]
+
+
+def test_camel_case_tokens_and_paths_match():
+    index = _index({"backend/rag/loader.py": ["loadIndex"], "backend/web/app.py": ["serve"]})
+
+    assert _ranked(index.search("index")) == ["backend/rag/loader.py"]
+    assert _ranked(index.search("rag/loader")) == ["backend/rag/loader.py"]
+    assert index.search("LOADINDEX")[0]["matches"] == ["loadIndex"]
+
+
+def test_remove_and_readd_cleans_every_list():
+    index = _index({"a.py": ["parse_config"], "b.py": ["render"]})
+    before = index.search("parse")
+
+    index.remove_file("a.py")
+    assert index.search("parse") == []
+    assert index.search("parse_confg") == []
+    assert "parse_config" not in index._terms
+    assert all("parse_config" not in terms for terms in index._trigrams.values())
+    assert len(index) == 1
+
+    index.add_file("a.py", ["parse_config"])
+    assert index.search("parse") == before
+
+
+def test_shared_symbol_stays_until_last_file_is_removed():
+    index = _index({"a.py": ["helper"], "b.py": ["helper"]})
+
+    index.remove_file("a.py")
+    assert _ranked(index.search("helper")) == ["b.py"]
+    index.add_file("b.py", ["other"])
+    assert index.search("helper") == []
@@ -0,0 +1,248 @@
+"""
+Testes da extração de símbolos (Python via ast, JS/TS via tokenizador)
+"""
+
+from backend.memory.rag.symbol_extractor import _tokenize_js, extract_symbols
+
+
+def _spans(symbols):
+    return [(s["qualname"], s["kind"], s["line"], s["end_line"]) for s in symbols]
+
+
+def _by_name(symbols):
+    return {s["qualname"]: s for s in symbols}
+
+
+# --- Python -----------------------------------------------------------------
+
+def test_python_decorators_start_the_span():
+    content = (
+        "import functools\n"
+        "\n"
+        "@functools.lru_cache(maxsize=None)\n"
+        "@staticmethod\n"
+        "def cached(x: int) -> int:\n"
+        "    return x\n"
+        "\n"
+        "@dataclass\n"
+        "class Point:\n"
+        "    x: int = 0\n"
+    )
+
+    symbols = extract_symbols("m.py", content)
+
+    assert _spans(symbols) == [("cached", "function", 3, 6), ("Point", "class", 8, 10)]
+    assert symbols[0]["signature"] == "def cached(x: int) -> int"
+    assert symbols[1]["signature"] == "class Point"
+
+
+def test_python_nested_definitions():
+    content = (
+        "class Outer(Base, metaclass=Meta):\n"
+        "    def method(self):\n"
+        "        def helper():\n"
+        "            pass\n"
+        "        return helper\n"
+        "\n"
+        "    class Inner:\n"
+        "        async def run(self):\n"
+        "            pass\n"
+        "\n"
+        "def factory():\n"
+        "    class Local:\n"
+        "        def go(self):\n"
+        "            pass\n"
+        "    return Local\n"
+    )
+
+    symbols = extract_symbols("m.py", content)
+
+    assert _spans(symbols) == [
+        ("Outer", "class", 1, 9),
+        ("Outer.method", "method", 2, 5),
+        ("Outer.method.helper", "function", 3, 4),
+        ("Outer.Inner", "class", 7, 9),
+        ("Outer.Inner.run", "method", 8, 9),
+        ("factory", "function", 11, 15),
+        ("factory.Local", "class", 12, 14),
+        ("factory.Local.go", "method", 13, 14),
+    ]
+    assert symbols[0]["signature"] == "class Outer(Base, metaclass=Meta)"
+    assert symbols[4]["signature"] == "async def run(self)"
+
+
+def test_python_conditional_module_level_definitions():
+    content = (
+        "if TYPE_CHECKING:\n"
+        "    class Hint:\n"
+        "        pass\n"
+        "else:\n"
+        "    Hint = object\n"
+        "\n"
+        "try:\n"
+        "    from fast import parse\n"
+        "except ImportError:\n"
+        "    def parse(text):\n"
+        "        return text\n"
+        "finally:\n"
+        "    def cleanup():\n"
+        "        pass\n"
+        "\n"
+        "def run():\n"
+        "    if True:\n"
+        "        def hidden():\n"
+        "            pass\n"
+    )
+
+    assert _spans(extract_symbols("m.py", content)) == [
+        ("Hint", "class", 2, 3),
+        ("parse", "function", 10, 11),
+        ("cleanup", "function", 13, 14),
+        ("run", "function", 16, 19),
+    ]
+
+
+def test_python_syntax_error_falls_back_to_regex():
+    symbols = extract_symbols("m.py", "def ok():\n    pass\n\ndef broken(:\n")
+
+    assert [(s["name"], s["line"]) for s in symbols] == [("ok", 1), ("broken", 4)]
+
+
+# --- JS / TS ----------------------------------------------------------------
+
+def test_js_regex_literals_do_not_open_scopes_or_strings():
+    content = (
+        "const braces = /[{}]+/g;\n"
+        "const quotes = /[\"'`]/;\n"
+        "const slash = /\\/\\{/;\n"
+        "function after() {\n"
+        "  return text.replace(/}/g, '').split(/'/);\n"
+        "}\n"
+        "function last() {}\n"
+    )
+
+    symbols = _by_name(extract_symbols("a.js", content))
+
+    assert (symbols["after"]["line"], symbols["after"]["end_line"]) == (4, 6)
+    assert (symbols["last"]["line"], symbols["last"]["end_line"]) == (7, 7)
+    assert symbols["braces"]["kind"] == "variable"
+
+
+def test_js_division_is_not_a_regex():
+    content = (
+        "const half = total / 2 / count;\n"
+        "function ratio(a, b) {\n"
+        "  return (a) / b + items[0] / 2;\n"
+        "}\n"
+        "function next() {}\n"
+    )
+
+    symbols = _by_name(extract_symbols("a.js", content))
+
+    assert (symbols["ratio"]["line"], symbols["ratio"]["end_line"]) == (2, 4)
+    assert (symbols["next"]["line"], symbols["next"]["end_line"]) == (5, 5)
+
+
+def test_js_template_literals_with_expressions():
+    content = (
+        "const message = `total: ${items.map(i => { return i.price; })} ${`nested ${user.name}`} }`;\n"
+        "function render() {\n"
+        "  return `<div class=\"${cls}\">${'}'}</div>`;\n"
+        "}\n"
+        "function after() {}\n"
+    )
+
+    symbols = _by_name(extract_symbols("a.js", content))
+
+    assert symbols["message"]["kind"] == "variable"
+    assert (symbols["render"]["line"], symbols["render"]["end_line"]) == (2, 4)
+    assert (symbols["after"]["line"], symbols["after"]["end_line"]) == (5, 5)
+    assert [t[1] for t in _tokenize_js("f(`a ${`b`}`)")] == ["f", "(", ")"]
+
+
+def test_js_arrow_functions_without_braces():
+    content = (
+        "const double = x => x * 2;\n"
+        "const add = (a, b) => a + b;\n"
+        "export const load = async () => fetch(url);\n"
+        "const block = async (a) => {\n"
+        "  return a;\n"
+        "};\n"
+        "const value = compute(1);\n"
+    )
+
+    symbols = _by_name(extract_symbols("a.js", content))
+
+    assert {name: s["kind"] for name, s in symbols.items()} == {
+        "double": "function", "add": "function", "load": "function",
+        "block": "function", "value": "variable",
+    }
+    assert (symbols["double"]["line"], symbols["double"]["end_line"]) == (1, 1)
+    assert symbols["add"]["signature"] == "const add = (a, b) => a + b;"
+    assert (symbols["block"]["line"], symbols["block"]["end_line"]) == (4, 6)
+
+
+def test_ts_class_fields_with_generics_are_not_methods():
+    content = (
+        "export class Store<T> {\n"
+        "  private items: Map<string, Array<T>> = new Map();\n"
+        "  handler: Callback<T> = (item) => this.add(item);\n"
+        "  static create<U>(): Store<U> {\n"
+        "    return new Store<U>();\n"
+        "  }\n"
+        "  async get(key: string): Promise<T | undefined> {\n"
+        "    if (this.items.has(key)) {\n"
+        "      return this.items.get(key)[0];\n"
+        "    }\n"
+        "  }\n"
+        "}\n"
+    )
+
+    symbols = extract_symbols("store.ts", content)
+
+    assert _spans(symbols) == [
+        ("Store", "class", 1, 12),
+        ("Store.create", "method", 4, 6),
+        ("Store.get", "method", 7, 11),
+    ]
+    assert symbols[1]["signature"] == "static create<U>(): Store<U>"
+    assert symbols[2]["signature"] == "async get(key: string): Promise<T | undefined>"
+
+
+def test_ts_return_types():
+    content = (
+        "export async function parse(input: string): Promise<Result<Item[]>> {\n"
+        "  return JSON.parse(input);\n"
+        "}\n"
+        "function typed(): Record<string, { ok: boolean }> {\n"
+        "  return {};\n"
+        "}\n"
+        "function* ids(): Generator<number> {\n"
+        "  yield 1;\n"
+        "}\n"
+    )
+
+    symbols = extract_symbols("api.ts", content)
+
+    assert _spans(symbols) == [
+        ("parse", "function", 1, 3),
+        ("typed", "function", 4, 6),
+        ("ids", "function", 7, 9),
+    ]
+    assert symbols[0]["signature"] == "async function parse(input: string): Promise<Result<Item[]>>"
+
+
+def test_js_comments_and_strings_are_ignored():
+    content = (
+        "// function fake() {\n"
+        "/* class Nope { */\n"
+        "const s = \"function nope() {\";\n"
+        "function real() {\n"
+        "  return '}';\n"
+        "}\n"
+    )
+
+    symbols = _by_name(extract_symbols("a.js", content))
+
+    assert set(symbols) == {"s", "real"}
+    assert (symbols["real"]["line"], symbols["real"]["end_line"]) == (4, 6)
@@ -0,0 +1,126 @@
+"""
+Testes da ordem dos eventos enviados pelo websocket de chat
+"""
+
+import asyncio
+import importlib
+import json
+from types import SimpleNamespace
+
+import pytest
+
+
+class FakeWebSocket:
+    """Entrega as mensagens informadas e depois simula a desconexão"""
+
+    def __init__(self, log, messages):
+        self.log = log
+        self.messages = list(messages)
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self):
+        if not self.messages:
+            raise ConnectionError("desconectado")
+        return json.dumps(self.messages.pop(0))
+
+    async def send_json(self, data):
+        self.log.append(("send", data))
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeProvider:
+    name = "fake"
+
+    def __init__(self, events):
+        self.events = events
+
+    async def stream_chat(self, messages, tools=None):
+        for event in self.events:
+            yield event
+
+
+class FakeRegistry:
+    def __init__(self, log):
+        self.log = log
+
+    def register_execution_tools(self, conversation_id, **kwargs):
+        pass
+
+    def get_tools_for_llm(self):
+        return []
+
+    async def execute_tool(self, name, arguments):
+        self.log.append(("execute", name, arguments))
+        return f"resultado de {name}"
+
+
+class FakeConversations:
+    def __init__(self):
+        self.messages = []
+
+    async def create_conversation(self):
+        return "conv-1"
+
+    async def add_message(self, conversation_id, role, content):
+        self.messages.append((conversation_id, role, content))
+
+
+@pytest.fixture
+def main(tmp_path, monkeypatch):
+    # O módulo monta indexador e walker na pasta atual ao ser importado
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("backend.main")
+
+
+def test_events_are_forwarded_in_stream_order(main, monkeypatch):
+    log = []
+    conversations = FakeConversations()
+    provider = FakeProvider([
+        {"type": "text", "content": "Vou ler "},
+        {"type": "tool_call", "name": "read_file", "arguments": {"path": "a.py"}},
+        {"type": "text", "content": "e resumir"},
+        {"type": "tool_call", "name": "list_dir", "arguments": {}},
+    ])
+
+    async def build_llm_messages(conversation_id, message):
+        return [{"role": "user", "content": message}]
+
+    async def process_llm_tags(text, conversation_id):
+        log.append(("tags", text))
+
+    monkeypatch.setattr(main, "get_llm_provider", lambda: provider)
+    monkeypatch.setattr(main, "tool_registry", FakeRegistry(log))
+    monkeypatch.setattr(main, "conversation_manager", conversations)
+    monkeypatch.setattr(main, "build_llm_messages", build_llm_messages)
+    monkeypatch.setattr(main, "process_llm_tags", process_llm_tags)
+    monkeypatch.setattr(main, "conversation_compactor", SimpleNamespace(schedule=lambda cid: log.append(("compact", cid))))
+    monkeypatch.setattr(main, "analysis_scheduler", SimpleNamespace(
+        subscribe=asyncio.Queue, unsubscribe=lambda queue: None
+    ))
+
+    websocket = FakeWebSocket(log, [{"message": "resuma a.py"}])
+    asyncio.run(main.websocket_chat(websocket))
+
+    assert log == [
+        ("send", {"type": "chunk", "content": "Vou ler ", "conversation_id": "conv-1"}),
+        ("send", {"type": "tool_call", "tool": "read_file", "args": {"path": "a.py"}}),
+        ("execute", "read_file", {"path": "a.py"}),
+        ("send", {"type": "tool_result", "tool": "read_file", "result": "resultado de read_file"}),
+        ("send", {"type": "chunk", "content": "e resumir", "conversation_id": "conv-1"}),
+        ("send", {"type": "tool_call", "tool": "list_dir", "args": {}}),
+        ("execute", "list_dir", {}),
+        ("send", {"type": "tool_result", "tool": "list_dir", "result": "resultado de list_dir"}),
+        ("tags", "Vou ler e resumir"),
+        ("compact", "conv-1"),
+        ("send", {"type": "done", "conversation_id": "conv-1"}),
+    ]
+    assert conversations.messages == [
+        ("conv-1", "user", "resuma a.py"),
+        ("conv-1", "assistant", "Vou ler e resumir"),
+    ]
+    assert websocket.closed